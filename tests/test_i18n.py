@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from web_portal import i18n
+
+
+@pytest.fixture(autouse=True)
+def _isolated_translation_state(monkeypatch):
+    i18n.TRANSLATION_CACHE.clear()
+    i18n._TRANSLATION_INFLIGHT.clear()
+    monkeypatch.setitem(i18n._TRANSLATE_BREAKER, "failures", 0)
+    monkeypatch.setitem(i18n._TRANSLATE_BREAKER, "open_until", 0.0)
+    yield
+    i18n.TRANSLATION_CACHE.clear()
+    i18n._TRANSLATION_INFLIGHT.clear()
+
+
+def _slow_provider(monkeypatch, result):
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_fetch(text, target_lang, source_lang):
+        calls.append(text)
+        await release.wait()
+        return result
+
+    monkeypatch.setattr(i18n, "_fetch_translation", fake_fetch)
+    return calls, release
+
+
+def test_cancelled_first_caller_does_not_cancel_coalesced_waiter(monkeypatch):
+    async def scenario():
+        calls, release = _slow_provider(monkeypatch, "hola")
+        first = asyncio.create_task(i18n.translate_text("hello", target_lang="es", source_lang="en"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(i18n.translate_text("hello", target_lang="es", source_lang="en"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == "hola"
+    assert calls == ["hello"]
+
+
+def test_failed_lookup_falls_back_to_source_text_for_every_waiter(monkeypatch):
+    async def scenario():
+        calls, release = _slow_provider(monkeypatch, None)
+        waiters = [
+            asyncio.create_task(i18n.translate_text("hello", target_lang="es", source_lang="en")) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters), calls
+
+    results, calls = asyncio.run(scenario())
+    assert results == ["hello", "hello"]
+    assert calls == ["hello"]
+    assert not i18n._TRANSLATION_INFLIGHT
+
+
+def test_open_breaker_still_serves_shared_cache(monkeypatch):
+    async def redis_hit(key):
+        return "hola"
+
+    async def fetch_must_not_run(text, target_lang, source_lang):
+        raise AssertionError("provider called while breaker is open")
+
+    monkeypatch.setattr(i18n, "_redis_get_translation", redis_hit)
+    monkeypatch.setattr(i18n, "_fetch_translation", fetch_must_not_run)
+    monkeypatch.setitem(i18n._TRANSLATE_BREAKER, "open_until", i18n.time.monotonic() + 60)
+
+    assert asyncio.run(i18n.translate_text("hello", target_lang="es", source_lang="en")) == "hola"
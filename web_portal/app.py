@@ -8,29 +8,40 @@ from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from .bot import bot_client, heartbeat, run_bot_forever
-from .clients import close_http_clients, init_http_client
-from .i18n import detect_language, get_strings
+from .clients import close_http_clients, close_redis, init_http_client, init_redis
+from .i18n import detect_language, get_strings, persist_lang_cache, warm_language_cache
+from .middleware import CachedStaticFiles, MaintenanceGateMiddleware, SecurityHeadersMiddleware, TimingMiddleware
 from .routers.health import router as health_router
-from .routers.interactions import router as interactions_router
+from .routers.interactions import router as interactions_router, warm_decision_translations
 from .routers.pages import router as pages_router
 from .routers.status_api import router as status_router
+from .services.discord_api import (
+    flush_embed_log_queue,
+    flush_log_queue,
+    run_embed_log_consumer,
+    run_log_consumer,
+    stop_embed_log_consumer,
+    stop_log_consumer,
+)
+from .services.message_cache import flush_pending_snapshots
 from .services.sessions import serializer
-from .services.supabase import get_portal_flag
+from .services.supabase import flush_supabase_writes, get_portal_flag, run_supabase_writer, stop_supabase_writer
 from .settings import validate_required_envs
 from . import state
-from .ui import render_error
-from .utils import wants_html
+from .ui import prewarm_templates, render_error
+from .utils import OrjsonResponse, wants_html
 
 
 @asynccontextmanager
 async def app_lifespan(app: FastAPI):
     await init_http_client()
+    await init_redis()
+    prewarm_templates()
 
     if not bot_client:
         logging.warning("discord.py not available; bot client not started.")
@@ -42,6 +53,21 @@ async def app_lifespan(app: FastAPI):
     if not state._bot_heartbeat_task or state._bot_heartbeat_task.done():
         state._bot_heartbeat_task = asyncio.create_task(heartbeat())
 
+    if not state._log_consumer_task or state._log_consumer_task.done():
+        state._log_consumer_task = asyncio.create_task(run_log_consumer())
+
+    if not state._embed_log_task or state._embed_log_task.done():
+        state._embed_log_task = asyncio.create_task(run_embed_log_consumer())
+
+    if not state._supabase_writer_task or state._supabase_writer_task.done():
+        state._supabase_writer_task = asyncio.create_task(run_supabase_writer())
+
+    # session_epoch is read synchronously on every session check; load it before traffic arrives.
+    for warm in (warm_language_cache(), warm_decision_translations(), get_portal_flag("session_epoch")):
+        warm_task = asyncio.create_task(warm)
+        state._background_tasks.add(warm_task)
+        warm_task.add_done_callback(state._background_tasks.discard)
+
     try:
         yield
     finally:
@@ -54,7 +80,19 @@ async def app_lifespan(app: FastAPI):
             state._bot_task.cancel()
         if state._bot_heartbeat_task and not state._bot_heartbeat_task.done():
             state._bot_heartbeat_task.cancel()
+        # Consumers finish the batch in hand and what is queued before the leftover flushes run.
+        await asyncio.gather(
+            stop_log_consumer(state._log_consumer_task),
+            stop_embed_log_consumer(state._embed_log_task),
+            stop_supabase_writer(state._supabase_writer_task),
+        )
+        await flush_pending_snapshots()
+        await flush_supabase_writes()
+        await persist_lang_cache()
+        await flush_log_queue()
+        await flush_embed_log_queue()
         await close_http_clients()
+        await close_redis()
 
 
 def create_app() -> FastAPI:
@@ -62,7 +100,11 @@ def create_app() -> FastAPI:
 
     logging.basicConfig(level=logging.INFO)
 
-    app = FastAPI(title="BlockSpin Appeals Portal", lifespan=app_lifespan)
+    app = FastAPI(
+        title="BlockSpin Appeals Portal",
+        lifespan=app_lifespan,
+        default_response_class=OrjsonResponse,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -72,55 +114,15 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    @app.middleware("http")
-    async def maintenance_gate(request: Request, call_next):
-        # Allow static assets through so the error page can render properly.
-        path = request.url.path
-        if path.startswith("/static"):
-            return await call_next(request)
-
-        unavailable_flag = await get_portal_flag("unavailable", None)
-        is_unavailable = False
-        if isinstance(unavailable_flag, bool):
-            is_unavailable = unavailable_flag
-        elif isinstance(unavailable_flag, str):
-            is_unavailable = unavailable_flag.strip().lower() == "true"
-
-        if is_unavailable:
-            announcement = await get_portal_flag("announcement", None) or getattr(state, "_announcement_text", None)
-            message = "The appeals portal is currently unavailable."
-            if announcement:
-                message = f"{message} {announcement}"
-
-            if wants_html(request):
-                lang = await detect_language(request)
-                strings = await get_strings(lang)
-                return render_error(
-                    "Portal unavailable",
-                    message,
-                    status_code=503,
-                    lang=lang,
-                    strings=strings,
-                )
-            return JSONResponse(status_code=503, content={"detail": message})
-
-        return await call_next(request)
-
-    @app.middleware("http")
-    async def add_security_headers(request: Request, call_next):
-        response: Response = await call_next(request)
-        response.headers.setdefault("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("Referrer-Policy", "no-referrer")
-        response.headers.setdefault("Permissions-Policy", "geolocation=(), microphone=(), camera=()")
-        response.headers.setdefault("Cross-Origin-Opener-Policy", "same-origin")
-        response.headers.setdefault("Cross-Origin-Embedder-Policy", "require-corp")
-        response.headers.setdefault("Cross-Origin-Resource-Policy", "same-origin")
-        # If a prior handler marked the request for forced logout, clear the session cookie
-        if getattr(request.state, "force_logout", False):
-            response.delete_cookie("bs_session")
-        return response
+    app.add_middleware(MaintenanceGateMiddleware)
+
+    # Rendered pages and /status/data are text-heavy; level 6 is close to level 9's ratio at a
+    # fraction of the CPU. Bodies that are already encoded and event streams pass through.
+    app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
+    app.add_middleware(SecurityHeadersMiddleware)
+
+    # Registered last so it wraps the whole stack and times the full request.
+    app.add_middleware(TimingMiddleware)
 
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -137,7 +139,7 @@ def create_app() -> FastAPI:
                 )
             msg = exc.detail if isinstance(exc.detail, str) else "Something went wrong."
             return render_error("Request failed", msg, status_code=exc.status_code, lang=lang, strings=strings)
-        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+        return OrjsonResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -154,7 +156,7 @@ def create_app() -> FastAPI:
             lang = await detect_language(request)
             strings = await get_strings(lang)
             return render_error("Server error", "Unexpected error. Please try again.", status_code=500, lang=lang, strings=strings)
-        return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+        return OrjsonResponse(status_code=500, content={"detail": "Internal server error"})
 
     app.include_router(health_router)
     app.include_router(status_router)
@@ -162,7 +164,7 @@ def create_app() -> FastAPI:
     app.include_router(pages_router)
 
     static_dir = Path(__file__).resolve().parent / "static"
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+    app.mount("/static", CachedStaticFiles(directory=str(static_dir)), name="static")
 
     # Export serializer (used for state/session signing) so other modules can import via app if needed.
     app.state.serializer = serializer
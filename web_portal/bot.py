@@ -6,8 +6,16 @@ import time
 from datetime import datetime, timezone
 from typing import Optional
 
-from .services.message_cache import _get_recent_message_context, maybe_snapshot_messages, should_track_messages, truncate_log_text
-from .services.supabase import is_supabase_ready, supabase_request
+from .services.discord_api import invalidate_ban_cache
+from .services.live_events import publish_announcement
+from .services.message_cache import (
+    _get_recent_message_context,
+    maybe_snapshot_messages,
+    newest_first,
+    should_track_messages,
+    truncate_log_text,
+)
+from .services.supabase import is_supabase_ready, supabase_insert
 from .settings import (
     BOT_EVENT_LOGGING,
     BOT_MESSAGE_LOG_CONTENT,
@@ -149,19 +157,21 @@ if discord:
                 getattr(message, "id", "unknown"),
                 log_content,
             )
-        ts_str = message.created_at.isoformat()
+        created_at = message.created_at
         entry = {
             "content": content,
             "channel_id": str(message.channel.id),
-            "timestamp": int(message.created_at.timestamp()),
+            "timestamp": int(created_at.timestamp()),
             "channel_name": getattr(message.channel, "name", "unknown"),
-            "timestamp_iso": ts_str,
+            "timestamp_iso": created_at.isoformat(),
             "id": str(message.id),
         }
-        _message_buffer[user_id].append(entry)
-        _recent_message_context[user_id] = (list(_message_buffer[user_id]), time.time())
+        buffer = _message_buffer[user_id]
+        buffer.append(entry)
+        # Share the live buffer; readers snapshot it newest first when they need it.
+        _recent_message_context[user_id] = (buffer, time.monotonic())
         if DEBUG_EVENTS:
-            print(f"[DEBUG] RAM Cache for {message.author.name}: {len(_message_buffer[user_id])} messages stored.")
+            print(f"[DEBUG] RAM Cache for {message.author.name}: {len(buffer)} messages stored.")
         await maybe_snapshot_messages(user_id, str(message.guild.id))
 
         # Administrator-only commands (restricted to specific user)
@@ -239,6 +249,7 @@ if discord:
                 state._session_epoch += 1
                 from .services.supabase import set_portal_flag
                 await set_portal_flag("session_epoch", state._session_epoch)
+                publish_announcement(state._announcement_text, state._session_epoch)
 
                 embed = discord.Embed(
                     title="Global logout",
@@ -261,11 +272,13 @@ if discord:
                     state._announcement_text = None
                     from .services.supabase import set_portal_flag
                     await set_portal_flag("announcement", None)
+                    publish_announcement(None, state._session_epoch)
                     await message.channel.send("Appeals announcement cleared.")
                 elif announce_text:
                     state._announcement_text = announce_text
                     from .services.supabase import set_portal_flag
                     await set_portal_flag("announcement", announce_text)
+                    publish_announcement(announce_text, state._session_epoch)
                     await message.channel.send("Appeals announcement set.")
                 else:
                     await message.channel.send("Usage: !appeals_announce <content|CLEAR>")
@@ -275,6 +288,7 @@ if discord:
     @bot_client.event
     async def on_member_ban(guild, user):
         user_id = uid(user.id)
+        invalidate_ban_cache(user_id)
         if not should_track_messages(guild.id):
             return
 
@@ -294,15 +308,14 @@ if discord:
                 len(cached_msgs),
                 SUPABASE_CONTEXT_TABLE,
             )
-            result = await supabase_request(
-                "post",
+            result = await supabase_insert(
                 SUPABASE_CONTEXT_TABLE,
-                params={"on_conflict": "user_id"},
-                payload={
+                {
                     "user_id": user_id,
-                    "messages": cached_msgs,
+                    "messages": newest_first(cached_msgs, 15),
                     "banned_at": int(time.time()),
                 },
+                params={"on_conflict": "user_id"},
                 prefer="resolution=merge-duplicates,return=minimal",
             )
             if BOT_EVENT_LOGGING:
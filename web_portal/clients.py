@@ -1,20 +1,90 @@
 from __future__ import annotations
 
+import logging
+import os
+from pathlib import Path
 from typing import Optional
 
 import httpx
-from jinja2 import Environment, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+try:
+    import h2  # type: ignore  # noqa: F401  (enables HTTP/2 in httpx)
+except ImportError:  # fall back to HTTP/1.1 keep-alive if the extra isn't installed
+    h2 = None
+
+try:
+    import redis.asyncio as aioredis  # type: ignore
+except ImportError:  # shared state stays in-process without redis
+    aioredis = None
+
+from .settings import DISCORD_API_BASE, JINJA_CACHE_DIR, REDIS_URL
 
 http_client: Optional[httpx.AsyncClient] = None
 _temp_http_client: Optional[httpx.AsyncClient] = None
+discord_client: Optional[httpx.AsyncClient] = None
+_temp_discord_client: Optional[httpx.AsyncClient] = None
+redis_client = None
+
+# Sized so concurrent Discord/Supabase fan-out reuses pooled keep-alive connections.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60)
+# Discord traffic is one host hit in bursts by moderation clicks; keep its connections warm
+# across quiet minutes and fail fast when the pool is saturated instead of queueing.
+DISCORD_HTTP_LIMITS = httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=300)
+DISCORD_HTTP_TIMEOUT = httpx.Timeout(connect=5.0, read=10.0, write=10.0, pool=5.0)
+
+def _build_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    try:
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    except OSError as exc:
+        logging.warning("Jinja bytecode cache disabled (%s): %s", JINJA_CACHE_DIR, exc)
+        return None
+    return FileSystemBytecodeCache(directory=JINJA_CACHE_DIR, pattern="__jinja2_%s.cache")
+
+
+# Templates are compiled once per process: no freshness checks, no eviction.
+# Compiled bytecode is also kept on disk so restarted workers skip compilation.
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+JINJA_ENV = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    bytecode_cache=_build_bytecode_cache(),
+    autoescape=select_autoescape(default_for_string=True, default=True),
+    auto_reload=False,
+    cache_size=-1,
+)
+
+
+HTTP_USER_AGENT = "BlockSpin-Appeals/1.0"
+
 
-JINJA_ENV = Environment(autoescape=select_autoescape(default_for_string=True, default=True))
+def _build_http_client() -> httpx.AsyncClient:
+    # HTTP/2 lets bursts of Discord/Supabase calls multiplex over one TLS session per host.
+    return httpx.AsyncClient(
+        http2=h2 is not None,
+        timeout=httpx.Timeout(15.0, connect=5.0),
+        limits=HTTP_LIMITS,
+        headers={"User-Agent": HTTP_USER_AGENT},
+    )
+
+
+def _build_discord_client() -> httpx.AsyncClient:
+    # A separate pool for discord.com, so a burst of rate-limited Discord calls never
+    # holds connections that Supabase/translation requests are waiting for.
+    return httpx.AsyncClient(
+        base_url=DISCORD_API_BASE,
+        http2=h2 is not None,
+        timeout=DISCORD_HTTP_TIMEOUT,
+        limits=DISCORD_HTTP_LIMITS,
+        headers={"User-Agent": HTTP_USER_AGENT},
+    )
 
 
 async def init_http_client() -> httpx.AsyncClient:
-    global http_client
+    global http_client, discord_client
     if http_client is None:
-        http_client = httpx.AsyncClient(timeout=httpx.Timeout(15.0, connect=5.0))
+        http_client = _build_http_client()
+    if discord_client is None:
+        discord_client = _build_discord_client()
     return http_client
 
 
@@ -23,16 +93,60 @@ def get_http_client() -> httpx.AsyncClient:
         return http_client
     global _temp_http_client
     if not _temp_http_client:
-        _temp_http_client = httpx.AsyncClient(timeout=httpx.Timeout(15.0, connect=5.0))
+        _temp_http_client = _build_http_client()
     return _temp_http_client
 
 
+def get_discord_client() -> httpx.AsyncClient:
+    if discord_client:
+        return discord_client
+    global _temp_discord_client
+    if not _temp_discord_client:
+        _temp_discord_client = _build_discord_client()
+    return _temp_discord_client
+
+
 async def close_http_clients() -> None:
-    global http_client, _temp_http_client
+    global http_client, _temp_http_client, discord_client, _temp_discord_client
     if http_client:
         await http_client.aclose()
         http_client = None
     if _temp_http_client:
         await _temp_http_client.aclose()
         _temp_http_client = None
+    if discord_client:
+        await discord_client.aclose()
+        discord_client = None
+    if _temp_discord_client:
+        await _temp_discord_client.aclose()
+        _temp_discord_client = None
+
+
+async def init_redis():
+    """Connect to REDIS_URL when configured; callers fall back to in-process state when this returns None."""
+    global redis_client
+    if redis_client is not None or not REDIS_URL:
+        return redis_client
+    if aioredis is None:
+        logging.warning("REDIS_URL is set but the redis package is not installed; using in-process state.")
+        return None
+    client = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as exc:
+        logging.warning("Redis unavailable (%s); using in-process state.", exc)
+        await client.aclose()
+        return None
+    redis_client = client
+    return redis_client
+
+
+def get_redis():
+    return redis_client
+
 
+async def close_redis() -> None:
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import Request
 
-from .clients import get_http_client
-from .settings import LIBRETRANSLATE_URL
+from .clients import get_http_client, get_redis
+from .services.geo_api import fetch_ip_geo
+from .settings import LIBRETRANSLATE_URL, TRANSLATION_CACHE_MAX_ENTRIES, TRANSLATION_CACHE_TTL_SECONDS
 from .utils import get_client_ip, normalize_language
 
 
@@ -188,11 +194,30 @@ LANG_STRINGS: Dict[str, Dict[str, str]] = {
     },
 }
 
-LANG_CACHE: Dict[str, Dict[str, str]] = {}
+# Built bundles are shared by every request, so they are stored read-only.
+LANG_CACHE: Dict[str, Mapping[str, str]] = {}
+_EN_STRINGS: Mapping[str, str] = MappingProxyType(LANG_STRINGS["en"])
 # Per-text translation cache to avoid repeated network calls for the same phrase.
-TRANSLATION_CACHE: Dict[tuple[str, str, Optional[str]], str] = {}
+# Bounded LRU with a TTL so stale provider output eventually refreshes.
+TRANSLATION_CACHE: TTLCache = TTLCache(maxsize=TRANSLATION_CACHE_MAX_ENTRIES, ttl=TRANSLATION_CACHE_TTL_SECONDS)
+# In-flight lookups so concurrent misses for the same phrase share one provider call.
+_TRANSLATION_INFLIGHT: "Dict[Tuple[str, str, str], asyncio.Task[str]]" = {}
+# Shared tier when Redis is configured, so other workers reuse provider output.
+_TRANSLATION_REDIS_TTL_SECONDS = 14 * 24 * 3600
+# Circuit breaker: after repeated provider outages serve English for a cooldown
+# instead of making every page wait on timeouts. One caller probes once it lapses.
+_TRANSLATE_BREAKER = {"failures": 0, "open_until": 0.0}
+_BREAKER_FAILURE_THRESHOLD = 5
+_BREAKER_COOLDOWN_SECONDS = 30.0
+_PROVIDER_TIMEOUT_SECONDS = 4
 _LANG_CACHE_FILE = Path(__file__).resolve().parent / "lang_cache.json"
+# Fingerprint of the source strings; a persisted bundle is only reused when it was built from the same text.
+_LANG_BASE_VERSION = hashlib.blake2b(
+    repr(sorted((code, sorted(strings.items())) for code, strings in LANG_STRINGS.items())).encode("utf-8"),
+    digest_size=8,
+).hexdigest()
 _LANG_CACHE_LOCK = asyncio.Lock()
+_LANG_BUILD_LOCKS: Dict[str, asyncio.Lock] = {}
 
 # Language display metadata for UI selectors.
 LANG_META: Dict[str, Dict[str, str]] = {
@@ -203,6 +228,51 @@ LANG_META: Dict[str, Dict[str, str]] = {
     "th": {"name": "ไทย", "flag": "\U0001F1F9\U0001F1ED"},     # Thailand
 }
 
+# Country / language hints from geo lookups mapped to the languages we ship.
+_COUNTRY_LANG_MAP: Dict[str, str] = {
+    # Arabic-speaking countries
+    "sa": "ar",
+    "ae": "ar",
+    "eg": "ar",
+    "om": "ar",
+    "qa": "ar",
+    "bh": "ar",
+    "kw": "ar",
+    "ma": "ar",
+    "dz": "ar",
+    "tn": "ar",
+    "jo": "ar",
+    "iq": "ar",
+    "ye": "ar",
+    "ly": "ar",
+    "ps": "ar",
+    "lb": "ar",
+    "sy": "ar",
+    "sd": "ar",
+    # Spanish-speaking
+    "es": "es",
+    "mx": "es",
+    "ar": "es",
+    "cl": "es",
+    "co": "es",
+    "pe": "es",
+    "pr": "es",
+    "uy": "es",
+    "py": "es",
+    "bo": "es",
+    "do": "es",
+    "gt": "es",
+    "sv": "es",
+    "hn": "es",
+    "ni": "es",
+    "cr": "es",
+    "pa": "es",
+    "ve": "es",
+    "ec": "es",
+    # Thai
+    "th": "th",
+}
+
 
 def _load_lang_cache_from_disk() -> None:
     """Warm the in-memory language cache from disk so we don't re-translate on restart."""
@@ -210,25 +280,48 @@ def _load_lang_cache_from_disk() -> None:
         if not _LANG_CACHE_FILE.exists():
             return
         data = json.loads(_LANG_CACHE_FILE.read_text(encoding="utf-8") or "{}")
-        if isinstance(data, dict):
-            for code, strings in data.items():
+        if not isinstance(data, dict) or data.get("version") != _LANG_BASE_VERSION:
+            # Built from older source strings (or the legacy unversioned layout); retranslate lazily.
+            return
+        languages = data.get("languages")
+        if isinstance(languages, dict):
+            for code, strings in languages.items():
                 if isinstance(strings, dict):
-                    LANG_CACHE[normalize_language(code)] = strings
+                    LANG_CACHE[normalize_language(code)] = MappingProxyType(strings)
     except Exception as exc:
         logging.warning("Failed to load language cache: %s", exc)
 
 
-async def _persist_lang_cache() -> None:
+def _write_lang_cache_file(text: str) -> None:
+    # Write-then-rename so other workers never read a half-written bundle.
+    tmp_path = _LANG_CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, _LANG_CACHE_FILE)
+
+
+# Set when LANG_CACHE gained a bundle that isn't on disk yet. While warm_language_cache runs,
+# writes are deferred so building N languages rewrites the file once instead of N times.
+_lang_cache_dirty = False
+_defer_lang_cache_persist = False
+
+
+async def persist_lang_cache() -> None:
     """Persist merged language strings to disk so future visitors skip translation API calls."""
+    global _lang_cache_dirty
+    if not _lang_cache_dirty:
+        return
     try:
         async with _LANG_CACHE_LOCK:
-            payload = {code: strings for code, strings in LANG_CACHE.items()}
+            _lang_cache_dirty = False
+            payload = {
+                "version": _LANG_BASE_VERSION,
+                "languages": {code: dict(strings) for code, strings in LANG_CACHE.items()},
+            }
             text = json.dumps(payload, ensure_ascii=False, indent=2)
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None, lambda: _LANG_CACHE_FILE.write_text(text, encoding="utf-8")
-            )
+            await loop.run_in_executor(None, _write_lang_cache_file, text)
     except Exception as exc:
+        _lang_cache_dirty = True  # retried on the next build or at shutdown
         logging.warning("Failed to persist language cache: %s", exc)
 
 
@@ -240,10 +333,99 @@ async def translate_text(text: str, target_lang: str = "en", source_lang: Option
     source_lang = normalize_language(source_lang) if source_lang else None
     if not text or (target_lang == "en" and source_lang == "en"):
         return text
-    cache_key = (text, target_lang, source_lang or "auto")
+    # Key by digest so long appeal texts are not held twice in memory.
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    cache_key = (digest, target_lang, source_lang or "auto")
     cached = TRANSLATION_CACHE.get(cache_key)
     if cached:
         return cached
+    pending = _TRANSLATION_INFLIGHT.get(cache_key)
+    if pending is None:
+        pending = asyncio.create_task(_translate_uncached(text, digest, cache_key, target_lang, source_lang))
+        _TRANSLATION_INFLIGHT[cache_key] = pending
+        pending.add_done_callback(lambda _: _TRANSLATION_INFLIGHT.pop(cache_key, None))
+    # Shielded so one caller's cancellation doesn't abort the lookup for the others.
+    return await asyncio.shield(pending)
+
+
+async def _translate_uncached(
+    text: str,
+    digest: str,
+    cache_key: Tuple[str, str, str],
+    target_lang: str,
+    source_lang: Optional[str],
+) -> str:
+    redis_key = f"translate:v1:{digest}:{cache_key[2]}:{target_lang}"
+    translated = await _redis_get_translation(redis_key)
+    if translated is None:
+        # Only the provider call is gated: cached output stays available while the breaker is open.
+        if not _breaker_allows_call():
+            return text
+        translated = await _fetch_translation(text, target_lang, source_lang)
+        _record_breaker_result(translated is not None)
+        if translated is not None:
+            await _redis_set_translation(redis_key, translated)
+    if translated is not None:
+        TRANSLATION_CACHE[cache_key] = translated
+    return translated if translated is not None else text
+
+
+def _breaker_is_open() -> bool:
+    return _TRANSLATE_BREAKER["open_until"] > time.monotonic()
+
+
+def translation_degraded() -> bool:
+    """True while the translation providers are short-circuited and text falls back to English."""
+    return _breaker_is_open()
+
+
+def _breaker_allows_call() -> bool:
+    open_until = _TRANSLATE_BREAKER["open_until"]
+    if not open_until:
+        return True
+    now = time.monotonic()
+    if open_until > now:
+        return False
+    # Half-open: let this caller probe and keep everyone else short-circuited meanwhile.
+    _TRANSLATE_BREAKER["open_until"] = now + _BREAKER_COOLDOWN_SECONDS
+    return True
+
+
+def _record_breaker_result(ok: bool) -> None:
+    if ok:
+        _TRANSLATE_BREAKER["failures"] = 0
+        _TRANSLATE_BREAKER["open_until"] = 0.0
+        return
+    _TRANSLATE_BREAKER["failures"] += 1
+    if _TRANSLATE_BREAKER["open_until"] or _TRANSLATE_BREAKER["failures"] >= _BREAKER_FAILURE_THRESHOLD:
+        _TRANSLATE_BREAKER["failures"] = 0
+        _TRANSLATE_BREAKER["open_until"] = time.monotonic() + _BREAKER_COOLDOWN_SECONDS
+        logging.warning("Translation providers failing; serving English for %ss", _BREAKER_COOLDOWN_SECONDS)
+
+
+async def _redis_get_translation(key: str) -> Optional[str]:
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        return await redis.get(key)
+    except Exception as exc:
+        logging.warning("Translation cache read failed: %s", exc)
+        return None
+
+
+async def _redis_set_translation(key: str, value: str) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.set(key, value, ex=_TRANSLATION_REDIS_TTL_SECONDS)
+    except Exception as exc:
+        logging.warning("Translation cache write failed: %s", exc)
+
+
+async def _fetch_translation(text: str, target_lang: str, source_lang: Optional[str]) -> Optional[str]:
+    """Try each provider in turn; returns None when all of them fail."""
     # Try primary provider
     providers = [
         ("gtx", "https://translate.googleapis.com/translate_a/single"),
@@ -261,25 +443,22 @@ async def translate_text(text: str, target_lang: str = "en", source_lang: Option
                     "dt": "t",
                     "q": text,
                 }
-                resp = await client.get(url, params=params, timeout=8)
+                resp = await client.get(url, params=params, timeout=_PROVIDER_TIMEOUT_SECONDS)
                 if resp.status_code == 200:
                     data = resp.json()
                     # Google translate API style response: [[["translated","original",...]],...]
                     if data and isinstance(data, list) and data[0] and data[0][0]:
-                        translated = data[0][0][0] or text
-                        TRANSLATION_CACHE[cache_key] = translated
-                        return translated
+                        return data[0][0][0] or text
             elif name == "mymemory":
                 params = {
                     "q": text,
                     "langpair": f"{source_lang or 'auto'}|{target_lang}",
                 }
-                resp = await client.get(url, params=params, timeout=8)
+                resp = await client.get(url, params=params, timeout=_PROVIDER_TIMEOUT_SECONDS)
                 if resp.status_code == 200:
                     data = resp.json() or {}
                     translated = (data.get("responseData") or {}).get("translatedText")
                     if translated:
-                        TRANSLATION_CACHE[cache_key] = translated
                         return translated
             else:
                 resp = await client.post(
@@ -291,120 +470,116 @@ async def translate_text(text: str, target_lang: str = "en", source_lang: Option
                         "format": "text",
                     },
                     headers={"Content-Type": "application/json"},
-                    timeout=8,
+                    timeout=_PROVIDER_TIMEOUT_SECONDS,
                 )
                 if resp.status_code == 200:
                     data = resp.json()
-                    translated = data.get("translatedText") or text
-                    TRANSLATION_CACHE[cache_key] = translated
-                    return translated
+                    return data.get("translatedText") or text
             logging.warning("Translation failed provider=%s status=%s body=%s", name, resp.status_code, resp.text)
         except Exception as exc:
             logging.warning("Translation exception provider=%s error=%s", name, exc)
-    return text
+    return None
 
 
-async def get_strings(lang: str) -> Dict[str, str]:
+async def get_strings(lang: str) -> Mapping[str, str]:
+    """Read-only strings for a language; per-request values (e.g. the user chip) are passed separately."""
+    global _lang_cache_dirty
     lang = normalize_language(lang)
     base = LANG_STRINGS["en"]
     if lang in LANG_CACHE:
         return LANG_CACHE[lang]
     if lang == "en":
-        return base
-
-    # If we have a partial manual translation, merge and fill gaps automatically.
-    manual = LANG_STRINGS.get(lang)
-    merged: Dict[str, str] = dict(base)
-    if manual:
-        merged.update(manual)
-        missing_keys = [key for key in base.keys() if key not in manual]
-    else:
-        missing_keys = list(base.keys())
-
-    for key in missing_keys:
-        try:
-            merged[key] = await translate_text(base[key], target_lang=lang, source_lang="en")
-        except Exception:
-            merged[key] = merged.get(key, base[key])
+        return _EN_STRINGS
+
+    # One build per language: concurrent first hits wait for the same bundle.
+    lock = _LANG_BUILD_LOCKS.setdefault(lang, asyncio.Lock())
+    async with lock:
+        if lang in LANG_CACHE:
+            return LANG_CACHE[lang]
+
+        # If we have a partial manual translation, merge and fill gaps automatically.
+        manual = LANG_STRINGS.get(lang)
+        merged: Dict[str, str] = dict(base)
+        if manual:
+            merged.update(manual)
+            missing_keys = [key for key in base.keys() if key not in manual]
+        else:
+            missing_keys = list(base.keys())
+
+        # Translate all missing keys concurrently instead of one round-trip per key.
+        results = await asyncio.gather(
+            *(translate_text(base[key], target_lang=lang, source_lang="en") for key in missing_keys),
+            return_exceptions=True,
+        )
+        for key, translated in zip(missing_keys, results):
+            if isinstance(translated, str):
+                merged[key] = translated
+
+        if _breaker_is_open():
+            # Don't pin English fallbacks; the bundle is rebuilt once providers recover.
+            _LANG_BUILD_LOCKS.pop(lang, None)
+            return merged
+        bundle = LANG_CACHE[lang] = MappingProxyType(merged)
+        _lang_cache_dirty = True
+        if not _defer_lang_cache_persist:
+            await persist_lang_cache()
+    _LANG_BUILD_LOCKS.pop(lang, None)
+    return bundle
+
 
-    LANG_CACHE[lang] = merged
-    await _persist_lang_cache()
-    return merged
+async def warm_language_cache() -> None:
+    """Build every switcher language in the background so first visitors don't wait on translation."""
+    global _defer_lang_cache_persist
+    _defer_lang_cache_persist = True
+    try:
+        await asyncio.gather(*(get_strings(code) for code in LANG_META), return_exceptions=True)
+    finally:
+        _defer_lang_cache_persist = False
+    await persist_lang_cache()
 
 
 async def detect_language(request: Request, lang_param: Optional[str] = None) -> str:
     if lang_param:
-        return normalize_language(lang_param)
+        lang = normalize_language(lang_param)
+        request.state.lang = lang
+        return lang
+    # Middleware, routes and error handlers can all ask; resolve once per request.
+    cached = getattr(request.state, "lang", None)
+    if cached:
+        return cached
+    lang = await _detect_language(request)
+    request.state.lang = lang
+    return lang
+
+
+# Browsers set to one of our non-English languages are answered from the header alone;
+# English is the default for too many browsers to outrank the geo hint.
+_ACCEPT_FAST_PATH = frozenset(code for code in LANG_META if code != "en")
+
+
+async def _detect_language(request: Request) -> str:
     cookie_lang = request.cookies.get("lang")
     if cookie_lang:
         return normalize_language(cookie_lang)
 
     accept = request.headers.get("accept-language", "")
-    accept_lang = normalize_language(accept.split(",")[0].strip()) if accept else None
+    accept_lang = normalize_language(accept) if accept else None
+    if accept_lang in _ACCEPT_FAST_PATH:
+        return accept_lang
     ip_lang: Optional[str] = None
 
-    ip = get_client_ip(request)
-    if ip and ip not in {"127.0.0.1", "::1", "unknown"}:
-        try:
-            client = get_http_client()
-            resp = await client.get(f"https://ipapi.co/{ip}/json/", timeout=3)
-            if resp.status_code == 200:
-                data = resp.json() or {}
-                cc_lang_map = {
-                    # Arabic-speaking countries
-                    "sa": "ar",
-                    "ae": "ar",
-                    "eg": "ar",
-                    "om": "ar",
-                    "qa": "ar",
-                    "bh": "ar",
-                    "kw": "ar",
-                    "ma": "ar",
-                    "dz": "ar",
-                    "tn": "ar",
-                    "jo": "ar",
-                    "iq": "ar",
-                    "ye": "ar",
-                    "ly": "ar",
-                    "ps": "ar",
-                    "lb": "ar",
-                    "sy": "ar",
-                    "sd": "ar",
-                    # Spanish-speaking
-                    "es": "es",
-                    "mx": "es",
-                    "ar": "es",
-                    "cl": "es",
-                    "co": "es",
-                    "pe": "es",
-                    "pr": "es",
-                    "uy": "es",
-                    "py": "es",
-                    "bo": "es",
-                    "do": "es",
-                    "gt": "es",
-                    "sv": "es",
-                    "hn": "es",
-                    "ni": "es",
-                    "cr": "es",
-                    "pa": "es",
-                    "ve": "es",
-                    "ec": "es",
-                    # Thai
-                    "th": "th",
-                }
-                langs = data.get("languages")
-                if langs:
-                    lang_candidate = normalize_language(langs.split(",")[0])
-                    mapped = cc_lang_map.get(lang_candidate)
-                    ip_lang = mapped or lang_candidate
-                cc = data.get("country_code")
-                if cc:
-                    cc_norm = cc.lower()
-                    mapped = cc_lang_map.get(cc_norm)
-                    ip_lang = mapped or normalize_language(cc_norm)
-        except Exception as exc:
-            logging.warning("Geo lookup failed for ip=%s error=%s", ip, exc)
+    data = await fetch_ip_geo(get_client_ip(request))
+    if data:
+        langs = data.get("languages")
+        if langs:
+            lang_candidate = normalize_language(langs.split(",")[0])
+            mapped = _COUNTRY_LANG_MAP.get(lang_candidate)
+            ip_lang = mapped or lang_candidate
+        cc = data.get("country_code")
+        if cc:
+            cc_norm = cc.lower()
+            mapped = _COUNTRY_LANG_MAP.get(cc_norm)
+            ip_lang = mapped or normalize_language(cc_norm)
     if ip_lang:
         return normalize_language(ip_lang)
     if accept_lang:
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import logging
+import time
+from urllib.parse import parse_qs
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import state
+from .i18n import detect_language, get_strings
+from .services.supabase import get_portal_flag
+from .settings import SESSION_COOKIE_NAME
+from .ui import render_error
+from .utils import OrjsonResponse, wants_html
+
+logger = logging.getLogger("web_portal.access")
+
+# Added to every response unless the handler already set the header; names are lower-case
+# so they can be compared against the raw ASGI header list directly.
+SECURITY_HEADERS = (
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"referrer-policy", b"no-referrer"),
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+    (b"cross-origin-opener-policy", b"same-origin"),
+    (b"cross-origin-embedder-policy", b"require-corp"),
+    (b"cross-origin-resource-policy", b"same-origin"),
+)
+_CLEAR_SESSION_COOKIE = (
+    b"set-cookie",
+    f'{SESSION_COOKIE_NAME}=""; expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0; Path=/; SameSite=lax'.encode(),
+)
+
+
+class TimingMiddleware:
+    """Pure ASGI request timer: adds an x-response-time header and logs the duration."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter_ns()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                duration_ms = (time.perf_counter_ns() - started) / 1e6
+                message.setdefault("headers", []).append((b"x-response-time", f"{duration_ms:.2f}ms".encode()))
+                path = scope.get("path", "")
+                # Static assets are high-volume and uninteresting; keep them out of INFO logs.
+                level = logging.DEBUG if path.startswith("/static") else logging.INFO
+                if logger.isEnabledFor(level):
+                    logger.log(level, "%s %s -> %s in %.2fms", scope.get("method"), path, message.get("status"), duration_ms)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI: append SECURITY_HEADERS to the response start message, and clear the
+    session cookie when a handler set request.state.force_logout."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = message.setdefault("headers", [])
+                present = {name.lower() for name, _ in headers}
+                headers.extend(header for header in SECURITY_HEADERS if header[0] not in present)
+                if scope.get("state", {}).get("force_logout"):
+                    headers.append(_CLEAR_SESSION_COOKIE)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class MaintenanceGateMiddleware:
+    """Pure ASGI: answer 503 for everything but /static while the portal's "unavailable" flag is set.
+
+    Being pure ASGI, open responses pass through untouched, so GZipMiddleware still
+    sees their Content-Length and leaves small bodies uncompressed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Allow static assets through so the error page can render properly.
+        if scope["type"] != "http" or scope["path"].startswith("/static"):
+            await self.app(scope, receive, send)
+            return
+
+        unavailable_flag = await get_portal_flag("unavailable", None)
+        is_unavailable = False
+        if isinstance(unavailable_flag, bool):
+            is_unavailable = unavailable_flag
+        elif isinstance(unavailable_flag, str):
+            is_unavailable = unavailable_flag.strip().lower() == "true"
+        if not is_unavailable:
+            await self.app(scope, receive, send)
+            return
+
+        announcement = await get_portal_flag("announcement", None) or getattr(state, "_announcement_text", None)
+        message = "The appeals portal is currently unavailable."
+        if announcement:
+            message = f"{message} {announcement}"
+
+        request = Request(scope, receive)
+        response: Response
+        if wants_html(request):
+            lang = await detect_language(request)
+            strings = await get_strings(lang)
+            response = render_error("Portal unavailable", message, status_code=503, lang=lang, strings=strings)
+        else:
+            response = OrjsonResponse(status_code=503, content={"detail": message})
+        await response(scope, receive, send)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with Cache-Control: versioned URLs (?v=...) are immutable, the rest cache briefly."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            if query.get("v"):
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            else:
+                response.headers["Cache-Control"] = "public, max-age=3600"
+        return response
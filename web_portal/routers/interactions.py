@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-import copy
 import logging
+import re
+import time
 from typing import Optional, Tuple, Dict, Callable, Coroutine, Any
 
+import orjson
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
 
-from ..services import appeal_db, roblox_api
+from ..services import appeal_db, kv, roblox_api
 from ..services.discord_api import (
     add_user_to_guild,
     dm_user,
@@ -17,10 +18,11 @@ from ..services.discord_api import (
     remove_from_target_guild,
     unban_user_from_guild,
     delete_message,
-    post_channel_message,
+    queue_log_embed,
 )
+from ..services.live_events import publish_status
 from ..services.interactions import respond_ephemeral_embed, update_message, verify_signature
-from ..services.supabase import fetch_appeal_record, update_appeal_status, update_staff_stats, fetch_reports_for_roblox_id
+from ..services.supabase import fetch_appeal_record, invalidate_appeal_history, update_appeal_status, update_staff_stats, fetch_reports_for_roblox_id
 from ..settings import (
     DISCORD_MODERATOR_ROLE_ID,
     READD_GUILD_ID,
@@ -28,31 +30,75 @@ from ..settings import (
     ROBLOX_INITIAL_MODERATOR_ROLE_ID,
     TARGET_GUILD_ID,
 )
-from ..state import _appeal_locked, _declined_users
-from ..i18n import translate_text
-from ..utils import normalize_language
+from ..i18n import LANG_META, translate_text, translation_degraded
+from ..state import _background_tasks, _processed_appeals
+from ..utils import OrjsonResponse, normalize_language
 
 router = APIRouter()
 FINAL_LOG_CHANNEL_ID = "1353445286457901106"
 
+# A decision message is handled once; repeat clicks inside this window are ignored.
+PROCESSED_APPEAL_TTL_SECONDS = 3600
+
+
+def _claim_local(message_id: str) -> bool:
+    # No awaits, so the check-and-insert cannot interleave with another click on this worker.
+    now = time.monotonic()
+    # Entries are in claim order, so expired ones are all at the front.
+    while _processed_appeals:
+        if now - next(iter(_processed_appeals.values())) <= PROCESSED_APPEAL_TTL_SECONDS:
+            break
+        _processed_appeals.popitem(last=False)
+    if message_id in _processed_appeals:
+        return False
+    _processed_appeals[message_id] = now
+    return True
+
+
+async def _claim_appeal_message(message_id: str) -> bool:
+    """Record message_id as being handled; False if another click already claimed it.
+
+    Repeat clicks on this worker are rejected locally; with Redis, a SET NX also
+    stops a second worker from handling the same message.
+    """
+    if not _claim_local(message_id):
+        return False
+    if not await kv.claim_across_workers(f"appeal_msg:{message_id}", PROCESSED_APPEAL_TTL_SECONDS):
+        _processed_appeals.pop(message_id, None)
+        return False
+    return True
+
+
+async def _release_appeal_message(message_id: str) -> None:
+    """Drop a claim so the action can be retried."""
+    _processed_appeals.pop(message_id, None)
+    await kv.release_claim(f"appeal_msg:{message_id}")
+
+
 # --- Helper Functions ---
 
+# {status: (label, color)} shared by the updated review embed and the decision log embed.
+_DECISION_STYLES: Dict[str, Tuple[str, int]] = {
+    "accepted": ("Accepted", 0x2ECC71),
+    "declined": ("Declined", 0xE74C3C),
+    "forwarded": ("Forwarded for Final Review", 0x3498DB),
+}
+_UNKNOWN_STYLE = ("Unknown", 0x95A5A6)
+_REPLACED_FIELDS = frozenset({"Action Taken", "Notes"})
+
+
 def create_updated_embed(
     original_embed: dict, status: str, moderator_id: str, note: Optional[str] = None
 ) -> dict:
     """Creates an updated embed reflecting the moderation action."""
-    embed = copy.deepcopy(original_embed)
-    status_map = {
-        "accepted": ("Accepted", 0x2ECC71),
-        "declined": ("Declined", 0xE74C3C),
-        "forwarded": ("Forwarded for Final Review", 0x3498DB),
-    }
-    label, color = status_map.get(status, ("Unknown", 0x95A5A6))
+    # Only top-level keys are replaced and "fields" is rebuilt below, so a shallow copy suffices.
+    embed = dict(original_embed)
+    label, color = _DECISION_STYLES.get(status, _UNKNOWN_STYLE)
 
     embed["title"] = f"{embed.get('title', 'Appeal')} ({label.upper()})"
     embed["color"] = color
     
-    embed["fields"] = [f for f in embed.get("fields", []) if f.get("name") not in ("Action Taken", "Notes")]
+    embed["fields"] = [f for f in embed.get("fields", []) if f.get("name") not in _REPLACED_FIELDS]
     
     embed["fields"].append({"name": "Action Taken", "value": f"{label} by <@{moderator_id}>", "inline": False})
     if note:
@@ -61,6 +107,21 @@ def create_updated_embed(
     return embed
 
 
+def build_log_embed(
+    title: str, description: str, status: str, mod_id: str, mod_name: str, dm_delivered: Optional[bool] = None
+) -> dict:
+    """Decision embed for the final log channel, styled like the updated review embed."""
+    fields = [{"name": "Moderator", "value": f"<@{mod_id}> ({mod_name})", "inline": False}]
+    if dm_delivered is not None:
+        fields.append({"name": "DM delivered", "value": str(dm_delivered), "inline": True})
+    return {
+        "title": title,
+        "description": description,
+        "color": _DECISION_STYLES.get(status, _UNKNOWN_STYLE)[1],
+        "fields": fields,
+    }
+
+
 def _extract_evidence_links(reports: Optional[list]) -> list:
     """Extract only URL tokens from report evidence strings."""
     links = []
@@ -94,6 +155,79 @@ async def _translate_for_embed(text: Optional[str], lang_hint: Optional[str] = N
         return translated, True
     return translated, False
 
+ACCEPT_DM_EN = "Your appeal has been reviewed and accepted. You have been unbanned and re-added to the server."
+DECLINE_DM_EN = "Your appeal has been reviewed and declined. Further appeals are blocked for this ban."
+
+# Decision DMs are fixed strings, so each language is translated once: {(text_en, lang): text}.
+_DECISION_DM_TRANSLATIONS: Dict[Tuple[str, str], str] = {}
+
+
+async def _localized_desc(text_en: str, lang: str) -> str:
+    """User-facing DM text in the appeal's language."""
+    if lang == "en":
+        return text_en
+    cached = _DECISION_DM_TRANSLATIONS.get((text_en, lang))
+    if cached is not None:
+        return cached
+    translated = await translate_text(text_en, target_lang=lang, source_lang="en")
+    # English fallbacks from a tripped provider are not memoized.
+    if translated and translated != text_en and not translation_degraded():
+        _DECISION_DM_TRANSLATIONS[(text_en, lang)] = translated
+    return translated
+
+
+async def warm_decision_translations() -> None:
+    """Translate the decision DMs for every shipped language ahead of the first click."""
+    await asyncio.gather(
+        *(_localized_desc(text, lang) for text in (ACCEPT_DM_EN, DECLINE_DM_EN) for lang in LANG_META if lang != "en"),
+        return_exceptions=True,
+    )
+
+
+async def _unban_and_readd(user_id: str) -> Tuple[bool, bool]:
+    # Sequential on purpose: the re-add guild can be the guild the user is banned from.
+    unban_success = await unban_user_from_guild(user_id, TARGET_GUILD_ID)
+    readd_success = await add_user_to_guild(user_id, READD_GUILD_ID)
+    return unban_success, readd_success
+
+
+def _status_changed(internal_user_id: Optional[str], appeal_id, status: str) -> None:
+    invalidate_appeal_history(internal_user_id)
+    publish_status(internal_user_id, appeal_id, status)
+
+
+async def _run_followup(coro: Coroutine[Any, Any, Any], what: str) -> None:
+    try:
+        await coro
+    except Exception:
+        logging.exception("Background %s failed", what)
+
+
+def _schedule_followup(coro: Coroutine[Any, Any, Any], what: str) -> None:
+    """Run post-decision bookkeeping after the interaction has been answered."""
+    task = asyncio.create_task(_run_followup(coro, what))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _finalize_discord_decision(
+    appeal_id: str,
+    status: str,
+    mod_id: str,
+    mod_name: str,
+    user_id: str,
+    internal_user_id: str,
+    dm_delivered: bool,
+    created_at: Optional[str],
+) -> None:
+    await asyncio.gather(
+        maybe_remove_from_dm_guild(user_id),
+        update_appeal_status(appeal_id, status, mod_id, dm_delivered=dm_delivered),
+        update_staff_stats(mod_id, mod_name, accepted=status == "accepted", created_at=created_at),
+    )
+    _status_changed(internal_user_id, appeal_id, status)
+
+
 # --- Roblox Appeal Handlers ---
 
 async def handle_roblox_initial_accept(parts: list, mod_id: str, mod_name: str, embed: dict, payload: dict) -> Tuple[dict, Optional[str], Optional[dict]]:
@@ -105,6 +239,7 @@ async def handle_roblox_initial_accept(parts: list, mod_id: str, mod_name: str,
         return embed, "This appeal has already been processed."
 
     await appeal_db.update_roblox_appeal_moderation_status(appeal_id, "pending_elevation", mod_id, mod_name)
+    _status_changed(appeal.get("internal_user_id"), appeal_id, "pending_elevation")
 
     reports = await fetch_reports_for_roblox_id(appeal["roblox_id"], limit=25)
     evidence_links = _extract_evidence_links(reports)
@@ -128,6 +263,7 @@ async def handle_roblox_initial_accept(parts: list, mod_id: str, mod_name: str,
 
     return create_updated_embed(embed, "forwarded", mod_id, "Forwarded for final review."), None, None
 
+
 async def handle_roblox_initial_decline(parts: list, mod_id: str, mod_name: str, embed: dict, payload: dict) -> Tuple[dict, Optional[str], Optional[dict]]:
     appeal_id = int(parts[1])
     appeal = await appeal_db.get_roblox_appeal_by_id(appeal_id)
@@ -138,7 +274,8 @@ async def handle_roblox_initial_decline(parts: list, mod_id: str, mod_name: str,
 
     await appeal_db.update_roblox_appeal_moderation_status(appeal_id, "declined", mod_id, mod_name, is_active=False)
     if appeal.get("internal_user_id"):
-        _appeal_locked[appeal["internal_user_id"]] = True
+        await kv.appeal_locked.set(appeal["internal_user_id"])
+    _status_changed(appeal.get("internal_user_id"), appeal_id, "declined")
     
     if appeal.get("discord_user_id"):
         await dm_user(appeal["discord_user_id"], {"title": "Roblox Appeal Declined", "description": "Your appeal has been reviewed and declined.", "color": 0xE74C3C})
@@ -151,6 +288,7 @@ async def handle_roblox_initial_decline(parts: list, mod_id: str, mod_name: str,
         
     return create_updated_embed(embed, "declined", mod_id), None, None
 
+
 async def handle_roblox_final_accept(parts: list, mod_id: str, mod_name: str, embed: dict, payload: dict) -> Tuple[dict, Optional[str], Optional[dict]]:
     appeal_id = int(parts[1])
     appeal = await appeal_db.get_roblox_appeal_by_id(appeal_id)
@@ -159,25 +297,31 @@ async def handle_roblox_final_accept(parts: list, mod_id: str, mod_name: str, em
     if appeal["status"] != "pending_elevation":
         return embed, "This appeal is not pending final review."
 
-    reports = await fetch_reports_for_roblox_id(appeal["roblox_id"], limit=25)
+    # Evidence and the translated appeal are only needed for the log embed; fetch them during the unban.
+    unban_success, reports, (translated_reason, was_translated) = await asyncio.gather(
+        roblox_api.unban_user(appeal["roblox_id"]),
+        fetch_reports_for_roblox_id(appeal["roblox_id"], limit=25),
+        _translate_for_embed(appeal.get("appeal_text")),
+    )
+    if not unban_success:
+        return create_updated_embed(embed, "declined", mod_id, "Failed to unban from Roblox via API."), "Roblox API unban failed."
     evidence_links = _extract_evidence_links(reports)
     evidence_text = "\n".join(evidence_links[:8]) if evidence_links else "No evidence links found."
     discord_label = f"<@{appeal.get('discord_user_id')}>" if appeal.get("discord_user_id") else "Not linked"
 
-    unban_success = await roblox_api.unban_user(appeal["roblox_id"])
-    if not unban_success:
-        return create_updated_embed(embed, "declined", mod_id, "Failed to unban from Roblox via API."), "Roblox API unban failed."
-
-    await appeal_db.update_roblox_appeal_moderation_status(appeal_id, "accepted", mod_id, mod_name, is_active=False)
+    writes = [
+        appeal_db.update_roblox_appeal_moderation_status(appeal_id, "accepted", mod_id, mod_name, is_active=False),
+        update_staff_stats(mod_id, mod_name, accepted=True, created_at=appeal.get("created_at")),
+    ]
     if appeal.get("internal_user_id"):
-        _appeal_locked[appeal["internal_user_id"]] = True
-    await update_staff_stats(mod_id, mod_name, accepted=True, created_at=appeal.get("created_at"))
+        writes.append(kv.appeal_locked.set(appeal["internal_user_id"]))
+    await asyncio.gather(*writes)
+    _status_changed(appeal.get("internal_user_id"), appeal_id, "accepted")
     
     if appeal.get("discord_user_id"):
         await dm_user(appeal["discord_user_id"], {"title": "Roblox Appeal Accepted", "description": "Your Roblox appeal has been accepted and you have been unbanned.", "color": 0x2ECC71})
         await maybe_remove_from_dm_guild(appeal["discord_user_id"])
         
-    translated_reason, was_translated = await _translate_for_embed(appeal.get("appeal_text"))
     desc = (
         f"**Appealing Player:** {appeal['roblox_username']} ({appeal['roblox_id']})\n"
         f"**Discord:** {discord_label}\n"
@@ -185,14 +329,9 @@ async def handle_roblox_final_accept(parts: list, mod_id: str, mod_name: str, em
         f"**Appeal:** {'[Translated] ' if was_translated else ''}{translated_reason}"
     )
 
-    log_embed = {
-        "title": f"Roblox Appeal Accepted ({appeal_id})",
-        "description": desc + f"\n**Evidence:** {evidence_text}",
-        "color": 0x2ECC71,
-        "fields": [
-            {"name": "Moderator", "value": f"<@{mod_id}> ({mod_name})", "inline": False},
-        ],
-    }
+    log_embed = build_log_embed(
+        f"Roblox Appeal Accepted ({appeal_id})", desc + f"\n**Evidence:** {evidence_text}", "accepted", mod_id, mod_name
+    )
     meta = {
         "delete_message": True,
         "ephemeral": "Appeal accepted, user unbanned, and review message removed.",
@@ -201,6 +340,7 @@ async def handle_roblox_final_accept(parts: list, mod_id: str, mod_name: str, em
     }
     return create_updated_embed(embed, "accepted", mod_id, "User unbanned from Roblox."), None, meta
 
+
 async def handle_roblox_final_decline(parts: list, mod_id: str, mod_name: str, embed: dict, payload: dict) -> Tuple[dict, Optional[str], Optional[dict]]:
     appeal_id = int(parts[1])
     appeal = await appeal_db.get_roblox_appeal_by_id(appeal_id)
@@ -211,7 +351,8 @@ async def handle_roblox_final_decline(parts: list, mod_id: str, mod_name: str, e
 
     await appeal_db.update_roblox_appeal_moderation_status(appeal_id, "declined", mod_id, mod_name, is_active=False)
     if appeal.get("internal_user_id"):
-        _appeal_locked[appeal["internal_user_id"]] = True
+        await kv.appeal_locked.set(appeal["internal_user_id"])
+    _status_changed(appeal.get("internal_user_id"), appeal_id, "declined")
     await update_staff_stats(mod_id, mod_name, accepted=False, created_at=appeal.get("created_at"))
     
     if appeal.get("discord_user_id"):
@@ -221,6 +362,7 @@ async def handle_roblox_final_decline(parts: list, mod_id: str, mod_name: str, e
     meta = {"delete_message": True, "ephemeral": "Appeal declined and review message removed."}
     return create_updated_embed(embed, "declined", mod_id), None, meta
 
+
 # --- Discord Appeal Handlers (Legacy) ---
 
 async def handle_discord_accept(parts: list, mod_id: str, mod_name: str, embed: dict, payload: dict) -> Tuple[dict, Optional[str], Optional[dict]]:
@@ -229,35 +371,34 @@ async def handle_discord_accept(parts: list, mod_id: str, mod_name: str, embed:
     user_lang = normalize_language((appeal_record or {}).get("user_lang", "en"))
     internal_user_id = (appeal_record or {}).get("internal_user_id") or user_id
     
-    unban_success = await unban_user_from_guild(user_id, TARGET_GUILD_ID)
-    readd_success = await add_user_to_guild(user_id, READD_GUILD_ID)
-    
-    accept_desc_en = "Your appeal has been reviewed and accepted. You have been unbanned and re-added to the server."
-    accept_desc = await translate_text(accept_desc_en, target_lang=user_lang) if user_lang != "en" else accept_desc_en
-    dm_delivered = await dm_user(user_id, {"title": "Appeal Accepted", "description": accept_desc, "color": 0x2ECC71})
-    await maybe_remove_from_dm_guild(user_id)
-
-    await update_appeal_status(appeal_id, "accepted", mod_id, dm_delivered=dm_delivered)
-    _appeal_locked[internal_user_id] = True
-    await update_staff_stats(mod_id, mod_name, accepted=True, created_at=(appeal_record or {}).get("created_at"))
+    # Translations only need the record, so they run while Discord processes the unban.
+    (unban_success, readd_success), accept_desc, (translated_reason, was_translated) = await asyncio.gather(
+        _unban_and_readd(user_id),
+        _localized_desc(ACCEPT_DM_EN, user_lang),
+        _translate_for_embed((appeal_record or {}).get("appeal_reason"), user_lang),
+    )
+    dm_delivered, _ = await asyncio.gather(
+        dm_user(user_id, {"title": "Appeal Accepted", "description": accept_desc, "color": 0x2ECC71}),
+        kv.appeal_locked.set(internal_user_id),
+    )
+    _schedule_followup(
+        _finalize_discord_decision(
+            appeal_id, "accepted", mod_id, mod_name, user_id, internal_user_id, dm_delivered,
+            (appeal_record or {}).get("created_at"),
+        ),
+        f"finalize of appeal {appeal_id}",
+    )
     
     note = f"Unban {'OK' if unban_success else 'Fail'}; Re-add {'OK' if readd_success else 'Fail'}; DM {'OK' if dm_delivered else 'Fail'}."
-    translated_reason, was_translated = await _translate_for_embed((appeal_record or {}).get("appeal_reason"), user_lang)
     description = (
         f"**User:** <@{user_id}> ({user_id})\n"
         f"**Ban reason:** {(appeal_record or {}).get('ban_reason') or 'N/A'}\n"
         f"**Appeal:** {'[Translated] ' if was_translated else ''}{translated_reason}"
     )
 
-    log_embed = {
-        "title": f"Discord Appeal Accepted ({appeal_id})",
-        "description": description,
-        "color": 0x2ECC71,
-        "fields": [
-            {"name": "Moderator", "value": f"<@{mod_id}> ({mod_name})", "inline": False},
-            {"name": "DM delivered", "value": str(dm_delivered), "inline": True},
-        ],
-    }
+    log_embed = build_log_embed(
+        f"Discord Appeal Accepted ({appeal_id})", description, "accepted", mod_id, mod_name, dm_delivered
+    )
     meta = {
         "delete_message": True,
         "ephemeral": "Appeal accepted, user unbanned, message removed.",
@@ -266,40 +407,38 @@ async def handle_discord_accept(parts: list, mod_id: str, mod_name: str, embed:
     }
     return create_updated_embed(embed, "accepted", mod_id, note), None, meta
 
+
 async def handle_discord_decline(parts: list, mod_id: str, mod_name: str, embed: dict, payload: dict) -> Tuple[dict, Optional[str], Optional[dict]]:
     _, appeal_id, user_id = parts
     appeal_record = await fetch_appeal_record(appeal_id)
     internal_user_id = (appeal_record or {}).get("internal_user_id") or user_id
-    _declined_users[internal_user_id] = True
-    _appeal_locked[internal_user_id] = True
-
     user_lang = normalize_language((appeal_record or {}).get("user_lang", "en"))
 
-    decline_desc_en = "Your appeal has been reviewed and declined. Further appeals are blocked for this ban."
-    decline_desc = await translate_text(decline_desc_en, target_lang=user_lang) if user_lang != "en" else decline_desc_en
+    _, _, decline_desc, (translated_reason, was_translated) = await asyncio.gather(
+        kv.declined_users.set(internal_user_id),
+        kv.appeal_locked.set(internal_user_id),
+        _localized_desc(DECLINE_DM_EN, user_lang),
+        _translate_for_embed((appeal_record or {}).get("appeal_reason"), user_lang),
+    )
     dm_delivered = await dm_user(user_id, {"title": "Appeal Declined", "description": decline_desc, "color": 0xE74C3C})
-
-    await update_appeal_status(appeal_id, "declined", mod_id, dm_delivered=dm_delivered)
-    await maybe_remove_from_dm_guild(user_id)
-    await update_staff_stats(mod_id, mod_name, accepted=False, created_at=(appeal_record or {}).get("created_at"))
+    _schedule_followup(
+        _finalize_discord_decision(
+            appeal_id, "declined", mod_id, mod_name, user_id, internal_user_id, dm_delivered,
+            (appeal_record or {}).get("created_at"),
+        ),
+        f"finalize of appeal {appeal_id}",
+    )
     
     note = f"User has been notified by DM (delivered: {dm_delivered})."
-    translated_reason, was_translated = await _translate_for_embed((appeal_record or {}).get("appeal_reason"), user_lang)
     desc = (
         f"**User:** <@{user_id}> ({user_id})\n"
         f"**Ban reason:** {(appeal_record or {}).get('ban_reason') or 'N/A'}\n"
         f"**Appeal:** {'[Translated] ' if was_translated else ''}{translated_reason}"
     )
 
-    log_embed = {
-        "title": f"Discord Appeal Declined ({appeal_id})",
-        "description": desc,
-        "color": 0xE74C3C,
-        "fields": [
-            {"name": "Moderator", "value": f"<@{mod_id}> ({mod_name})", "inline": False},
-            {"name": "DM delivered", "value": str(dm_delivered), "inline": True},
-        ],
-    }
+    log_embed = build_log_embed(
+        f"Discord Appeal Declined ({appeal_id})", desc, "declined", mod_id, mod_name, dm_delivered
+    )
     meta = {
         "delete_message": True,
         "ephemeral": "Appeal declined and message removed.",
@@ -308,50 +447,69 @@ async def handle_discord_decline(parts: list, mod_id: str, mod_name: str, embed:
     }
     return create_updated_embed(embed, "declined", mod_id, note), None, meta
 
+
 # --- Main Interaction Router ---
 
-HANDLER_MAP: Dict[str, Tuple[Callable, int]] = {
-    "web_appeal_accept": (handle_discord_accept, DISCORD_MODERATOR_ROLE_ID),
-    "web_appeal_decline": (handle_discord_decline, DISCORD_MODERATOR_ROLE_ID),
-    "roblox_initial_accept": (handle_roblox_initial_accept, ROBLOX_INITIAL_MODERATOR_ROLE_ID),
-    "roblox_initial_decline": (handle_roblox_initial_decline, ROBLOX_INITIAL_MODERATOR_ROLE_ID),
-    "roblox_final_accept": (handle_roblox_final_accept, ROBLOX_ELEVATED_MODERATOR_ROLE_ID),
-    "roblox_final_decline": (handle_roblox_final_decline, ROBLOX_ELEVATED_MODERATOR_ROLE_ID),
+def _role(role_id: int) -> Optional[str]:
+    # Discord sends member role ids as strings; 0 means the role is not configured.
+    return str(role_id) if role_id else None
+
+
+HANDLER_MAP: Dict[str, Tuple[Callable, Optional[str]]] = {
+    "web_appeal_accept": (handle_discord_accept, _role(DISCORD_MODERATOR_ROLE_ID)),
+    "web_appeal_decline": (handle_discord_decline, _role(DISCORD_MODERATOR_ROLE_ID)),
+    "roblox_initial_accept": (handle_roblox_initial_accept, _role(ROBLOX_INITIAL_MODERATOR_ROLE_ID)),
+    "roblox_initial_decline": (handle_roblox_initial_decline, _role(ROBLOX_INITIAL_MODERATOR_ROLE_ID)),
+    "roblox_final_accept": (handle_roblox_final_accept, _role(ROBLOX_ELEVATED_MODERATOR_ROLE_ID)),
+    "roblox_final_decline": (handle_roblox_final_decline, _role(ROBLOX_ELEVATED_MODERATOR_ROLE_ID)),
 }
 
+# custom_id shapes the buttons are created with: "web_appeal_<decision>:<appeal_id>:<user_id>"
+# and "roblox_<stage>_<decision>:<appeal_id>". Anything else is rejected before dispatch.
+_CUSTOM_ID_RE = re.compile(
+    r"(web_appeal_(?:accept|decline)):([A-Za-z0-9_-]{1,64}):(\d{1,20})"
+    r"|(roblox_(?:initial|final)_(?:accept|decline)):(\d{1,20})"
+)
+
+
 @router.post("/interactions")
 async def interactions(request: Request):
     body = await request.body()
     if not verify_signature(request, body):
-        return JSONResponse({"error": "Invalid signature"}, status_code=401)
+        return OrjsonResponse({"error": "Invalid signature"}, status_code=401)
 
-    payload = await request.json()
+    payload = orjson.loads(body)
     if payload["type"] == 1:
-        return JSONResponse({"type": 1})
+        return OrjsonResponse({"type": 1})
     if payload["type"] != 3:
-        return JSONResponse({"error": "Unsupported interaction type"}, status_code=400)
+        return OrjsonResponse({"error": "Unsupported interaction type"}, status_code=400)
 
     data = payload.get("data", {})
     custom_id = data.get("custom_id", "")
-    parts = custom_id.split(":")
-    action = parts[0]
+    match = _CUSTOM_ID_RE.fullmatch(custom_id)
+    parts = [group for group in match.groups() if group is not None] if match else []
+    action = parts[0] if parts else ""
 
     handler, required_role = HANDLER_MAP.get(action, (None, None))
     if not handler or not required_role:
         return await respond_ephemeral_embed("Unsupported action", "This button is not configured.")
 
     member = payload.get("member", {})
-    user_roles = {int(r) for r in member.get("roles", [])}
-    if required_role not in user_roles:
+    if required_role not in member.get("roles", ()):
         return await respond_ephemeral_embed("Permissions Denied", "You do not have the required role to perform this action.")
 
     moderator_id = member.get("user", {}).get("id")
     moderator_username = member.get("user", {}).get("username", "N/A")
     original_embed = (payload["message"].get("embeds") or [{}])[0]
 
+    message_id = str(payload["message"].get("id") or custom_id)
+    if not await _claim_appeal_message(message_id):
+        return await respond_ephemeral_embed("Already handled", "Another moderator is already processing this appeal.")
+
     try:
         final_embed, error, meta = await handler(parts, moderator_id, moderator_username, original_embed, payload)
         if error:
+            await _release_appeal_message(message_id)
             logging.error(f"Handler for '{action}' failed: {error}")
             # On error, we can send an ephemeral message to the moderator
             return await respond_ephemeral_embed("Action Failed", error)
@@ -362,17 +520,20 @@ async def interactions(request: Request):
         if action == "roblox_initial_decline":
              return await respond_ephemeral_embed("Success", "Appeal has been declined.")
 
-        # If handler requested deletion (final review), delete original message and confirm ephemerally
+        # Log embeds are batched by the embed log consumer.
+        if meta and meta.get("log_channel") and meta.get("log_embed"):
+            queue_log_embed(meta["log_channel"], meta["log_embed"])
+
+        # If handler requested deletion (final review), confirm ephemerally and
+        # delete the original message once Discord has its ACK.
         if meta and meta.get("delete_message"):
-            await delete_message(payload["channel_id"], payload["message"]["id"])
-            if meta.get("log_channel") and meta.get("log_embed"):
-                await post_channel_message(meta["log_channel"], embed=meta["log_embed"])
+            _schedule_followup(
+                delete_message(payload["channel_id"], payload["message"]["id"]),
+                f"message delete after '{action}'",
+            )
             return await respond_ephemeral_embed("Success", meta.get("ephemeral", "Action completed."))
 
-        if meta and meta.get("log_channel") and meta.get("log_embed"):
-            await post_channel_message(meta["log_channel"], embed=meta["log_embed"])
-
-        return JSONResponse({
+        return OrjsonResponse({
             "type": 7, # UPDATE_MESSAGE
             "data": {
                 "embeds": [final_embed],
@@ -380,5 +541,6 @@ async def interactions(request: Request):
             }
         })
     except Exception as e:
+        await _release_appeal_message(message_id)
         logging.exception(f"Error processing action '{action}': {e}")
         return await respond_ephemeral_embed("Error", "An unexpected server error occurred.")
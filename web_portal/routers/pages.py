@@ -1,24 +1,26 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
+import hashlib
 import html
 import json
 import logging
 import secrets
 import time
-import uuid
 import httpx
-from typing import Optional, Dict, Any, List, Tuple
+import orjson
+from typing import Optional, Dict, Any, List, Mapping, Tuple
 from datetime import datetime, timedelta
 
+from cachetools import TTLCache
 from fastapi import APIRouter, Form, HTTPException, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.security import HTTPBearer
 from itsdangerous import BadSignature, URLSafeTimedSerializer
 
-from ..i18n import detect_language, get_strings, translate_text
+from ..i18n import detect_language, get_strings, translate_text, translation_degraded
 from ..services import appeal_db, roblox_api
-from ..clients import get_http_client
 from ..services.discord_api import (
     ensure_dm_guild_membership,
     exchange_code_for_token,
@@ -28,12 +30,14 @@ from ..services.discord_api import (
     oauth_authorize_url as discord_oauth_authorize_url,
     post_appeal_embed,
     post_roblox_initial_appeal_embed,
-    send_log_message,
+    queue_log_message,
     store_user_token,
 )
-from ..services.message_cache import fetch_message_cache
-from ..services.security import enforce_ip_rate_limit, issue_state_token, validate_state_token
+from ..services.geo_api import fetch_ip_geo
+from ..services.message_cache import fetch_message_cache, fetch_message_cache_with_source
+from ..services.security import issue_state_token, validate_state_token
 from ..services.sessions import (
+    forget_session_profile,
     maybe_persist_session,
     persist_session,
     read_user_session,
@@ -50,7 +54,7 @@ from ..services.supabase import (
     supabase_request,
     fetch_reports_for_roblox_id,
 )
-from ..services.supabase import fetch_appeal_history, log_appeal_to_supabase
+from ..services.supabase import fetch_appeal_history, invalidate_appeal_history, log_appeal_to_supabase
 from ..settings import (
     APPEAL_COOLDOWN_SECONDS,
     APPEAL_WINDOW_SECONDS,
@@ -61,8 +65,10 @@ from ..settings import (
     SUPABASE_CONTEXT_TABLE,
     TARGET_GUILD_ID,
 )
-from ..state import _appeal_locked, _appeal_rate_limit, _ban_first_seen, _declined_users, _used_sessions
-from ..ui import build_user_chip, render_history_items, render_page
+from ..services import kv
+# Module import: route handlers use `state` for OAuth state tokens.
+from .. import state as portal_state
+from ..ui import build_user_chip, render_history_items, render_page, render_template
 from ..utils import (
     clean_display_name,
     format_relative,
@@ -133,28 +139,20 @@ async def _build_network_info(request: Request) -> dict:
     Enrich the network fingerprint with coarse geodata using ipapi.co.
     """
     base = _network_fingerprint(request)
-    ip = base.get("ip")
-    if not ip or ip in {"127.0.0.1", "::1", "unknown"}:
-        return base
-    try:
-        client = get_http_client()
-        resp = await client.get(f"https://ipapi.co/{ip}/json/", timeout=3)
-        if resp.status_code == 200:
-            data = resp.json() or {}
-            base.update(
-                {
-                    "country_name": data.get("country_name"),
-                    "region_name": data.get("region"),
-                    "city": data.get("city") or base.get("city"),
-                    "latitude": data.get("latitude"),
-                    "longitude": data.get("longitude"),
-                    "asn": data.get("asn"),
-                    "org": data.get("org"),
-                    "timezone": data.get("timezone"),
-                }
-            )
-    except Exception:
-        pass
+    data = await fetch_ip_geo(base.get("ip"))
+    if data:
+        base.update(
+            {
+                "country_name": data.get("country_name"),
+                "region_name": data.get("region"),
+                "city": data.get("city") or base.get("city"),
+                "latitude": data.get("latitude"),
+                "longitude": data.get("longitude"),
+                "asn": data.get("asn"),
+                "org": data.get("org"),
+                "timezone": data.get("timezone"),
+            }
+        )
     return base
 
 
@@ -259,7 +257,7 @@ class AppealService:
         now = time.time()
         
         # Check if user was declined
-        if _declined_users.get(user_id):
+        if await kv.declined_users.get(user_id):
             return False, "Appeal declined"
         
         # Check if ban exists
@@ -267,57 +265,61 @@ class AppealService:
             return False, "No active ban"
         
         # Check appeal window
-        first_seen = _ban_first_seen.get(user_id, now)
-        _ban_first_seen[user_id] = first_seen
+        first_seen = float(await kv.ban_first_seen.setdefault(user_id, str(now)))
         window_expires_at = first_seen + APPEAL_WINDOW_SECONDS
         
         if now > window_expires_at:
             return False, "Appeal window closed"
         
         # Check if already appealed
-        if _appeal_locked.get(user_id, False):
+        if await kv.appeal_locked.get(user_id):
             return False, "Appeal already submitted"
         
         return True, ""
     
     @staticmethod
-    async def check_rate_limit(identity_key: str, ip: str, *, legacy_keys: Optional[List[str]] = None) -> Tuple[bool, str]:
-        """Check if a user (by canonical identity) is rate limited across platforms."""
+    async def claim_submission(session_hash: str, identity_key: str, ip: str, *, legacy_keys: Optional[List[str]] = None) -> None:
+        """Claim the submit slot for an identity (one atomic check-and-set), then confirm against Supabase."""
+        code, last = await kv.claim_submission(session_hash, identity_key, ip)
         now = time.time()
-        keys_to_check = [identity_key] + [k for k in (legacy_keys or []) if k]
-        
-        # Check local rate limit
-        last: Optional[float] = None
-        for key in keys_to_check:
-            key_last = _appeal_rate_limit.get(key)
-            if key_last:
-                last = max(last or 0, key_last)
-        if last and now - last < APPEAL_COOLDOWN_SECONDS:
+        if code in (kv.SUBMIT_SESSION_USED, kv.SUBMIT_LOCKED):
+            raise HTTPException(status_code=409, detail="This appeal was already submitted.")
+        if code == kv.SUBMIT_COOLDOWN:
             wait = int(APPEAL_COOLDOWN_SECONDS - (now - last))
-            return False, f"Please wait {wait} seconds before submitting another appeal."
-        
-        # Check remote rate limit
-        remote_last: Optional[float] = None
-        for key in keys_to_check:
-            candidate = await get_remote_last_submit(key)
-            if candidate:
-                remote_last = max(remote_last or 0, candidate)
-
-        if remote_last:
-            last = max(last or 0, remote_last)
-            if now - last < APPEAL_COOLDOWN_SECONDS:
-                wait = int(APPEAL_COOLDOWN_SECONDS - (now - last))
-                return False, f"Please wait {wait} seconds before submitting another appeal."
-        
-        return True, ""
+            raise HTTPException(status_code=429, detail=f"Please wait {wait} seconds before submitting another appeal.")
+        if code == kv.SUBMIT_IP_LIMITED:
+            raise HTTPException(status_code=429, detail="Too many requests. Please slow down and try again.")
+
+        # Remote records cover other deployments and state that outlived the shared store.
+        keys_to_check = [identity_key] + [k for k in (legacy_keys or []) if k]
+        used, remote_last = await asyncio.gather(
+            is_session_token_used(session_hash),
+            get_remote_last_submit(keys_to_check),
+        )
+        remote_cooldown = bool(remote_last and now - remote_last < APPEAL_COOLDOWN_SECONDS)
+        if used or remote_cooldown:
+            # The guard already started this identity's cooldown; a rejected submit must not keep it.
+            await kv.appeal_rate_limit.delete(identity_key)
+        if used:
+            raise HTTPException(status_code=409, detail="This appeal was already submitted.")
+        if remote_cooldown:
+            wait = int(APPEAL_COOLDOWN_SECONDS - (now - remote_last))
+            raise HTTPException(status_code=429, detail=f"Please wait {wait} seconds before submitting another appeal.")
+    
+    @staticmethod
+    async def create_form_session(data: Dict[str, Any]) -> str:
+        """Store appeal form context server-side; the form only carries the returned id."""
+        session_id = secrets.token_urlsafe(16)
+        await kv.form_sessions.set(session_id, orjson.dumps(data).decode())
+        return session_id
     
     @staticmethod
     async def validate_session(session: str) -> Dict[str, Any]:
-        """Validate and decode session token."""
-        try:
-            data = serializer.loads(session)
-        except BadSignature:
-            raise HTTPException(status_code=400, detail="Invalid session")
+        """Load the form context stored for a session id."""
+        raw = await kv.form_sessions.get(session) if session else None
+        if raw is None:
+            raise HTTPException(status_code=400, detail="This form session expired. Please restart the appeal.")
+        data = orjson.loads(raw)
         
         now = time.time()
         issued_at = float(data.get("iat", 0))
@@ -327,33 +329,18 @@ class AppealService:
         
         return data
     
-    @staticmethod
-    async def check_session_used(session_hash: str, user_id: str) -> bool:
-        """Check if session has been used."""
-        if _used_sessions.get(session_hash):
-            return True
-        
-        return await is_session_token_used(session_hash)
-    
     @staticmethod
     async def mark_session_used(session_hash: str, identity_key: str, *, network_info: Optional[dict] = None, other_info: Optional[dict] = None):
         """Mark session as used (tracks by canonical identity to avoid cross-platform dupes)."""
         now = time.time()
-        _used_sessions[session_hash] = now
+        await kv.used_sessions.set(session_hash)
         await mark_session_token(session_hash, identity_key, now, network_info=network_info, other_info=other_info)
-        
-        # Clean up stale sessions
-        stale_sessions = [token for token, ts in _used_sessions.items() if now - ts > SESSION_TTL_SECONDS * 2]
-        for token in stale_sessions:
-            _used_sessions.pop(token, None)
     
     @staticmethod
-    async def log_appeal_attempt(user_id: str, ip: str, lang: str, ban_reason: str, msg_ctx_len: int):
+    async def log_appeal_attempt(user_id: str, ip_hash: str, lang: str, ban_reason: str, msg_ctx_len: int):
         """Log appeal attempt."""
-        asyncio.create_task(
-            send_log_message(
-                f"[appeal_attempt] user={user_id} ip_hash={hash_ip(ip)} lang={lang} ban_reason=\"{ban_reason}\" msg_ctx={msg_ctx_len}"
-            )
+        queue_log_message(
+            f"[appeal_attempt] user={user_id} ip_hash={ip_hash} lang={lang} ban_reason=\"{ban_reason}\" msg_ctx={msg_ctx_len}"
         )
 
 
@@ -371,7 +358,7 @@ class AuthService:
         ip = get_client_ip(request)
         state_id = state_data.get("state_id")
         
-        if not validate_state_token(state_id, ip):
+        if not await validate_state_token(state_id, ip):
             raise HTTPException(status_code=400, detail="Invalid or replayed state")
         
         return state_data
@@ -384,10 +371,10 @@ class AuthService:
         
         token = await exchange_code_for_token(code)
         user = await fetch_discord_user(token["access_token"])
-        store_user_token(user["id"], token)
+        await store_user_token(user["id"], token)
         
         ip = get_client_ip(request)
-        asyncio.create_task(send_log_message(f"[auth] user={user['id']} ip_hash={hash_ip(ip)} lang={current_lang}"))
+        queue_log_message(f"[auth] user={user['id']} ip_hash={hash_ip(ip)} lang={current_lang}")
         
         return {
             "user": user,
@@ -419,7 +406,7 @@ class AuthService:
         await roblox_api.store_roblox_token(user_id, token, network_info=net_info, other_info=other_info)
 
         ip = get_client_ip(request)
-        asyncio.create_task(send_log_message(f"[auth_roblox] user={user_id} ip_hash={hash_ip(ip)} lang={current_lang}"))
+        queue_log_message(f"[auth_roblox] user={user_id} ip_hash={hash_ip(ip)} lang={current_lang}")
         
         return {
             "user": user,
@@ -428,7 +415,7 @@ class AuthService:
             "state_data": state_data
         }
 
-def _render_appeal_ineligible(reason: str, user_label: str, strings: Dict[str, str], current_lang: str):
+def _render_appeal_ineligible(reason: str, user_label: str, strings: Mapping[str, str], current_lang: str):
     """Return the appropriate response for ineligible appeal reasons."""
     name = html.escape(user_label or "You")
     if reason == "Appeal declined":
@@ -491,25 +478,24 @@ class PageRenderer:
         current_lang = await detect_language(request, lang)
         strings = await get_strings(current_lang)
         ip = get_client_ip(request)
-        state_token = issue_state_token(ip)
+        state_token = await issue_state_token(ip)
         state = serializer.dumps({
             "nonce": secrets.token_urlsafe(8), 
             "lang": current_lang, 
             "state_id": state_token
         })
         
-        asyncio.create_task(send_log_message(f"[visit_home] ip_hash={hash_ip(ip)} lang={current_lang}"))
+        queue_log_message(f"[visit_home] ip_hash={hash_ip(ip)} lang={current_lang}")
         
         user_session = read_user_session(request)
         user_session, session_refreshed = await refresh_session_profile(user_session)
         user_session, identity_refreshed = await _ensure_internal_identity(user_session)
         session_refreshed = session_refreshed or identity_refreshed
-        strings = dict(strings)
         
         discord_login_url = discord_oauth_authorize_url(state)
         roblox_login_url = roblox_api.oauth_authorize_url(state)
         
-        strings["top_actions"] = build_user_chip(
+        top_actions = build_user_chip(
             user_session, 
             discord_login_url=discord_login_url, 
             roblox_login_url=roblox_login_url
@@ -520,7 +506,7 @@ class PageRenderer:
         )
         
         response = HTMLResponse(
-            render_page("BlockSpin Appeals", content, lang=current_lang, strings=strings),
+            render_page("BlockSpin Appeals", content, lang=current_lang, strings=strings, top_actions=top_actions),
             headers={"Cache-Control": "no-store"}
         )
         maybe_persist_session(request, response, user_session, session_refreshed)
@@ -529,36 +515,13 @@ class PageRenderer:
     
     @staticmethod
     async def _build_home_content(
-        strings: Dict[str, str], 
+        strings: Mapping[str, str], 
         discord_login_url: str, 
         roblox_login_url: str, 
         session: Optional[Dict[str, Any]] = None
     ) -> str:
         """Build the content for the home page."""
-        hero_title = html.escape(strings.get("home_hero_title", strings.get("hero_title", "Resolve your ban the right way.")))
-        section_title = html.escape(strings.get("home_section_title", "BlockSpin Appeals"))
-        section_body = html.escape(strings.get("home_section_body", "Welcome to the official BlockSpin ban appeal portal. This site is used to submit and review appeals related to BlockSpin moderation actions. Appeals are handled under a single linked account to ensure accurate review and consistent history. Please read how the process works before submitting an appeal."))
-        status_cta = html.escape(strings.get("home_status_cta", strings.get("status_cta", "View Appeal Status")))
-        learn_cta = html.escape(strings.get("home_learn_more_cta", "Learn more"))
-        return f"""
-        <section class="hero hero--home">
-        <h1 class="hero__title">{hero_title}</h1>
-
-
-        </section>
-
-        <section class="card card--wide">
-        <h2 class="card__title">{section_title}</h2>
-
-        <p class="muted">{section_body}</p>
-
-        <div class="btn-row" style="margin-top:16px;">
-            <a class="btn btn--ghost" href="/status">{status_cta}</a>
-            <a class="btn btn--ghost" href="/how-it-works">{learn_cta}</a>
-        </div>
-        </section>
-
-        """
+        return render_template("home.html", strings=strings)
     
 
     @staticmethod
@@ -567,16 +530,15 @@ class PageRenderer:
         current_lang = await detect_language(request, lang)
         strings = await get_strings(current_lang)
         ip = get_client_ip(request)
-        asyncio.create_task(send_log_message(f"[visit_status] ip_hash={hash_ip(ip)} lang={current_lang}"))
+        queue_log_message(f"[visit_status] ip_hash={hash_ip(ip)} lang={current_lang}")
         
         session = read_user_session(request)
         session, session_refreshed = await refresh_session_profile(session)
         session, identity_refreshed = await _ensure_internal_identity(session)
         session_refreshed = session_refreshed or identity_refreshed
-        strings = dict(strings)
         
         if not session:
-            state_token = issue_state_token(ip)
+            state_token = await issue_state_token(ip)
             state = serializer.dumps({
                 "nonce": secrets.token_urlsafe(8), 
                 "lang": current_lang, 
@@ -585,21 +547,19 @@ class PageRenderer:
             discord_login_url = discord_oauth_authorize_url(state)
             roblox_login_url = roblox_api.oauth_authorize_url(state)
             
-            strings["top_actions"] = build_user_chip(
+            top_actions = build_user_chip(
                 None, discord_login_url=discord_login_url, roblox_login_url=roblox_login_url
             )
             
-            content = f"""
-              <div class="card status danger">
-                <h1 style="margin-bottom:10px;">Sign in required</h1>
-                <p class="muted">Sign in to view your BlockSpin appeal history and live status.</p>
-                <a class="btn btn--discord" href="{discord_login_url}"><span class="btn__icon" aria-hidden="true">⌁</span>{strings['login']}</a>
-                 <a class="btn btn--roblox" href="{roblox_login_url}">{strings['login_roblox']}</a>
-              </div>
-            """
+            content = render_template(
+                "status_signin.html",
+                strings=strings,
+                discord_login_url=discord_login_url,
+                roblox_login_url=roblox_login_url,
+            )
             
             resp = HTMLResponse(
-                render_page("Appeal status", content, lang=current_lang, strings=strings), 
+                render_page("Appeal status", content, lang=current_lang, strings=strings, top_actions=top_actions), 
                 status_code=401, 
                 headers={"Cache-Control": "no-store"}
             )
@@ -609,12 +569,12 @@ class PageRenderer:
         discord_login_url = None
         roblox_login_url = None
         if not session.get("uid") or not session.get("ruid"):
-            state_token = issue_state_token(ip)
+            state_token = await issue_state_token(ip)
             state = serializer.dumps({"nonce": secrets.token_urlsafe(8), "lang": current_lang, "state_id": state_token})
             discord_login_url = discord_oauth_authorize_url(state)
             roblox_login_url = roblox_api.oauth_authorize_url(state)
 
-        strings["top_actions"] = build_user_chip(
+        top_actions = build_user_chip(
             session,
             discord_login_url=discord_login_url,
             roblox_login_url=roblox_login_url,
@@ -629,55 +589,39 @@ class PageRenderer:
 
         has_discord = bool(session.get("uid"))
         has_roblox = bool(session.get("ruid"))
-        link_prompt_html = ""
+        link_prompt = None
 
         if has_discord and not has_roblox and roblox_login_url:
-            prompt_text = strings.get("link_roblox_prompt", "Connect your Roblox account to sync appeal history.")
-            prompt_cta = strings.get("link_roblox_cta", "Connect Roblox")
-            link_prompt_html = f"""
-              <div class="callout callout--info">
-                <p class="muted" style="margin-bottom:8px;">{html.escape(prompt_text)}</p>
-                <a class="btn btn--roblox btn--wide" href="{html.escape(roblox_login_url)}">{html.escape(prompt_cta)}</a>
-              </div>
-            """
+            link_prompt = {
+                "platform": "roblox",
+                "text": strings.get("link_roblox_prompt", "Connect your Roblox account to sync appeal history."),
+                "cta": strings.get("link_roblox_cta", "Connect Roblox"),
+                "url": roblox_login_url,
+            }
         elif has_roblox and not has_discord and discord_login_url:
-            prompt_text = strings.get("link_discord_prompt", "Connect your Discord to receive updates about this appeal.")
-            prompt_cta = strings.get("link_discord_cta", "Connect Discord")
-            link_prompt_html = f"""
-              <div class="callout callout--info">
-                <p class="muted" style="margin-bottom:8px;">{html.escape(prompt_text)}</p>
-                <a class="btn btn--discord btn--wide" href="{html.escape(discord_login_url)}">{html.escape(prompt_cta)}</a>
-              </div>
-            """
+            link_prompt = {
+                "platform": "discord",
+                "text": strings.get("link_discord_prompt", "Connect your Discord to receive updates about this appeal."),
+                "cta": strings.get("link_discord_cta", "Connect Discord"),
+                "url": discord_login_url,
+            }
 
         raw_display_name = clean_display_name(session.get("display_name") or session.get("uname", "you"))
-        display_name = html.escape(raw_display_name)
         history_title_template = strings.get("status_history_title_fmt", "Appeal history for {name}")
         try:
-            history_title = html.escape(history_title_template.format(name=raw_display_name))
+            history_title = history_title_template.format(name=raw_display_name)
         except Exception:
             history_title = history_title_template
-        history_subtitle = html.escape(strings.get("status_history_subtitle", "All linked appeals are shown in one timeline."))
-        back_home = html.escape(strings.get("status_back_home", "Back home"))
-        content = f"""
-          <div class="card status-card">
-            <div class="status-heading">
-              <h1>{history_title}</h1>
-              <p class="muted">{history_subtitle}</p>
-            </div>
-            {link_prompt_html}
-            <div class="history-wrapper">
-              {history_html}
-            </div>
-            <div class="btn-row" style="margin-top:10px;">
-              <a class="btn secondary" href="/how-it-works">{html.escape(strings.get("how_it_works", "How it works"))}</a>
-              <a class="btn secondary" href="/">{back_home}</a>
-            </div>
-          </div>
-        """
+        content = render_template(
+            "status.html",
+            strings=strings,
+            history_title=history_title,
+            history_html=history_html,
+            link_prompt=link_prompt,
+        )
 
         resp = HTMLResponse(
-            render_page("Appeal status", content, lang=current_lang, strings=strings),
+            render_page("Appeal status", content, lang=current_lang, strings=strings, top_actions=top_actions),
             headers={"Cache-Control": "no-store"},
         )
         maybe_persist_session(request, resp, session, session_refreshed)
@@ -689,78 +633,38 @@ class PageRenderer:
         current_lang = await detect_language(request, lang)
         strings = await get_strings(current_lang)
         ip = get_client_ip(request)
-        state_token = issue_state_token(ip)
+        state_token = await issue_state_token(ip)
         state = serializer.dumps({
             "nonce": secrets.token_urlsafe(8),
             "lang": current_lang,
             "state_id": state_token,
         })
 
-        asyncio.create_task(send_log_message(f"[visit_how_it_works] ip_hash={hash_ip(ip)} lang={current_lang}"))
+        queue_log_message(f"[visit_how_it_works] ip_hash={hash_ip(ip)} lang={current_lang}")
 
         user_session = read_user_session(request)
         user_session, session_refreshed = await refresh_session_profile(user_session)
         user_session, identity_refreshed = await _ensure_internal_identity(user_session)
         session_refreshed = session_refreshed or identity_refreshed
-        strings = dict(strings)
 
         discord_login_url = discord_oauth_authorize_url(state)
         roblox_login_url = roblox_api.oauth_authorize_url(state)
 
-        strings["top_actions"] = build_user_chip(
+        top_actions = build_user_chip(
             user_session,
             discord_login_url=discord_login_url,
             roblox_login_url=roblox_login_url,
         )
-        hiw_intro = html.escape(strings.get("hiw_intro_blurb", "Link either account, follow the clear appeal flow, and keep all moderators informed."))
-        step1_title = html.escape(strings.get("hiw_step1_title", "Authenticate"))
-        step1_body = html.escape(strings.get("hiw_step1_body", "Start by signing in with Discord or Roblox. Each login seeds the internal user record."))
-        step2_title = html.escape(strings.get("hiw_step2_title", "Link both accounts"))
-        step2_body = html.escape(strings.get("hiw_step2_body", "Connect your other platform from the header actions or live prompts so appeals merge seamlessly."))
-        step3_title = html.escape(strings.get("hiw_step3_title", "Check status"))
-        step3_body = html.escape(strings.get("hiw_step3_body", "Use the Status page to review every appeal tied to your linked accounts, including moderator decisions and status updates."))
-        step4_title = html.escape(strings.get("hiw_step4_title", "Submit respectfully"))
-        step4_body = html.escape(strings.get("hiw_step4_body", "Once both accounts are linked, choose the correct form, explain the context, and commit to improved behaviour."))
-
-        content = f"""
-        <section class="hero hero--home">
-          <div class="hero__card hero__card--compact" style="text-align:center;">
-            <h1>{html.escape(strings.get("how_it_works", "How it works"))}</h1>
-            <p class="muted">{hiw_intro}</p>
-          </div>
-        </section>
-
-        <section class="grid grid-steps">
-          <article class="card step-card">
-            <div class="step-kicker">1</div>
-            <h2>{step1_title}</h2>
-            <p class="muted">{step1_body}</p>
-          </article>
-          <article class="card step-card">
-            <div class="step-kicker">2</div>
-            <h2>{step2_title}</h2>
-            <p class="muted">{step2_body}</p>
-          </article>
-          <article class="card step-card">
-            <div class="step-kicker">3</div>
-            <h2>{step3_title}</h2>
-            <p class="muted">{step3_body}</p>
-          </article>
-          <article class="card step-card">
-            <div class="step-kicker">4</div>
-            <h2>{step4_title}</h2>
-            <p class="muted">{step4_body}</p>
-          </article>
-        </section>
-
-        <section class="hero-actions" style="justify-content:center; margin-top:12px;">
-          <a class="btn" href="/status">{html.escape(strings.get("status_cta", "Track my appeal"))}</a>
-          <a class="btn btn--ghost" href="/">{strings.get("error_home")}</a>
-        </section>
-        """
+        steps = [
+            (strings.get("hiw_step1_title", "Authenticate"), strings.get("hiw_step1_body", "Start by signing in with Discord or Roblox. Each login seeds the internal user record.")),
+            (strings.get("hiw_step2_title", "Link both accounts"), strings.get("hiw_step2_body", "Connect your other platform from the header actions or live prompts so appeals merge seamlessly.")),
+            (strings.get("hiw_step3_title", "Check status"), strings.get("hiw_step3_body", "Use the Status page to review every appeal tied to your linked accounts, including moderator decisions and status updates.")),
+            (strings.get("hiw_step4_title", "Submit respectfully"), strings.get("hiw_step4_body", "Once both accounts are linked, choose the correct form, explain the context, and commit to improved behaviour.")),
+        ]
+        content = render_template("how_it_works.html", strings=strings, steps=steps)
 
         response = HTMLResponse(
-            render_page("How it works", content, lang=current_lang, strings=strings),
+            render_page("How it works", content, lang=current_lang, strings=strings, top_actions=top_actions),
             headers={"Cache-Control": "no-store"},
         )
         maybe_persist_session(request, response, user_session, session_refreshed)
@@ -775,7 +679,7 @@ class PageRenderer:
         message_cache: List[Dict[str, Any]],
         session_token: str,
         current_lang: str,
-        strings: Dict[str, str],
+        strings: Mapping[str, str],
         current_session: Optional[Dict[str, Any]] = None, # Added parameter
         roblox_login_url: Optional[str] = None,
         history: Optional[List[Dict[str, Any]]] = None,
@@ -785,117 +689,31 @@ class PageRenderer:
         display_name = clean_display_name(user.get("global_name") or user.get("username") or uname_label)
         
         now = time.time()
-        first_seen = _ban_first_seen.get(user["id"], now)
+        first_seen = float(await kv.ban_first_seen.get(user["id"]) or now)
         window_expires_at = first_seen + APPEAL_WINDOW_SECONDS
         
         guild_name = await fetch_guild_name(str(TARGET_GUILD_ID))
         
-        uname = html.escape(uname_label)
-        ban_reason_raw = simplify_ban_reason(ban.get("reason")) or "No reason provided."
-        ban_reason = html.escape(ban_reason_raw)
-        user_id_label = html.escape(str(user["id"]))
-        ban_observed_rel = html.escape(format_relative(now - first_seen))
-        ban_observed_at = html.escape(format_timestamp(int(first_seen)))
-        appeal_deadline = html.escape(format_timestamp(int(window_expires_at)))
-        
-        message_cache_html = ""
-        if message_cache:
-            msgs_to_show = list(reversed(message_cache))
-            rows = []
-            for m in msgs_to_show:
-                ts = html.escape(format_timestamp(m.get("timestamp")))
-                content = html.escape(m.get("content") or "")
-                channel = html.escape(m.get("channel_name") or "#channel")
-                rows.append(
-                    f"""
-                    <div class='chat-row'>
-                        <div class='chat-time'>{ts} <span class='chat-channel'>{channel}</span></div>
-                        <div class='chat-content'>{content}</div>
-                    </div>
-                    """
-                )
-            message_cache_html = f'''<div class="chat-box">{" ".join(rows)}</div>'''
-        else:
-            message_cache_html = f'''<div class='muted' style='padding:10px; border:1px dashed var(--border); border-radius:8px;'>{strings['no_messages']}</div>'''
-        
-        context_count = len(message_cache) if message_cache else 0
-        context_open = "open" if context_count else ""
-        
-        window_script = """
-          <script>
-            (function(){
-              const el = document.getElementById('appealWindowRemaining');
-              if(!el) return;
-              const expiresSeconds = parseInt(el.dataset.expires || '0', 10);
-              if(!expiresSeconds) return;
-              const expiresMs = expiresSeconds * 1000;
-              function format(ms){
-                const total = Math.max(0, Math.floor(ms / 1000));
-                const days = Math.floor((total % 86400) / 3600);
-                const hours = Math.floor((total % 86400) / 3600);
-                return `${days}d ${hours}h`;
-              }
-              function tick(){
-                el.textContent = format(expiresMs - Date.now());
-              }
-              tick();
-              setInterval(tick, 30000);
-            })();
-          </script>
-        """
+        ban_reason = simplify_ban_reason(ban.get("reason")) or "No reason provided."
         
         history_html = render_history_items(history or [], format_timestamp=format_timestamp)
 
-        content = f"""
-          <div class="grid-2">
-            <div class="form-card">
-              <div class="badge">Window remaining: <span id="appealWindowRemaining" data-expires="{int(window_expires_at)}"></span></div>
-              <h2 style="margin:8px 0;">Appeal your BlockSpin ban</h2>
-              <p class="muted">One appeal per ban. Include context, evidence, and what you will change.</p>
-              <form class="form" action="/submit" method="post">
-                <input type="hidden" name="session" value="{html.escape(session_token)}" />
-                <div class="field">
-                  <label for="evidence">Ban evidence (optional)</label>
-                  <input name="evidence" type="text" placeholder="Links or notes you have" />
-                </div>
-                <div class="field">
-                  <label for="appeal_reason">Why should you be unbanned?</label>
-                  <textarea name="appeal_reason" required placeholder="Be concise. What happened, and what will be different next time?"></textarea>
-                </div>
-                <button class="btn" type="submit">Submit appeal</button>
-              </form>
-            </div>
-            <div class="card">
-              <details class="details" open>
-                <summary>{strings['ban_details']}</summary>
-                <div class="details-body">
-                  <div class="kv">
-                    <div class="kv-row"><div class="k">User</div><div class="v">{uname}</div></div>
-                    <div class="kv-row"><div class="k">User ID</div><div class="v">{user_id_label}</div></div>
-                    <div class="kv-row"><div class="k">Server</div><div class="v">{html.escape(guild_name or 'BlockSpin')}</div></div>
-                    <div class="kv-row"><div class="k">Ban observed</div><div class="v">{ban_observed_rel} · {ban_observed_at}</div></div>
-                    <div class="kv-row"><div class="k">Appeal deadline</div><div class="v">{appeal_deadline}</div></div>
-                    <div class="kv-row"><div class="k">Reason</div><div class="v">{ban_reason}</div></div>
-                  </div>
-                </div>
-              </details>
-
-              <details class="details" {context_open}>
-                <summary>{strings['messages_header']} <span style="color:var(--muted2); font-weight:700; letter-spacing:0; text-transform:none;">({context_count})</span></summary>
-                <div class="details-body">{message_cache_html}</div>
-              </details>
-
-              <details class="details">
-                <summary>Your history</summary>
-                <div class="details-body">{history_html}</div>
-              </details>
-              <div class="btn-row" style="margin-top:10px;">
-                <a class="btn secondary" href="/">Back home</a>
-              </div>
-            </div>
-          </div>
-          {window_script}
-        """
+        content = render_template(
+            "appeal_form.html",
+            strings=strings,
+            session_token=session_token,
+            window_expires_at=int(window_expires_at),
+            uname=uname_label,
+            user_id=str(user["id"]),
+            guild_name=guild_name,
+            ban_observed_rel=format_relative(now - first_seen),
+            ban_observed_at=format_timestamp(int(first_seen)),
+            appeal_deadline=format_timestamp(int(window_expires_at)),
+            ban_reason=ban_reason,
+            messages=message_cache[::-1] if message_cache else (),
+            context_count=len(message_cache) if message_cache else 0,
+            history_html=history_html,
+        )
         
         resp = HTMLResponse(
             render_page("Appeal your ban", content, lang=current_lang, strings=strings), 
@@ -912,7 +730,7 @@ class PageRenderer:
         ban: Dict[str, Any], 
         session_token: str,
         current_lang: str,
-        strings: Dict[str, str],
+        strings: Mapping[str, str],
         current_session: Optional[Dict[str, Any]] = None,
         discord_login_url: Optional[str] = None,
         reports: Optional[List[Dict[str, Any]]] = None,
@@ -1037,12 +855,41 @@ async def how_it_works(request: Request, lang: Optional[str] = None):
     return await PageRenderer.render_how_it_works_page(request, lang)
 
 
+# Rendered legal pages as (html, gzipped html, etag). They only vary by language and the
+# announcement banner; the TTL also picks up the footer year and recovered translations.
+_LEGAL_PAGES: TTLCache = TTLCache(maxsize=64, ttl=3600)
+
+
+async def _serve_legal_page(request: Request, page: str, current_lang: str, render) -> Response:
+    key = (page, current_lang, portal_state._announcement_text, portal_state._session_epoch)
+    rendered = _LEGAL_PAGES.get(key)
+    if rendered is None:
+        body = (await render(current_lang, await get_strings(current_lang))).encode("utf-8")
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        rendered = (body, gzip.compress(body, compresslevel=6), etag)
+        if not translation_degraded():
+            _LEGAL_PAGES[key] = rendered
+    body, gzipped, etag = rendered
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding, Cookie"}
+    if request.headers.get("if-none-match") == etag:
+        response = Response(status_code=304, headers=headers)
+    elif "gzip" in request.headers.get("accept-encoding", ""):
+        response = Response(gzipped, media_type="text/html; charset=utf-8", headers={**headers, "Content-Encoding": "gzip"})
+    else:
+        response = Response(body, media_type="text/html; charset=utf-8", headers=headers)
+    response.set_cookie("lang", current_lang, max_age=60 * 60 * 24 * 30, httponly=False, samesite="Lax")
+    return response
+
+
 @router.get("/tos", response_class=HTMLResponse)
 async def tos(request: Request, lang: Optional[str] = None):
     """Render the Terms of Service page with auto-translation support."""
     current_lang = await detect_language(request, lang)
-    strings = await get_strings(current_lang)
+    return await _serve_legal_page(request, "tos", current_lang, _render_tos)
+
 
+async def _render_tos(current_lang: str, strings: Mapping[str, str]) -> str:
     async def tr(text: str) -> str:
         if current_lang == "en":
             return html.escape(text)
@@ -1139,17 +986,17 @@ async def tos(request: Request, lang: Optional[str] = None):
         </div>
 
     """
-    response = HTMLResponse(render_page("Terms of Service", content, lang=current_lang, strings=strings), headers={"Cache-Control": "no-store"})
-    response.set_cookie("lang", current_lang, max_age=60 * 60 * 24 * 30, httponly=False, samesite="Lax")
-    return response
+    return render_page("Terms of Service", content, lang=current_lang, strings=strings)
 
 
 @router.get("/privacy", response_class=HTMLResponse)
 async def privacy(request: Request, lang: Optional[str] = None):
     """Render the Privacy Policy page."""
     current_lang = await detect_language(request, lang)
-    strings = await get_strings(current_lang)
+    return await _serve_legal_page(request, "privacy", current_lang, _render_privacy)
 
+
+async def _render_privacy(current_lang: str, strings: Mapping[str, str]) -> str:
     async def tr(text: str) -> str:
         if current_lang == "en":
             return html.escape(text)
@@ -1252,9 +1099,7 @@ async def privacy(request: Request, lang: Optional[str] = None):
         </div>
 
     """
-    response = HTMLResponse(render_page("Privacy", content, lang=current_lang, strings=strings), headers={"Cache-Control": "no-store"})
-    response.set_cookie("lang", current_lang, max_age=60 * 60 * 24 * 30, httponly=False, samesite="Lax")
-    return response
+    return render_page("Privacy", content, lang=current_lang, strings=strings)
 
 
 @router.get("/status", response_class=HTMLResponse)
@@ -1274,8 +1119,9 @@ async def get_status_data(request: Request):
 
 
 @router.get("/logout")
-async def logout():
+async def logout(request: Request):
     """Handle logout."""
+    await forget_session_profile(read_user_session(request))
     resp = RedirectResponse("/")
     resp.delete_cookie(SESSION_COOKIE_NAME)
     return resp
@@ -1297,7 +1143,6 @@ async def callback(request: Request, code: str, state: str, lang: Optional[str]
     user = auth_data["user"]
     current_lang = auth_data["lang"]
     strings = await get_strings(current_lang)
-    strings = dict(strings)
     state_data = auth_data.get("state_data", {})
     return_to = state_data.get("return_to")
     ip = auth_data["ip"]
@@ -1352,10 +1197,11 @@ async def callback(request: Request, code: str, state: str, lang: Optional[str]
             )
         return response
 
-    # Standard Login/Appeal Flow
-    internal_user_id = await resolve_internal_user_id(discord_id=user["id"])
-
-    ban = await fetch_ban_if_exists(user["id"])
+    # Standard Login/Appeal Flow: identity and ban lookups are independent.
+    internal_user_id, ban = await asyncio.gather(
+        resolve_internal_user_id(discord_id=user["id"]),
+        fetch_ban_if_exists(user["id"]),
+    )
     
     if not ban:
         response = RedirectResponse(return_to or "/")
@@ -1384,11 +1230,14 @@ async def callback(request: Request, code: str, state: str, lang: Optional[str]
     if not eligible:
         return _render_appeal_ineligible(reason, user["username"], strings, current_lang)
 
-    await ensure_dm_guild_membership(user["id"])
-    message_cache = await fetch_message_cache(user["id"])
+    _, (message_cache, cached_remotely), history = await asyncio.gather(
+        ensure_dm_guild_membership(user["id"]),
+        fetch_message_cache_with_source(user["id"]),
+        _collect_combined_history(updated_session),
+    )
     
-    # Store message cache in Supabase if available
-    if is_supabase_ready() and message_cache:
+    # Store message cache in Supabase if available (and not already read from there)
+    if is_supabase_ready() and message_cache and not cached_remotely:
         logging.info(
             "Upserting banned context from callback user=%s msgs=%s table=%s", 
             user["id"], 
@@ -1409,27 +1258,25 @@ async def callback(request: Request, code: str, state: str, lang: Optional[str]
     
     # Create session token
     now = time.time()
-    first_seen = _ban_first_seen.get(internal_user_id, now) # Use internal_user_id for first_seen
-    _ban_first_seen[internal_user_id] = first_seen
+    first_seen = float(await kv.ban_first_seen.setdefault(internal_user_id, str(now))) # Use internal_user_id for first_seen
 
-    session_token = serializer.dumps({
+    session_token = await AppealService.create_form_session({
         "internal_user_id": internal_user_id,
         "uid": user["id"],
         "uname": uname_label,
         "ban_reason": simplify_ban_reason(ban.get("reason")) or "No reason provided.",
         "iat": time.time(),
-        "ban_first_seen": _ban_first_seen.get(internal_user_id, time.time()),
+        "ban_first_seen": first_seen,
         "lang": current_lang,
         "message_cache": message_cache,
     })
     
-    history = await _collect_combined_history(updated_session)
     roblox_login_url = None
     if not updated_session.get("ruid"):
         roblox_link_state = serializer.dumps({
             "nonce": secrets.token_urlsafe(8),
             "lang": current_lang,
-            "state_id": issue_state_token(ip),
+            "state_id": await issue_state_token(ip),
             "return_to": f"/discord/resume?lang={current_lang}",
         })
         roblox_login_url = roblox_api.oauth_authorize_url(roblox_link_state)
@@ -1491,9 +1338,10 @@ async def roblox_callback(request: Request, code: str, state: str, lang: Optiona
         return response
 
     # Standard Login/Appeal Flow
-    internal_user_id = await resolve_internal_user_id(roblox_id=user_id)
-    
-    ban = await roblox_api.get_live_ban_status(user_id)
+    internal_user_id, ban = await asyncio.gather(
+        resolve_internal_user_id(roblox_id=user_id),
+        roblox_api.get_live_ban_status(user_id),
+    )
     if not ban:
         response = RedirectResponse(return_to or "/")
         persist_session(
@@ -1517,10 +1365,16 @@ async def roblox_callback(request: Request, code: str, state: str, lang: Optiona
         display_name,
     )
     
-    ban_history = await roblox_api.get_ban_history(user_id)
+    # The page's remote lookups are independent of each other.
+    ban_history, reports, history, link_state_id = await asyncio.gather(
+        roblox_api.get_ban_history(user_id),
+        fetch_reports_for_roblox_id(user_id, limit=25),
+        _collect_combined_history(updated_session_for_roblox_context),
+        issue_state_token(auth_data["ip"]),
+    )
     short_reason = shorten_public_ban_reason(ban.get("displayReason") or "")
     
-    session_token = serializer.dumps({
+    session_token = await AppealService.create_form_session({
         "internal_user_id": internal_user_id,
         "ruid": user_id,
         "runame": uname_label,
@@ -1530,12 +1384,10 @@ async def roblox_callback(request: Request, code: str, state: str, lang: Optiona
         "iat": time.time(),
         "lang": current_lang,
     })
-    reports = await fetch_reports_for_roblox_id(user_id, limit=25)
-    history = await _collect_combined_history(updated_session_for_roblox_context)
     link_state = serializer.dumps({
         "nonce": secrets.token_urlsafe(8),
         "lang": current_lang,
-        "state_id": issue_state_token(auth_data["ip"]),
+        "state_id": link_state_id,
         "return_to": f"/roblox/resume?lang={current_lang}",
         # Carry Roblox context so Discord callback can rebuild session if cookies are missing
         "linking_roblox": True,
@@ -1586,9 +1438,14 @@ async def roblox_resume(request: Request, lang: Optional[str] = None):
     if not eligible:
         return _render_appeal_ineligible(reason, display_name or uname_label or "You", strings, current_lang)
 
-    ban_history = await roblox_api.get_ban_history(user_id)
+    ban_history, reports, history, link_state_id = await asyncio.gather(
+        roblox_api.get_ban_history(user_id),
+        fetch_reports_for_roblox_id(user_id, limit=25),
+        _collect_combined_history(session),
+        issue_state_token(get_client_ip(request)),
+    )
     short_reason = shorten_public_ban_reason(ban.get("displayReason") or "")
-    session_token = serializer.dumps({
+    session_token = await AppealService.create_form_session({
         "internal_user_id": internal_user_id,
         "ruid": user_id,
         "runame": uname_label,
@@ -1599,11 +1456,10 @@ async def roblox_resume(request: Request, lang: Optional[str] = None):
         "lang": current_lang,
     })
 
-    reports = await fetch_reports_for_roblox_id(user_id, limit=25)
     link_state = serializer.dumps({
         "nonce": secrets.token_urlsafe(8),
         "lang": current_lang,
-        "state_id": issue_state_token(get_client_ip(request)),
+        "state_id": link_state_id,
         "return_to": f"/roblox/resume?lang={current_lang}",
     })
     discord_login_url = None
@@ -1617,8 +1473,6 @@ async def roblox_resume(request: Request, lang: Optional[str] = None):
         "nickname": session.get("display_name") or session.get("runame"),
     }
 
-    history = await _collect_combined_history(session)
-
     return await PageRenderer.render_roblox_appeal_page(
         request,
         user_info,
@@ -1661,10 +1515,9 @@ async def discord_resume(request: Request, lang: Optional[str] = None):
     message_cache = await fetch_message_cache(user_id)
 
     now = time.time()
-    first_seen = _ban_first_seen.get(internal_user_id, now)
-    _ban_first_seen[internal_user_id] = first_seen
+    first_seen = float(await kv.ban_first_seen.setdefault(internal_user_id, str(now)))
 
-    session_token = serializer.dumps({
+    session_token = await AppealService.create_form_session({
         "internal_user_id": internal_user_id,
         "uid": user_id,
         "uname": session.get("uname"),
@@ -1680,7 +1533,7 @@ async def discord_resume(request: Request, lang: Optional[str] = None):
         link_state = serializer.dumps({
             "nonce": secrets.token_urlsafe(8),
             "lang": current_lang,
-            "state_id": issue_state_token(get_client_ip(request)),
+            "state_id": await issue_state_token(get_client_ip(request)),
             "return_to": f"/discord/resume?lang={current_lang}",
         })
         roblox_login_url = roblox_api.oauth_authorize_url(link_state)
@@ -1733,39 +1586,31 @@ async def roblox_submit(
     if not internal_user_id:
         raise HTTPException(status_code=400, detail="Internal user ID not found in session.")
 
-    if await AppealService.check_session_used(token_hash, roblox_user_id):
-        raise HTTPException(status_code=409, detail="This appeal was already submitted.")
-
     network_info = await _build_network_info(request)
     ip = network_info.get("ip") or get_client_ip(request)
     user_agent = request.headers.get("User-Agent", "unknown")
-    enforce_ip_rate_limit(ip)
-    
-    eligible, reason = await AppealService.check_rate_limit(
-        internal_user_id,
-        ip,
-        legacy_keys=[roblox_user_id],
-    ) # Use internal_user_id for rate limit
-    if not eligible:
-        raise HTTPException(status_code=429, detail=reason)
-
-    asyncio.create_task(send_log_message(f"[roblox_appeal_attempt] user={roblox_user_id} ip_hash={hash_ip(ip)}"))
+    # Starts the cooldown for internal_user_id once every check passes.
+    await AppealService.claim_submission(token_hash, internal_user_id, ip, legacy_keys=[roblox_user_id])
 
-    _appeal_rate_limit[internal_user_id] = time.time() # Use internal_user_id for rate limit
+    queue_log_message(f"[roblox_appeal_attempt] user={roblox_user_id} ip_hash={hash_ip(ip)}")
 
-    reports = await fetch_reports_for_roblox_id(roblox_user_id, limit=25)
+    user_lang = normalize_language(data.get("lang", "en"))
+    source_lang = None if user_lang == "en" else user_lang
+    reports, translated = await asyncio.gather(
+        fetch_reports_for_roblox_id(roblox_user_id, limit=25),
+        translate_text(appeal_reason, target_lang="en", source_lang=source_lang),
+        return_exceptions=True,
+    )
+    if isinstance(reports, BaseException):
+        raise reports
     evidence_links = _extract_evidence_links_from_reports(reports)
 
-    user_lang = normalize_language(data.get("lang", "en"))
     appeal_reason_en = appeal_reason
     reason_for_embed = appeal_reason
-    try:
-        source_lang = None if user_lang == "en" else user_lang
-        appeal_reason_en = await translate_text(appeal_reason, target_lang="en", source_lang=source_lang)
+    if isinstance(translated, str):
+        appeal_reason_en = translated
         if appeal_reason_en.strip() != appeal_reason.strip():
             reason_for_embed = f"[Translated] {appeal_reason_en}"
-    except Exception:
-        reason_for_embed = appeal_reason
 
     # discord_user_id will be handled by the internal user record in the database
     # No need to call bloxlink_api.get_discord_id_from_roblox_id here anymore
@@ -1796,26 +1641,30 @@ async def roblox_submit(
         evidence_links=evidence_links,
     )
     
+    current_lang = data.get("lang", "en")
+    writes = [
+        AppealService.mark_session_used(
+            token_hash,
+            internal_user_id,
+            network_info=network_info,
+            other_info={"user_agent": user_agent, "path": str(request.url.path)},
+        ),
+        kv.form_sessions.delete(session),
+    ]
     if message and message.get("id"):
-        await appeal_db.update_roblox_appeal_moderation_status(
-            appeal_id=appeal_id,
-            status="pending",
-            moderator_id="system",
-            moderator_username="System",
-            discord_message_id=message["id"],
-            discord_channel_id=message["channel_id"],
+        writes.append(
+            appeal_db.update_roblox_appeal_moderation_status(
+                appeal_id=appeal_id,
+                status="pending",
+                moderator_id="system",
+                moderator_username="System",
+                discord_message_id=message["id"],
+                discord_channel_id=message["channel_id"],
+            )
         )
-
-    await AppealService.mark_session_used(
-        token_hash,
-        internal_user_id,
-        network_info=network_info,
-        other_info={"user_agent": user_agent, "path": str(request.url.path)},
-    )
-    _appeal_locked[internal_user_id] = True # Use internal_user_id for appeal locked state
-    
-    current_lang = data.get("lang", "en")
-    strings = await get_strings(current_lang)
+    strings, *_ = await asyncio.gather(get_strings(current_lang), *writes)
+    await kv.appeal_locked.set(internal_user_id) # Use internal_user_id for appeal locked state
+    invalidate_appeal_history(internal_user_id)
     
     success_html = f"""
       <div class="card">
@@ -1857,9 +1706,6 @@ async def submit(
     if not internal_user_id:
         raise HTTPException(status_code=400, detail="Internal user ID not found in session.")
     
-    if await AppealService.check_session_used(token_hash, user_id):
-        raise HTTPException(status_code=409, detail="This appeal was already submitted.")
-    
     # Check appeal window
     now = time.time()
     first_seen = float(data.get("ban_first_seen", now))
@@ -1871,28 +1717,21 @@ async def submit(
     ip = network_info.get("ip") or get_client_ip(request)
     forwarded_for = network_info.get("forwarded_for", "") or ""
     user_agent = request.headers.get("User-Agent", "unknown")
-    enforce_ip_rate_limit(ip)
-    
-    eligible, reason = await AppealService.check_rate_limit(
-        internal_user_id,
-        ip,
-        legacy_keys=[user_id],
-    )
-    if not eligible:
-        raise HTTPException(status_code=429, detail=reason)
+    # Session reuse, appeal lock, cooldown and IP window in one atomic claim.
+    await AppealService.claim_submission(token_hash, internal_user_id, ip, legacy_keys=[user_id])
     
     # Log appeal attempt
+    # Both log lines carry the same keyed IP hash and context size; compute them once.
+    ip_hash = hash_ip(ip)
+    msg_cache = data.get("message_cache") or []
     await AppealService.log_appeal_attempt(
-        user_id, ip, data.get("lang", "en"), 
+        user_id, ip_hash, data.get("lang", "en"), 
         data.get("ban_reason", "N/A"), 
-        len(data.get("message_cache", []))
+        len(msg_cache)
     )
     
-    # Update rate limit
-    _appeal_rate_limit[internal_user_id] = now
-    
     # Create appeal
-    appeal_id = str(uuid.uuid4())[:8]
+    appeal_id = secrets.token_hex(4)
     user = {"id": data["uid"], "username": data["uname"], "discriminator": "0"}
     user_lang = data.get("lang", "en")
     
@@ -1916,43 +1755,43 @@ async def submit(
         appeal_reason=reason_for_embed,
     )
     
-    # Store in Supabase if available
-    if is_supabase_ready():
-        await log_appeal_to_supabase(
-            appeal_id,
-            user,
-            internal_user_id, # Pass internal_user_id
-            data.get("ban_reason") or "No reason provided.",
-            evidence or "No evidence provided.",
-            appeal_reason_en,
-            appeal_reason,
-            user_lang,
-            data.get("message_cache"),
-            ip,
-            forwarded_for,
-            user_agent,
-        )
-    
     # Log submission
-    msg_cache = data.get("message_cache") or []
-    asyncio.create_task(
-        send_log_message(
-            f"[appeal_submitted] appeal={appeal_id} user={user['id']} ip_hash={hash_ip(ip)} lang={user_lang} ban_reason=\"{data.get('ban_reason','N/A')}\" msg_ctx={len(msg_cache)}"
-        )
-    )
-    
-    # Mark session as used and lock appeal
-    await AppealService.mark_session_used(
-        token_hash,
-        internal_user_id,
-        network_info=network_info,
-        other_info={"user_agent": user_agent, "path": str(request.url.path)},
+    queue_log_message(
+        f"[appeal_submitted] appeal={appeal_id} user={user['id']} ip_hash={ip_hash} lang={user_lang} ban_reason=\"{data.get('ban_reason','N/A')}\" msg_ctx={len(msg_cache)}"
     )
-    _appeal_locked[internal_user_id] = True # Use internal_user_id for appeal locked state
-    
-    
+
+    # The embed is out; the remaining writes are independent, so issue them together.
+    writes = [
+        AppealService.mark_session_used(
+            token_hash,
+            internal_user_id,
+            network_info=network_info,
+            other_info={"user_agent": user_agent, "path": str(request.url.path)},
+        ),
+        kv.form_sessions.delete(session),
+    ]
+    if is_supabase_ready():
+        writes.append(
+            log_appeal_to_supabase(
+                appeal_id,
+                user,
+                internal_user_id, # Pass internal_user_id
+                data.get("ban_reason") or "No reason provided.",
+                evidence or "No evidence provided.",
+                appeal_reason_en,
+                appeal_reason,
+                user_lang,
+                data.get("message_cache"),
+                ip,
+                forwarded_for,
+                user_agent,
+            )
+        )
+    strings, *_ = await asyncio.gather(get_strings(user_lang), *writes)
+    await kv.appeal_locked.set(internal_user_id) # Use internal_user_id for appeal locked state
+    invalidate_appeal_history(internal_user_id)
+
     # Render success page
-    strings = await get_strings(user_lang)
     
     success = f"""
       <div class="card">
@@ -1,31 +1,42 @@
 from __future__ import annotations
 
-import time
+import asyncio
 
+import orjson
 from fastapi import APIRouter, Request
+from fastapi.responses import Response, StreamingResponse
 
+from ..services.live_events import format_event, subscribe, unsubscribe
 from ..services.sessions import read_user_session
 from ..services.supabase import fetch_appeal_history, is_supabase_ready, get_portal_flag
-from ..settings import STATUS_DATA_CACHE_TTL_SECONDS
-from ..state import _status_data_cache, _announcement_text, _session_epoch
+from ..state import _status_data_cache
+from .. import state
 from ..utils import format_timestamp
 
 router = APIRouter()
 
+# Idle streams get a comment line this often so proxies keep them open.
+_STREAM_HEARTBEAT_SECONDS = 15
+
+_EMPTY_STATUS_DATA = orjson.dumps({"history": []})
+
+
+def _json_bytes(body: bytes) -> Response:
+    return Response(body, media_type="application/json")
+
 
 @router.get("/status/data")
 async def status_data(request: Request):
     session = read_user_session(request)
     if not session:
-        return {"history": []}
+        return _json_bytes(_EMPTY_STATUS_DATA)
     if not is_supabase_ready():
-        return {"history": []}
+        return _json_bytes(_EMPTY_STATUS_DATA)
 
     uid_str = str(session.get("uid") or "")
-    now = time.time()
     cached = _status_data_cache.get(uid_str)
-    if cached and (now - cached[1]) < STATUS_DATA_CACHE_TTL_SECONDS:
-        return cached[0]
+    if cached is not None:
+        return _json_bytes(cached)
 
     history = await fetch_appeal_history(
         session["uid"],
@@ -41,16 +52,59 @@ async def status_data(request: Request):
         }
         for item in history
     ]
-    payload = {"history": slim}
-    _status_data_cache[uid_str] = (payload, now)
-    return payload
+    # Cache the encoded body; polling clients within the TTL get the same bytes back.
+    body = orjson.dumps({"history": slim})
+    _status_data_cache[uid_str] = body
+    return _json_bytes(body)
 
 
-@router.get("/live/announcement")
-async def live_announcement():
+async def _announcement_payload() -> dict:
     # Try Supabase-backed flag; fall back to in-memory.
     ann = await get_portal_flag("announcement", None)
     return {
-        "announcement": ann if ann is not None else _announcement_text,
-        "epoch": _session_epoch,
+        "announcement": ann if ann is not None else state._announcement_text,
+        "epoch": state._session_epoch,
     }
+
+
+@router.get("/live/announcement")
+async def live_announcement():
+    return await _announcement_payload()
+
+
+@router.get("/live/stream")
+async def live_stream(request: Request):
+    """Server-sent events: announcements for everyone, appeal status changes for the signed-in user."""
+    session = read_user_session(request)
+    internal_user_id = str(session.get("internal_user_id") or "") if session else ""
+
+    async def events():
+        # Subscribed here, not in the handler: if the client leaves before the body is
+        # iterated this never runs, so there is no queue left behind without its unsubscribe.
+        queue = subscribe(internal_user_id or None)
+        try:
+            last = await _announcement_payload()
+            yield b"retry: 5000\n" + format_event("announcement", last)
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), _STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Also catches announcements set from another worker (the portal flag is cached briefly).
+                    current = await _announcement_payload()
+                    if current != last:
+                        last = current
+                        yield format_event("announcement", current)
+                    else:
+                        yield b": ping\n\n"
+                    continue
+                if event == "announcement":
+                    last = data
+                yield format_event(event, data)
+        finally:
+            unsubscribe(queue, internal_user_id or None)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
@@ -6,7 +6,7 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
 
 from ..settings import ROBLOX_SUPABASE_TABLE
-from .supabase import is_supabase_ready, supabase_request
+from .supabase import get_cached_history, is_supabase_ready, store_cached_history, supabase_request
 
 
 async def upsert_roblox_appeal(
@@ -45,6 +45,7 @@ async def upsert_roblox_appeal(
         logging.error(f"Error checking for existing Roblox appeal for {internal_user_id}: {exc}")
         return None
 
+    now_iso = datetime.now(timezone.utc).isoformat()
     payload = {
         "internal_user_id": internal_user_id, # Store internal user ID
         "roblox_id": roblox_id,
@@ -54,7 +55,7 @@ async def upsert_roblox_appeal(
         "short_ban_reason": short_ban_reason,
         "discord_user_id": discord_user_id,
         "status": "pending",  # Always start as pending
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": now_iso,
     }
     
     # If we found an existing appeal, use its ID to update it.
@@ -63,7 +64,7 @@ async def upsert_roblox_appeal(
         prefer_header = "resolution=merge-duplicates,return=representation"
     else:
         # This is a new appeal, set created_at
-        payload["created_at"] = datetime.now(timezone.utc).isoformat()
+        payload["created_at"] = now_iso
         prefer_header = "resolution=merge-duplicates,return=representation"
 
 
@@ -184,6 +185,11 @@ async def get_roblox_appeal_history(
     if not is_supabase_ready():
         return []
 
+    cache_key = (ROBLOX_SUPABASE_TABLE, limit, None)
+    cached = get_cached_history(internal_user_id, cache_key)
+    if cached is not None:
+        return cached
+
     params = {
         "internal_user_id": f"eq.{internal_user_id}",
         "order": "created_at.desc",
@@ -192,6 +198,8 @@ async def get_roblox_appeal_history(
 
     try:
         records = await supabase_request("get", ROBLOX_SUPABASE_TABLE, params=params)
+        if isinstance(records, list):
+            store_cached_history(internal_user_id, cache_key, records)
         return records if records and isinstance(records, list) else []
     except Exception as exc:
         logging.error(f"Error getting Roblox appeal history for internal_user_id={internal_user_id}: {exc}")
@@ -3,12 +3,17 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from typing import List, Optional
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import HTTPException
 
-from ..clients import get_http_client
+from ..clients import get_discord_client, get_redis
 from ..settings import (
     APPEAL_CHANNEL_ID,
     AUTH_LOG_CHANNEL_ID,
@@ -19,33 +24,96 @@ from ..settings import (
     DISCORD_CLIENT_SECRET,
     DISCORD_REDIRECT_URI,
     DM_GUILD_ID,
-    GUILD_NAME_CACHE_TTL_SECONDS,
     OAUTH_SCOPES,
+    PERSIST_SESSION_SECONDS,
     REMOVE_FROM_DM_GUILD_AFTER_DM,
     ROBLOX_APPEAL_CHANNEL_ID,
     ROBLOX_UNBAN_REQUEST_CHANNEL_ID,
     TARGET_GUILD_ID,
     TARGET_GUILD_NAME,
 )
-from ..state import _declined_users, _guild_name_cache, _user_tokens
+from ..state import _ban_cache, _guild_name_cache, _user_tokens
+from .kv import declined_users, dm_channels
+
+# The bot token and the fixed ids are settings, so headers and URL prefixes are built once.
+# Read-only so a caller cannot leak extra headers into every later request.
+BOT_AUTH_HEADERS = MappingProxyType({"Authorization": f"Bot {DISCORD_BOT_TOKEN}"})
+_BOT_JSON_HEADERS = MappingProxyType({**BOT_AUTH_HEADERS, "Content-Type": "application/json"})
+_TARGET_BANS_URL = f"{DISCORD_API_BASE}/guilds/{TARGET_GUILD_ID}/bans/"
+_TARGET_MEMBERS_URL = f"{DISCORD_API_BASE}/guilds/{TARGET_GUILD_ID}/members/"
+_DM_GUILD_MEMBERS_URL = f"{DISCORD_API_BASE}/guilds/{DM_GUILD_ID}/members/"
+_AUTH_LOG_POST_URL = f"{DISCORD_API_BASE}/channels/{AUTH_LOG_CHANNEL_ID}/messages"
+_APPEAL_POST_URL = f"{DISCORD_API_BASE}/channels/{APPEAL_CHANNEL_ID}/messages"
+_ROBLOX_APPEAL_POST_URL = f"{DISCORD_API_BASE}/channels/{ROBLOX_APPEAL_CHANNEL_ID}/messages"
+_ROBLOX_UNBAN_REQUEST_POST_URL = f"{DISCORD_API_BASE}/channels/{ROBLOX_UNBAN_REQUEST_CHANNEL_ID}/messages"
 
 # Simple concurrency guard for Discord REST calls to smooth 429s
 _discord_semaphore = asyncio.Semaphore(5)
 
+# Last rate-limit headers seen per route: {route: (remaining, reset_at on the loop clock)}.
+# Discord buckets on the channel/guild/webhook id, so other ids collapse to ":id".
+_MAJOR_PARAMS = frozenset({"channels", "guilds", "webhooks"})
+_route_limits: TTLCache = TTLCache(maxsize=2048, ttl=120)
 
-async def _request_with_retry(method: str, url: str, *, json: Optional[dict] = None, headers: Optional[dict] = None, params: Optional[dict] = None, **kwargs):
-    client = get_http_client()
+
+def _route_key(method: str, url: str) -> str:
+    path = url.split("?", 1)[0]
+    if path.startswith(DISCORD_API_BASE):
+        path = path[len(DISCORD_API_BASE):]
+    parts = path.strip("/").split("/")
+    for i, part in enumerate(parts):
+        if part.isdigit() and (i == 0 or parts[i - 1] not in _MAJOR_PARAMS):
+            parts[i] = ":id"
+    return f"{method.upper()} /{'/'.join(parts)}"
+
+
+async def _wait_for_route(route: str) -> None:
+    """Sleep until the route's bucket resets when the last response said it was empty."""
+    limits = _route_limits.get(route)
+    if not limits or limits[0] > 0:
+        return
+    delay = limits[1] - asyncio.get_running_loop().time()
+    if delay > 0:
+        await asyncio.sleep(min(delay, 10.0))
+
+
+def _record_route_limits(route: str, resp: httpx.Response) -> None:
+    remaining = resp.headers.get("X-RateLimit-Remaining")
+    reset_after = resp.headers.get("X-RateLimit-Reset-After")
+    if remaining is None or reset_after is None:
+        return
+    try:
+        reset_at = asyncio.get_running_loop().time() + float(reset_after)
+        _route_limits[route] = (int(remaining), reset_at)
+    except ValueError:
+        pass
+
+
+async def discord_request(method: str, url: str, *, json: Optional[dict] = None, headers: Optional[dict] = None, params: Optional[dict] = None, **kwargs):
+    """Discord REST call that waits out exhausted route buckets and retries 429s."""
+    client = get_discord_client()
+    # Only bot-token buckets are shared; user OAuth calls are limited per token, so gating
+    # them on a common key would let one user's exhausted bucket stall everyone's login.
+    auth = (headers or {}).get("Authorization", "")
+    route = _route_key(method, url) if auth.startswith("Bot ") else None
+    if json is not None:
+        # Encode once with orjson; retries resend the same bytes.
+        kwargs["content"] = orjson.dumps(json)
+        headers = {**(headers or {}), "Content-Type": "application/json"}
     last_resp = None
     for attempt in range(4):
+        if route:
+            await _wait_for_route(route)
         async with _discord_semaphore:
             resp = await client.request(
                 method,
                 url,
-                json=json,
                 headers=headers,
                 params=params,
                 **kwargs,
             )
+        if route:
+            _record_route_limits(route, resp)
         last_resp = resp
         if resp.status_code != 429:
             return resp
@@ -58,21 +126,24 @@ async def _request_with_retry(method: str, url: str, *, json: Optional[dict] = N
     return last_resp
 
 
+# Everything but the state is fixed, so encode it once; state tokens are already URL-safe.
+_OAUTH_URL_PREFIX = (
+    f"{DISCORD_API_BASE}/oauth2/authorize"
+    f"?response_type=code&client_id={quote(str(DISCORD_CLIENT_ID), safe='')}"
+    f"&scope={quote(OAUTH_SCOPES, safe='')}"
+    f"&redirect_uri={quote(DISCORD_REDIRECT_URI or '', safe='')}"
+    f"&prompt=none"
+    f"&state="
+)
+
+
 def oauth_authorize_url(state: str) -> str:
-    return (
-        f"{DISCORD_API_BASE}/oauth2/authorize"
-        f"?response_type=code&client_id={DISCORD_CLIENT_ID}"
-        f"&scope={OAUTH_SCOPES}"
-        f"&redirect_uri={DISCORD_REDIRECT_URI}"
-        f"&state={state}"
-        f"&prompt=none"
-    )
+    return _OAUTH_URL_PREFIX + state
 
 
 async def exchange_code_for_token(code: str) -> dict:
     try:
-        client = get_http_client()
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "post",
             f"{DISCORD_API_BASE}/oauth2/token",
             headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -90,23 +161,70 @@ async def exchange_code_for_token(code: str) -> dict:
         logging.warning("OAuth code exchange failed: %s | body=%s", exc, exc.response.text)
         raise HTTPException(status_code=400, detail="Authentication failed. Please try logging in again.") from exc
 
-def store_user_token(user_id: str, token_data: dict) -> None:
+async def store_user_token(user_id: str, token_data: dict) -> None:
     expires_in = float(token_data.get("expires_in") or 0)
-    _user_tokens[user_id] = {
+    record = {
         "access_token": token_data.get("access_token"),
         "refresh_token": token_data.get("refresh_token"),
         "expires_at": time.time() + expires_in - 60 if expires_in else None,
         "token_type": token_data.get("token_type", "Bearer"),
     }
+    _user_tokens[user_id] = record
+    redis = get_redis()
+    if redis is None:
+        return
+    key = f"user_tokens:{user_id}"
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={k: "" if v is None else str(v) for k, v in record.items()})
+            pipe.expire(key, PERSIST_SESSION_SECONDS)
+            await pipe.execute()
+    except Exception as exc:
+        logging.warning("Failed to store token for user %s in Redis: %s", user_id, exc)
+
+
+async def _load_user_token(user_id: str) -> dict:
+    redis = get_redis()
+    if redis is not None:
+        try:
+            raw = await redis.hgetall(f"user_tokens:{user_id}")
+        except Exception as exc:
+            logging.warning("Failed to load token for user %s from Redis: %s", user_id, exc)
+        else:
+            if raw:
+                expires_at = raw.get("expires_at")
+                return {
+                    "access_token": raw.get("access_token") or None,
+                    "refresh_token": raw.get("refresh_token") or None,
+                    "expires_at": float(expires_at) if expires_at else None,
+                    "token_type": raw.get("token_type") or "Bearer",
+                }
+    return _user_tokens.get(user_id) or {}
+
+
+# One refresh per user at a time: Discord rotates the refresh token, so a second
+# concurrent refresh with the old one would fail (and can revoke the grant).
+_token_refreshes: "Dict[str, asyncio.Task[Optional[str]]]" = {}
 
 
 async def refresh_user_token(user_id: str) -> Optional[str]:
-    token_data = _user_tokens.get(user_id) or {}
+    """Refresh the user's access token; concurrent callers share one in-flight refresh."""
+    pending = _token_refreshes.get(user_id)
+    if pending is None:
+        pending = asyncio.create_task(_refresh_user_token(user_id))
+        _token_refreshes[user_id] = pending
+        pending.add_done_callback(lambda _: _token_refreshes.pop(user_id, None))
+    # Shielded so one caller's cancellation doesn't abort the refresh for the others.
+    return await asyncio.shield(pending)
+
+
+async def _refresh_user_token(user_id: str) -> Optional[str]:
+    token_data = await _load_user_token(user_id)
     refresh_token = token_data.get("refresh_token")
     if not refresh_token:
         return None
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "post",
             f"{DISCORD_API_BASE}/oauth2/token",
             data={
@@ -119,7 +237,7 @@ async def refresh_user_token(user_id: str) -> Optional[str]:
         )
         resp.raise_for_status()
         new_token = resp.json()
-        store_user_token(user_id, new_token)
+        await store_user_token(user_id, new_token)
         return new_token.get("access_token")
     except Exception as exc:
         logging.warning("Failed to refresh token for user %s: %s", user_id, exc)
@@ -127,7 +245,7 @@ async def refresh_user_token(user_id: str) -> Optional[str]:
 
 
 async def get_valid_access_token(user_id: str) -> Optional[str]:
-    token_data = _user_tokens.get(user_id) or {}
+    token_data = await _load_user_token(user_id)
     access_token = token_data.get("access_token")
     expires_at = token_data.get("expires_at")
     if not access_token:
@@ -138,7 +256,7 @@ async def get_valid_access_token(user_id: str) -> Optional[str]:
 
 
 async def fetch_discord_user(access_token: str) -> dict:
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "get",
         f"{DISCORD_API_BASE}/users/@me",
         headers={"Authorization": f"Bearer {access_token}"},
@@ -154,10 +272,10 @@ async def post_channel_message(channel_id: str, *, content: Optional[str] = None
         payload["content"] = content
     if embed:
         payload["embeds"] = [embed]
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "post",
         f"{DISCORD_API_BASE}/channels/{channel_id}/messages",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        headers=BOT_AUTH_HEADERS,
         json=payload,
     )
     try:
@@ -168,41 +286,54 @@ async def post_channel_message(channel_id: str, *, content: Optional[str] = None
         return None
 
 
+_BAN_CACHE_MISS = object()
+
+
 async def fetch_ban_if_exists(user_id: str) -> Optional[dict]:
-    resp = await _request_with_retry(
+    # Ban state is stable on the minute scale; both hits and misses are cached briefly.
+    cached = _ban_cache.get(user_id, _BAN_CACHE_MISS)
+    if cached is not _BAN_CACHE_MISS:
+        return cached
+    resp = await discord_request(
         "get",
-        f"{DISCORD_API_BASE}/guilds/{TARGET_GUILD_ID}/bans/{user_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        _TARGET_BANS_URL + str(user_id),
+        headers=BOT_AUTH_HEADERS,
     )
     if resp.status_code == 200:
-        return resp.json()
+        ban = resp.json()
+        _ban_cache[user_id] = ban
+        return ban
     if resp.status_code == 404:
+        _ban_cache[user_id] = None
         return None
     resp.raise_for_status()
     return None
 
 
+def invalidate_ban_cache(user_id: str) -> None:
+    _ban_cache.pop(str(user_id), None)
+
+
 async def fetch_guild_name(guild_id: str) -> Optional[str]:
     if not guild_id or guild_id == "0":
         return None
     if TARGET_GUILD_NAME and str(guild_id) == str(TARGET_GUILD_ID):
         return TARGET_GUILD_NAME
 
-    now = time.time()
     cached = _guild_name_cache.get(str(guild_id))
-    if cached and (now - cached[1]) < GUILD_NAME_CACHE_TTL_SECONDS:
-        return cached[0]
+    if cached:
+        return cached
 
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "get",
             f"{DISCORD_API_BASE}/guilds/{guild_id}",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+            headers=BOT_AUTH_HEADERS,
         )
         if resp.status_code == 200:
             name = (resp.json() or {}).get("name")
             if name:
-                _guild_name_cache[str(guild_id)] = (str(name), now)
+                _guild_name_cache[str(guild_id)] = str(name)
                 return str(name)
     except Exception:
         pass
@@ -212,34 +343,34 @@ async def fetch_guild_name(guild_id: str) -> Optional[str]:
 async def ensure_dm_guild_membership(user_id: str) -> bool:
     if not DM_GUILD_ID:
         return False
-    if _declined_users.get(user_id):
+    if await declined_users.get(user_id):
         return False
     token = await get_valid_access_token(user_id)
     if not token:
         return False
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "put",
-        f"{DISCORD_API_BASE}/guilds/{DM_GUILD_ID}/members/{user_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        _DM_GUILD_MEMBERS_URL + str(user_id),
+        headers=BOT_AUTH_HEADERS,
         json={"access_token": token},
     )
     added = resp.status_code in (200, 201, 204)
     if added and CLEANUP_DM_INVITES:
         try:
-            invite_resp = await _request_with_retry(
+            invite_resp = await discord_request(
                 "get",
                 f"{DISCORD_API_BASE}/guilds/{DM_GUILD_ID}/invites",
-                headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+                headers=BOT_AUTH_HEADERS,
             )
             if invite_resp.status_code == 200:
                 for invite in invite_resp.json() or []:
                     code = invite.get("code")
                     if not code:
                         continue
-                    await _request_with_retry(
+                    await discord_request(
                         "delete",
                         f"{DISCORD_API_BASE}/invites/{code}",
-                        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+                        headers=BOT_AUTH_HEADERS,
                     )
             else:
                 logging.warning(
@@ -258,10 +389,10 @@ async def maybe_remove_from_dm_guild(user_id: str, *, attempt: int = 0) -> None:
     """
     if not DM_GUILD_ID or not REMOVE_FROM_DM_GUILD_AFTER_DM:
         return
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "delete",
-        f"{DISCORD_API_BASE}/guilds/{DM_GUILD_ID}/members/{user_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        _DM_GUILD_MEMBERS_URL + str(user_id),
+        headers=BOT_AUTH_HEADERS,
     )
     if resp.status_code == 429 and attempt < 3:
         try:
@@ -273,10 +404,10 @@ async def maybe_remove_from_dm_guild(user_id: str, *, attempt: int = 0) -> None:
 
 
 async def remove_from_target_guild(user_id: str) -> Optional[int]:
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "delete",
-        f"{DISCORD_API_BASE}/guilds/{TARGET_GUILD_ID}/members/{user_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        _TARGET_MEMBERS_URL + str(user_id),
+        headers=BOT_AUTH_HEADERS,
     )
     if resp.status_code not in (200, 204, 404):
         logging.warning("Failed to remove user %s from guild %s: %s %s", user_id, TARGET_GUILD_ID, resp.status_code, resp.text)
@@ -288,10 +419,10 @@ async def add_user_to_guild(user_id: str, guild_id: str) -> Optional[int]:
     if not token:
         logging.warning("No OAuth token cached for user %s; cannot re-add to guild %s", user_id, guild_id)
         return None
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "put",
         f"{DISCORD_API_BASE}/guilds/{guild_id}/members/{user_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        headers=BOT_AUTH_HEADERS,
         json={"access_token": token},
     )
     if resp.status_code not in (200, 201, 204):
@@ -299,13 +430,168 @@ async def add_user_to_guild(user_id: str, guild_id: str) -> Optional[int]:
     return resp.status_code
 
 
-async def send_log_message(content: str) -> None:
+# Log channel posts are queued and sent by background consumers so callers never wait on Discord.
+LOG_QUEUE_MAX = 1000
+LOG_BATCH_WINDOW_SECONDS = 0.5
+LOG_BATCH_MAX_CHARS = 1900
+LOG_RATE_LIMIT = (5, 5.0)  # Discord allows 5 messages per 5s per channel
+LOG_EMBEDS_PER_MESSAGE = 10  # Discord's per-message embed limit
+LOG_EMBED_CHARS_PER_MESSAGE = 6000  # Discord's combined text limit across a message's embeds
+
+# Queued by _LogBatcher.stop: the consumer posts everything ahead of it, then returns.
+_LOG_STOP: Tuple[str, Any] = ("", object())
+
+
+class _LogBatcher:
+    """A bounded queue of (channel, item) drained by one consumer.
+
+    Items for the same channel that arrive within LOG_BATCH_WINDOW_SECONDS are packed into
+    one post, bounded by max_items and by max_size (size_of per item plus separator between
+    items). Each batcher paces its own posts with a LOG_RATE_LIMIT token bucket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        post: Callable[[str, List[Any]], Awaitable[None]],
+        size_of: Callable[[Any], int],
+        *,
+        max_size: int,
+        max_items: Optional[int] = None,
+        separator: int = 0,
+    ) -> None:
+        self.name = name
+        self.post = post
+        self.size_of = size_of
+        self.max_size = max_size
+        self.max_items = max_items
+        self.separator = separator
+        self.queue: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue(maxsize=LOG_QUEUE_MAX)
+        # Items the consumer had taken off the queue but not started posting when it was cancelled.
+        self._unsent: List[Tuple[str, Any]] = []
+
+    def put(self, channel_id: str, item: Any) -> None:
+        self._enqueue((channel_id, item))
+
+    def _enqueue(self, entry: Tuple[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Shed the oldest item rather than block or grow without bound.
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.queue.put_nowait(entry)
+
+    def _fits(self, count: int, size: int, item_size: int) -> bool:
+        if self.max_items is not None and count >= self.max_items:
+            return False
+        return size + self.separator + item_size <= self.max_size
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        max_posts, per_seconds = LOG_RATE_LIMIT
+        sent_at: deque = deque(maxlen=max_posts)
+        carry: Optional[Tuple[str, Any]] = None
+        channel_id, items = "", []
+        try:
+            while True:
+                entry = carry if carry is not None else await self.queue.get()
+                carry = None
+                if entry is _LOG_STOP:
+                    return
+                channel_id, first = entry
+                items = [first]
+                size = self.size_of(first)
+                deadline = loop.time() + LOG_BATCH_WINDOW_SECONDS
+                while self.max_items is None or len(items) < self.max_items:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if entry is _LOG_STOP:
+                        carry = entry
+                        break
+                    item_size = self.size_of(entry[1])
+                    if entry[0] != channel_id or not self._fits(len(items), size, item_size):
+                        carry = entry
+                        break
+                    items.append(entry[1])
+                    size += self.separator + item_size
+
+                # Token bucket: wait for the oldest of the last N posts to age out of the window.
+                if len(sent_at) == max_posts:
+                    wait = sent_at[0] + per_seconds - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                sent_at.append(loop.time())
+                batch, items = items, []
+                await self.post(channel_id, batch)
+        except asyncio.CancelledError:
+            # A post already in flight is not retried; anything not yet sent is left for flush().
+            self._unsent.extend((channel_id, item) for item in items)
+            if carry is not None and carry is not _LOG_STOP:
+                self._unsent.append(carry)
+            raise
+
+    async def stop(self, task: Optional["asyncio.Task[None]"], timeout: float = 5.0) -> None:
+        """Let the consumer post what it holds and everything queued so far, then return."""
+        if task is None or task.done():
+            return
+        self._enqueue(_LOG_STOP)
+        try:
+            await asyncio.wait_for(task, timeout)
+        except Exception as exc:
+            # wait_for cancelled it; flush() posts whatever was left, unpaced.
+            logging.warning("%s consumer did not drain before shutdown: %s", self.name, exc)
+
+    def _pack(self, entries: List[Tuple[str, Any]]) -> List[Tuple[str, List[Any]]]:
+        by_channel: Dict[str, List[Any]] = {}
+        for channel_id, item in entries:
+            by_channel.setdefault(channel_id, []).append(item)
+        batches: List[Tuple[str, List[Any]]] = []
+        for channel_id, items in by_channel.items():
+            batch: List[Any] = []
+            size = 0
+            for item in items:
+                item_size = self.size_of(item)
+                if batch and not self._fits(len(batch), size, item_size):
+                    batches.append((channel_id, batch))
+                    batch, size = [], 0
+                size += (self.separator if batch else 0) + item_size
+                batch.append(item)
+            if batch:
+                batches.append((channel_id, batch))
+        return batches
+
+    async def flush(self, timeout: float = 5.0) -> None:
+        """Best-effort post of everything still queued, unpaced; used on shutdown."""
+        entries = list(self._unsent)
+        self._unsent.clear()
+        while not self.queue.empty():
+            entry = self.queue.get_nowait()
+            if entry is not _LOG_STOP:
+                entries.append(entry)
+        if not entries:
+            return
+        batches = self._pack(entries)
+        try:
+            await asyncio.wait_for(asyncio.gather(*(self.post(channel_id, items) for channel_id, items in batches)), timeout)
+        except Exception as exc:
+            logging.warning("Dropped %d queued %s on shutdown: %s", len(entries), self.name, exc)
+
+
+async def _post_log_lines(_channel_id: str, lines: List[str]) -> None:
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "post",
-            f"{DISCORD_API_BASE}/channels/{AUTH_LOG_CHANNEL_ID}/messages",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
-            json={"content": content},
+            _AUTH_LOG_POST_URL,
+            headers=BOT_AUTH_HEADERS,
+            json={"content": "\n".join(lines)},
             timeout=10,
         )
         resp.raise_for_status()
@@ -313,6 +599,86 @@ async def send_log_message(content: str) -> None:
         logging.warning("Log post failed: %s", exc)
 
 
+def _embed_text_size(embed: dict) -> int:
+    size = len(embed.get("title") or "") + len(embed.get("description") or "")
+    size += len((embed.get("footer") or {}).get("text") or "")
+    for field in embed.get("fields") or ():
+        size += len(field.get("name") or "") + len(field.get("value") or "")
+    return size
+
+
+async def _post_log_embeds(channel_id: str, embeds: List[dict]) -> None:
+    try:
+        resp = await discord_request(
+            "post",
+            f"{DISCORD_API_BASE}/channels/{channel_id}/messages",
+            headers=BOT_AUTH_HEADERS,
+            json={"embeds": embeds},
+            timeout=10,
+        )
+        resp.raise_for_status()
+    except Exception as exc:
+        logging.warning("Log embed post to %s failed (%d embeds): %s", channel_id, len(embeds), exc)
+
+
+# Auth-log lines all go to one channel and are joined with newlines into one message.
+_log_lines = _LogBatcher("log lines", _post_log_lines, len, max_size=LOG_BATCH_MAX_CHARS, separator=1)
+# Decision log embeds: a burst of clicks becomes a few multi-embed posts instead of one POST per decision.
+_log_embeds = _LogBatcher(
+    "log embeds",
+    _post_log_embeds,
+    _embed_text_size,
+    max_size=LOG_EMBED_CHARS_PER_MESSAGE,
+    max_items=LOG_EMBEDS_PER_MESSAGE,
+)
+
+
+def queue_log_message(content: str) -> None:
+    """Queue a line for the auth log channel; delivery happens in run_log_consumer.
+
+    Synchronous so request handlers enqueue inline instead of spawning a task per line.
+    """
+    content = (content or "")[:LOG_BATCH_MAX_CHARS]
+    if not content:
+        return
+    _log_lines.put("", content)
+
+
+def queue_log_embed(channel_id: str, embed: dict) -> None:
+    """Queue an embed for a log channel; delivery happens in run_embed_log_consumer."""
+    _log_embeds.put(str(channel_id), embed)
+
+
+async def run_log_consumer() -> None:
+    await _log_lines.run()
+
+
+async def run_embed_log_consumer() -> None:
+    await _log_embeds.run()
+
+
+async def stop_log_consumer(task: Optional["asyncio.Task[None]"], timeout: float = 5.0) -> None:
+    await _log_lines.stop(task, timeout)
+
+
+async def stop_embed_log_consumer(task: Optional["asyncio.Task[None]"], timeout: float = 5.0) -> None:
+    await _log_embeds.stop(task, timeout)
+
+
+async def flush_log_queue(timeout: float = 5.0) -> None:
+    await _log_lines.flush(timeout)
+
+
+async def flush_embed_log_queue(timeout: float = 5.0) -> None:
+    await _log_embeds.flush(timeout)
+
+
+_APPEAL_BUTTONS = (
+    {"type": 2, "style": 3, "label": "Accept"},
+    {"type": 2, "style": 4, "label": "Decline"},
+)
+
+
 async def post_appeal_embed(
     appeal_id: str,
     user: dict,
@@ -331,30 +697,21 @@ async def post_appeal_embed(
         ),
         "footer": {"text": f"User ID: {user['id']}"},
     }
+    accept_button, decline_button = _APPEAL_BUTTONS
     components = [
         {
             "type": 1,
             "components": [
-                {
-                    "type": 2,
-                    "style": 3,
-                    "label": "Accept",
-                    "custom_id": f"web_appeal_accept:{appeal_id}:{user['id']}",
-                },
-                {
-                    "type": 2,
-                    "style": 4,
-                    "label": "Decline",
-                    "custom_id": f"web_appeal_decline:{appeal_id}:{user['id']}",
-                },
+                {**accept_button, "custom_id": f"web_appeal_accept:{appeal_id}:{user['id']}"},
+                {**decline_button, "custom_id": f"web_appeal_decline:{appeal_id}:{user['id']}"},
             ],
         }
     ]
-    resp = await _request_with_retry(
+    resp = await discord_request(
         "post",
-        f"{DISCORD_API_BASE}/channels/{APPEAL_CHANNEL_ID}/messages",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
-        json={"embeds": [embed], "components": components},
+        _APPEAL_POST_URL,
+        headers=_BOT_JSON_HEADERS,
+        content=orjson.dumps({"embeds": [embed], "components": components}),
     )
     if resp.status_code == 429:
         raise HTTPException(status_code=429, detail="Discord is rate limiting. Please retry in a minute.")
@@ -394,10 +751,10 @@ async def post_roblox_initial_appeal_embed(
         ]
     }]
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "post",
-            f"{DISCORD_API_BASE}/channels/{ROBLOX_APPEAL_CHANNEL_ID}/messages",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+            _ROBLOX_APPEAL_POST_URL,
+            headers=BOT_AUTH_HEADERS,
             json={"embeds": [embed], "components": components},
         )
         resp.raise_for_status()
@@ -441,10 +798,10 @@ async def post_roblox_final_appeal_embed(
         ]
     }]
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "post",
-            f"{DISCORD_API_BASE}/channels/{ROBLOX_UNBAN_REQUEST_CHANNEL_ID}/messages",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+            _ROBLOX_UNBAN_REQUEST_POST_URL,
+            headers=BOT_AUTH_HEADERS,
             json={"embeds": [embed], "components": components},
         )
         resp.raise_for_status()
@@ -454,25 +811,46 @@ async def post_roblox_final_appeal_embed(
         return None
 
 
-async def dm_user(user_id: str, embed: dict) -> bool:
-    await ensure_dm_guild_membership(user_id)
-    dm = await _request_with_retry(
+async def _open_dm_channel(user_id: str) -> Optional[str]:
+    cached = await dm_channels.get(user_id)
+    if cached:
+        return cached
+    dm = await discord_request(
         "post",
         f"{DISCORD_API_BASE}/users/@me/channels",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        headers=BOT_AUTH_HEADERS,
         json={"recipient_id": user_id},
     )
     if dm.status_code not in (200, 201):
-        return False
+        return None
     channel_id = dm.json().get("id")
-    if not channel_id:
-        return False
-    resp = await _request_with_retry(
+    if channel_id:
+        await dm_channels.set(user_id, channel_id)
+    return channel_id
+
+
+async def _post_dm(channel_id: str, embed: dict) -> httpx.Response:
+    return await discord_request(
         "post",
         f"{DISCORD_API_BASE}/channels/{channel_id}/messages",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        headers=BOT_AUTH_HEADERS,
         json={"embeds": [embed]},
     )
+
+
+async def dm_user(user_id: str, embed: dict) -> bool:
+    await ensure_dm_guild_membership(user_id)
+    channel_id = await _open_dm_channel(user_id)
+    if not channel_id:
+        return False
+    resp = await _post_dm(channel_id, embed)
+    if resp.status_code == 404:
+        # The cached channel is gone; open a fresh one and try once more.
+        await dm_channels.delete(user_id)
+        channel_id = await _open_dm_channel(user_id)
+        if not channel_id:
+            return False
+        resp = await _post_dm(channel_id, embed)
     delivered = resp.status_code in (200, 201)
     if delivered:
         await maybe_remove_from_dm_guild(user_id)
@@ -484,16 +862,20 @@ async def unban_user_from_guild(user_id: str, guild_id: str) -> bool:
     Unbans a user from a specific Discord guild.
     """
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "delete",
             f"{DISCORD_API_BASE}/guilds/{guild_id}/bans/{user_id}",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+            headers=BOT_AUTH_HEADERS,
         )
         resp.raise_for_status()
+        if str(guild_id) == str(TARGET_GUILD_ID):
+            invalidate_ban_cache(user_id)
         return True
     except httpx.HTTPStatusError as exc:
         if exc.response.status_code == 404: # User not banned
             logging.info(f"Attempted to unban user {user_id} from guild {guild_id}, but user was not banned.")
+            if str(guild_id) == str(TARGET_GUILD_ID):
+                invalidate_ban_cache(user_id)
             return True # Consider it successful if they weren't banned in the first place
         logging.error(f"Failed to unban user {user_id} from guild {guild_id}: {exc} - {exc.response.text}")
         return False
@@ -512,10 +894,10 @@ async def edit_discord_message(
     if components is not None:
         payload["components"] = components
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "patch",
             f"{DISCORD_API_BASE}/channels/{channel_id}/messages/{message_id}",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+            headers=BOT_AUTH_HEADERS,
             json=payload,
         )
         resp.raise_for_status()
@@ -528,10 +910,10 @@ async def edit_discord_message(
 async def delete_message(channel_id: str, message_id: str) -> bool:
     """Deletes a message from a Discord channel."""
     try:
-        resp = await _request_with_retry(
+        resp = await discord_request(
             "delete",
             f"{DISCORD_API_BASE}/channels/{channel_id}/messages/{message_id}",
-            headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+            headers=BOT_AUTH_HEADERS,
         )
         resp.raise_for_status()
         logging.info(f"Successfully deleted message {message_id} from channel {channel_id}.")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional
+
+from ..clients import get_http_client
+from ..state import _geo_cache
+
+_PRIVATE_IPS = {"127.0.0.1", "::1", "unknown"}
+
+
+async def fetch_ip_geo(ip: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Look up coarse geodata for an IP via ipapi.co, cached per IP.
+    Returns None for local/unknown addresses or when the lookup fails.
+    """
+    if not ip or ip in _PRIVATE_IPS:
+        return None
+    cached = _geo_cache.get(ip)
+    if cached is not None:
+        return cached
+    try:
+        client = get_http_client()
+        resp = await client.get(f"https://ipapi.co/{ip}/json/", timeout=3)
+        if resp.status_code != 200:
+            return None
+        data = resp.json() or {}
+    except Exception as exc:
+        logging.warning("Geo lookup failed for ip=%s error=%s", ip, exc)
+        return None
+    if isinstance(data, dict) and not data.get("error"):
+        _geo_cache[ip] = data
+        return data
+    return None
@@ -1,20 +1,37 @@
 from __future__ import annotations
 
 import logging
+import time
+from functools import lru_cache
 from typing import List, Optional
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
 
-from ..clients import get_http_client
-from ..settings import DISCORD_API_BASE, DISCORD_BOT_TOKEN, DISCORD_PUBLIC_KEY
+from ..settings import DISCORD_API_BASE, DISCORD_PUBLIC_KEY
+from ..utils import OrjsonResponse
+from .discord_api import BOT_AUTH_HEADERS, discord_request
+
+
+try:
+    import nacl.exceptions  # type: ignore
+    import nacl.signing  # type: ignore
+except ImportError:  # verify_signature rejects every request without PyNaCl
+    nacl = None  # type: ignore
+
+
+# Signed requests whose X-Signature-Timestamp is further than this from our clock are
+# rejected as replays before the (comparatively expensive) Ed25519 check.
+_MAX_TIMESTAMP_SKEW = 300
+
+
+@lru_cache(maxsize=1)
+def _verify_key():
+    """Parse the application public key once; every interaction is checked against it."""
+    return nacl.signing.VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
 
 
 def verify_signature(request: Request, body: bytes) -> bool:
-    try:
-        import nacl.exceptions  # type: ignore
-        import nacl.signing  # type: ignore
-    except Exception:
+    if nacl is None:
         logging.error('PyNaCl is required for Discord signature verification. Install "PyNaCl".')
         return False
 
@@ -23,15 +40,16 @@ def verify_signature(request: Request, body: bytes) -> bool:
     if not signature or not timestamp:
         return False
     try:
-        key = nacl.signing.VerifyKey(bytes.fromhex(DISCORD_PUBLIC_KEY))
-        key.verify(f"{timestamp}".encode() + body, bytes.fromhex(signature))
+        if abs(time.time() - int(timestamp)) > _MAX_TIMESTAMP_SKEW:
+            return False
+        _verify_key().verify(timestamp.encode() + body, bytes.fromhex(signature))
         return True
     except (ValueError, nacl.exceptions.BadSignatureError):
         return False
 
 
-async def respond_ephemeral(content: str) -> JSONResponse:
-    return JSONResponse(
+async def respond_ephemeral(content: str) -> OrjsonResponse:
+    return OrjsonResponse(
         {
             "type": 4,
             "data": {"content": content, "flags": 1 << 6},
@@ -39,8 +57,8 @@ async def respond_ephemeral(content: str) -> JSONResponse:
     )
 
 
-async def respond_ephemeral_embed(title: str, description: str, color: int = 0xE67E22) -> JSONResponse:
-    return JSONResponse(
+async def respond_ephemeral_embed(title: str, description: str, color: int = 0xE67E22) -> OrjsonResponse:
+    return OrjsonResponse(
         {
             "type": 4,
             "data": {
@@ -52,22 +70,22 @@ async def respond_ephemeral_embed(title: str, description: str, color: int = 0xE
 
 
 async def delete_message(channel_id: str, message_id: str) -> Optional[int]:
-    client = get_http_client()
-    resp = await client.delete(
+    resp = await discord_request(
+        "delete",
         f"{DISCORD_API_BASE}/channels/{channel_id}/messages/{message_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        headers=BOT_AUTH_HEADERS,
     )
     return resp.status_code
 
 
 async def update_message(channel_id: str, message_id: str, *, embeds: List[dict], components: Optional[list] = None) -> Optional[int]:
-    client = get_http_client()
     payload: dict = {"embeds": embeds}
     if components is not None:
         payload["components"] = components
-    resp = await client.patch(
+    resp = await discord_request(
+        "patch",
         f"{DISCORD_API_BASE}/channels/{channel_id}/messages/{message_id}",
-        headers={"Authorization": f"Bot {DISCORD_BOT_TOKEN}"},
+        headers=BOT_AUTH_HEADERS,
         json=payload,
     )
     return resp.status_code
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+from ..clients import get_redis
+from ..settings import (
+    APPEAL_COOLDOWN_SECONDS,
+    APPEAL_IP_MAX_REQUESTS,
+    APPEAL_IP_WINDOW_SECONDS,
+    APPEAL_STATE_TTL_SECONDS,
+    PROFILE_CACHE_TTL_SECONDS,
+    SESSION_TTL_SECONDS,
+)
+from ..state import (
+    _appeal_locked,
+    _appeal_rate_limit,
+    _ban_first_seen,
+    _declined_users,
+    _dm_channels,
+    _form_sessions,
+    _profile_cache,
+    _used_sessions,
+)
+from .security import record_local_ip_hit
+
+class SharedStore:
+    """String values keyed per user/session, shared across workers via Redis when configured.
+
+    Without Redis (or when a Redis call fails) the values live in a process-local
+    TTLCache, which must be built with the same TTL as the store.
+    """
+
+    def __init__(self, prefix: str, local: TTLCache, ttl: int) -> None:
+        self.prefix = prefix
+        self.local = local
+        self.ttl = ttl
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _local_get(self, key: str) -> Optional[str]:
+        return self.local.get(key)
+
+    def _local_set(self, key: str, value: str) -> None:
+        self.local[key] = value
+
+    async def get(self, key: str) -> Optional[str]:
+        redis = get_redis()
+        if redis is not None:
+            try:
+                return await redis.get(self._redis_key(key))
+            except Exception as exc:
+                logging.warning("Redis read failed for %s; using local store: %s", self.prefix, exc)
+        return self._local_get(key)
+
+    async def set(self, key: str, value: str = "1") -> None:
+        self._local_set(key, value)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self._redis_key(key), value, ex=self.ttl)
+            except Exception as exc:
+                logging.warning("Redis write failed for %s: %s", self.prefix, exc)
+
+    async def delete(self, key: str) -> None:
+        self.local.pop(key, None)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(self._redis_key(key))
+            except Exception as exc:
+                logging.warning("Redis delete failed for %s: %s", self.prefix, exc)
+
+    async def setdefault(self, key: str, value: str) -> str:
+        """Store value unless the key already exists; return whichever value is stored."""
+        redis = get_redis()
+        if redis is not None:
+            try:
+                redis_key = self._redis_key(key)
+                if await redis.set(redis_key, value, ex=self.ttl, nx=True):
+                    return value
+                existing = await redis.get(redis_key)
+                if existing is not None:
+                    return existing
+            except Exception as exc:
+                logging.warning("Redis write failed for %s; using local store: %s", self.prefix, exc)
+        existing = self._local_get(key)
+        if existing is not None:
+            return existing
+        self._local_set(key, value)
+        return value
+
+
+# Per-user appeal state. Values are "1" flags except first_seen/rate limit timestamps.
+declined_users = SharedStore("declined", _declined_users, APPEAL_STATE_TTL_SECONDS)
+appeal_locked = SharedStore("locked", _appeal_locked, APPEAL_STATE_TTL_SECONDS)
+ban_first_seen = SharedStore("ban_first_seen", _ban_first_seen, APPEAL_STATE_TTL_SECONDS)
+appeal_rate_limit = SharedStore("appeal_rl", _appeal_rate_limit, APPEAL_COOLDOWN_SECONDS)
+used_sessions = SharedStore("used_session", _used_sessions, SESSION_TTL_SECONDS * 2)
+# Appeal form context (ban details, message cache) keyed by the id the form posts back.
+form_sessions = SharedStore("asess", _form_sessions, SESSION_TTL_SECONDS)
+# A user's DM channel id never changes, so it is kept as long as the appeal state.
+dm_channels = SharedStore("dm_channel", _dm_channels, APPEAL_STATE_TTL_SECONDS)
+# Display names fetched by refresh_session_profile, so page views don't each call Discord/Roblox.
+profiles = SharedStore("profile", _profile_cache, PROFILE_CACHE_TTL_SECONDS)
+
+
+async def claim_across_workers(key: str, ttl: int) -> bool:
+    """SET NX the key in Redis; False if another worker already holds it.
+
+    Returns True without Redis (or when the call fails): callers keep their own
+    process-local claim, which is all a single worker needs.
+    """
+    redis = get_redis()
+    if redis is None:
+        return True
+    try:
+        return bool(await redis.set(f"claim:{key}", "1", ex=ttl, nx=True))
+    except Exception as exc:
+        logging.warning("Redis claim failed for %s; relying on the local claim: %s", key, exc)
+        return True
+
+
+async def release_claim(key: str) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.delete(f"claim:{key}")
+    except Exception as exc:
+        logging.warning("Redis claim release failed for %s: %s", key, exc)
+
+
+# claim_submission result codes.
+SUBMIT_OK = 0
+SUBMIT_SESSION_USED = 1
+SUBMIT_LOCKED = 2
+SUBMIT_COOLDOWN = 3
+SUBMIT_IP_LIMITED = 4
+
+# KEYS: used session, appeal lock, cooldown, ip window. ARGV: now, cooldown, ip max, ip window.
+# Returns {code, last_submit}; the cooldown is only written once every check has passed.
+_SUBMIT_GUARD_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then return {1, '0'} end
+if redis.call('EXISTS', KEYS[2]) == 1 then return {2, '0'} end
+local last = redis.call('GET', KEYS[3])
+if last and tonumber(ARGV[1]) - tonumber(last) < tonumber(ARGV[2]) then return {3, last} end
+local hits = redis.call('INCR', KEYS[4])
+if hits == 1 then redis.call('EXPIRE', KEYS[4], ARGV[4]) end
+if hits > tonumber(ARGV[3]) then return {4, '0'} end
+redis.call('SET', KEYS[3], ARGV[1], 'EX', ARGV[2])
+return {0, '0'}
+"""
+
+_submit_guard: Optional[Tuple[object, object]] = None
+
+
+def _submit_guard_script(redis):
+    """Register the guard once per client so later calls go out as EVALSHA."""
+    global _submit_guard
+    if _submit_guard is None or _submit_guard[0] is not redis:
+        _submit_guard = (redis, redis.register_script(_SUBMIT_GUARD_LUA))
+    return _submit_guard[1]
+
+
+async def claim_submission(session_hash: str, identity_key: str, ip: str) -> Tuple[int, float]:
+    """Atomically check session reuse, appeal lock, cooldown and the IP window, then start the cooldown.
+
+    Returns (code, last_submit); last_submit is only meaningful for SUBMIT_COOLDOWN.
+    Concurrent submits for the same identity cannot both get SUBMIT_OK.
+    """
+    now = time.time()
+    redis = get_redis()
+    if redis is not None:
+        try:
+            code, last = await _submit_guard_script(redis)(
+                keys=[
+                    used_sessions._redis_key(session_hash),
+                    appeal_locked._redis_key(identity_key),
+                    appeal_rate_limit._redis_key(identity_key),
+                    f"rl:ip:{ip}",
+                ],
+                args=[repr(now), APPEAL_COOLDOWN_SECONDS, APPEAL_IP_MAX_REQUESTS, APPEAL_IP_WINDOW_SECONDS],
+            )
+            if int(code) == SUBMIT_OK:
+                appeal_rate_limit._local_set(identity_key, repr(now))
+            return int(code), float(last)
+        except Exception as exc:
+            logging.warning("Redis submit guard failed; using local store: %s", exc)
+    # No awaits below, so the check-and-set cannot interleave with another request.
+    if used_sessions._local_get(session_hash):
+        return SUBMIT_SESSION_USED, 0.0
+    if appeal_locked._local_get(identity_key):
+        return SUBMIT_LOCKED, 0.0
+    last = appeal_rate_limit._local_get(identity_key)
+    if last and now - float(last) < APPEAL_COOLDOWN_SECONDS:
+        return SUBMIT_COOLDOWN, float(last)
+    if not record_local_ip_hit(ip):
+        return SUBMIT_IP_LIMITED, 0.0
+    appeal_rate_limit._local_set(identity_key, repr(now))
+    return SUBMIT_OK, 0.0
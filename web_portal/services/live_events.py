@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import orjson
+
+from ..state import _live_subscribers, _status_subscribers
+
+# Per-connection buffer; a tab that stops reading loses events rather than holding memory.
+_SUBSCRIBER_QUEUE_SIZE = 16
+
+
+def subscribe(internal_user_id: Optional[str]) -> asyncio.Queue:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+    _live_subscribers.add(queue)
+    if internal_user_id:
+        _status_subscribers.setdefault(internal_user_id, set()).add(queue)
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue, internal_user_id: Optional[str]) -> None:
+    _live_subscribers.discard(queue)
+    if internal_user_id:
+        queues = _status_subscribers.get(internal_user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                _status_subscribers.pop(internal_user_id, None)
+
+
+def _offer(queue: asyncio.Queue, event: str, data: dict) -> None:
+    try:
+        queue.put_nowait((event, data))
+    except asyncio.QueueFull:
+        pass
+
+
+def publish_announcement(text: Optional[str], epoch: int) -> None:
+    """Push the current announcement/session epoch to every open stream in this process."""
+    data = {"announcement": text, "epoch": epoch}
+    for queue in list(_live_subscribers):
+        _offer(queue, "announcement", data)
+
+
+def publish_status(internal_user_id: Optional[str], appeal_id, status: str) -> None:
+    """Tell a user's open tabs that one of their appeals changed state."""
+    if not internal_user_id:
+        return
+    data = {"appeal_id": str(appeal_id), "status": status}
+    for queue in list(_status_subscribers.get(str(internal_user_id), ())):
+        _offer(queue, "status", data)
+
+
+def format_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
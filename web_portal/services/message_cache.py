@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from typing import List
+from itertools import islice
+from typing import List, Tuple
 
 from ..settings import (
     BOT_EVENT_LOGGING,
@@ -10,17 +12,20 @@ from ..settings import (
     ENABLE_MESSAGE_SNAPSHOTS,
     MESSAGE_CACHE_GUILD_ID,
     RECENT_MESSAGE_CACHE_TTL,
+    SNAPSHOT_DEBOUNCE_SECONDS,
     SUPABASE_CONTEXT_TABLE,
 )
-from ..state import _message_buffer, _recent_message_context
+from ..state import _background_tasks, _message_buffer, _pending_snapshots, _recent_message_context
 from .supabase import is_supabase_ready, supabase_request
 
 # Only track messages from the single configured cache guild.
-MESSAGE_CACHE_GUILD_IDS = {str(MESSAGE_CACHE_GUILD_ID)}
+# Both forms, so the per-message check is a plain lookup: discord.py passes int ids,
+# the snapshot path passes the str form.
+MESSAGE_CACHE_GUILD_IDS = frozenset({MESSAGE_CACHE_GUILD_ID, str(MESSAGE_CACHE_GUILD_ID)})
 
 
 def should_track_messages(guild_id: int | str) -> bool:
-    return str(guild_id) in MESSAGE_CACHE_GUILD_IDS
+    return guild_id in MESSAGE_CACHE_GUILD_IDS
 
 
 def truncate_log_text(value: str, limit: int = 260) -> str:
@@ -38,25 +43,65 @@ async def maybe_snapshot_messages(user_id: str, guild_id: str):
     if not should_track_messages(guild_id):
         logging.debug("Message caching skipped for guild %s", guild_id)
         return
+    if not _message_buffer.get(user_id):
+        return
+    if user_id in _pending_snapshots:
+        # A write is already scheduled; it will pick up this message too.
+        return
+    loop = asyncio.get_running_loop()
+    _pending_snapshots[user_id] = loop.call_later(SNAPSHOT_DEBOUNCE_SECONDS, _schedule_snapshot_flush, user_id, guild_id)
+
+
+def _schedule_snapshot_flush(user_id: str, guild_id: str) -> None:
+    task = asyncio.create_task(_flush_snapshot(user_id, guild_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _flush_snapshot(user_id: str, guild_id: str) -> None:
+    _pending_snapshots.pop(user_id, None)
     entries = list(_message_buffer.get(user_id, []))
     if not entries:
         return
     if BOT_EVENT_LOGGING and DEBUG_EVENTS:
         logging.info("[snapshot] user=%s guild=%s msgs=%s", user_id, guild_id, len(entries[-15:]))
-    await persist_message_snapshot(user_id, entries[-15:])
+    await persist_message_snapshot(user_id, entries)
+
+
+async def flush_pending_snapshots() -> None:
+    """Write out every debounced snapshot immediately (used on shutdown)."""
+    pending = list(_pending_snapshots.items())
+    for _, handle in pending:
+        handle.cancel()
+    _pending_snapshots.clear()
+    if pending:
+        await asyncio.gather(*(_flush_snapshot(user_id, "") for user_id, _ in pending), return_exceptions=True)
+
+
+def _timestamp_value(msg: dict) -> float:
+    try:
+        return float(msg.get("timestamp") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def newest_first(messages: List[dict], limit: int = 15) -> List[dict]:
+    """Order messages newest first, once, at write time so readers only need to slice."""
+    return sorted(messages, key=_timestamp_value, reverse=True)[:limit]
 
 
 async def persist_message_snapshot(user_id: str, messages: List[dict]):
     if not is_supabase_ready() or not messages:
         return
-    logging.info("Persisting %d messages for user %s", len(messages[-15:]), user_id)
+    messages = newest_first(messages, 15)
+    logging.info("Persisting %d messages for user %s", len(messages), user_id)
     try:
         updated_at = int(time.time())
         await supabase_request(
             "post",
             "user_message_snapshots",
             params={"on_conflict": "user_id"},
-            payload={"user_id": user_id, "messages": messages[-15:], "updated_at": updated_at},
+            payload={"user_id": user_id, "messages": messages, "updated_at": updated_at},
             prefer="resolution=merge-duplicates,return=minimal",
         )
     except Exception as exc:
@@ -64,8 +109,14 @@ async def persist_message_snapshot(user_id: str, messages: List[dict]):
 
 
 async def fetch_message_cache(user_id: str, limit: int = 15) -> List[dict]:
+    messages, _ = await fetch_message_cache_with_source(user_id, limit)
+    return messages
+
+
+async def fetch_message_cache_with_source(user_id: str, limit: int = 15) -> Tuple[List[dict], bool]:
+    """Return (messages, from_supabase) so callers can skip writing back what they just read."""
     if not is_supabase_ready():
-        return _get_recent_message_context(user_id, limit)
+        return _get_recent_message_context(user_id, limit), False
     try:
         recs = await supabase_request(
             "get",
@@ -73,19 +124,12 @@ async def fetch_message_cache(user_id: str, limit: int = 15) -> List[dict]:
             params={"user_id": f"eq.{user_id}", "limit": 1, "select": "messages"},
         )
         if recs and recs[0].get("messages"):
-            messages = recs[0]["messages"]
-
-            def get_ts(m: dict) -> float:
-                t = m.get("timestamp", 0)
-                try:
-                    return float(t)
-                except Exception:
-                    return 0.0
-
-            return sorted(messages, key=get_ts, reverse=True)[:limit]
+            # Stored newest first by the writers (bot ban handler / OAuth callback).
+            return recs[0]["messages"][:limit], True
     except Exception as exc:
         logging.warning("Failed to fetch context for %s: %s", user_id, exc)
-    return _get_recent_message_context(user_id, limit)
+    # Row missing or empty: the in-process buffer is the only other source, no second query.
+    return _get_recent_message_context(user_id, limit), False
 
 
 def _get_recent_message_context(user_id: str, limit: int) -> List[dict]:
@@ -93,15 +137,8 @@ def _get_recent_message_context(user_id: str, limit: int) -> List[dict]:
     if not entry:
         return []
     messages, ts = entry
-    if time.time() - ts > RECENT_MESSAGE_CACHE_TTL:
+    if time.monotonic() - ts > RECENT_MESSAGE_CACHE_TTL:
         _recent_message_context.pop(user_id, None)
         return []
-
-    def _timestamp_value(msg: dict) -> float:
-        try:
-            return float(msg.get("timestamp") or 0)
-        except (TypeError, ValueError):
-            return 0.0
-
-    return sorted(messages, key=_timestamp_value, reverse=True)[:limit]
-
+    # on_message shares the arrival-ordered buffer; copy it out newest first.
+    return list(islice(reversed(messages), limit))
@@ -6,6 +6,7 @@ import json
 import time
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional
+from urllib.parse import quote
 
 import httpx
 from fastapi import HTTPException
@@ -26,15 +27,18 @@ from .supabase import supabase_request
 logger = logging.getLogger(__name__)
 
 
+_OAUTH_URL_PREFIX = (
+    f"{ROBLOX_API_BASE}/oauth/v1/authorize"
+    f"?response_type=code&client_id={quote(str(ROBLOX_CLIENT_ID), safe='')}"
+    f"&redirect_uri={quote(ROBLOX_REDIRECT_URI or '', safe='')}"
+    f"&scope={quote(ROBLOX_OAUTH_SCOPES, safe='')}"
+    f"&state="
+)
+
+
 def oauth_authorize_url(state: str) -> str:
     """Generates the Roblox OAuth 2.0 authorization URL."""
-    return (
-        f"{ROBLOX_API_BASE}/oauth/v1/authorize"
-        f"?response_type=code&client_id={ROBLOX_CLIENT_ID}"
-        f"&redirect_uri={ROBLOX_REDIRECT_URI}"
-        f"&scope={ROBLOX_OAUTH_SCOPES}"
-        f"&state={state}"
-    )
+    return _OAUTH_URL_PREFIX + state
 
 
 async def exchange_code_for_token(code: str) -> dict:
@@ -89,12 +93,13 @@ async def refresh_roblox_token(user_id: str, refresh_token: str) -> Optional[dic
 async def store_roblox_token(user_id: str, token_data: dict, *, network_info: Optional[dict] = None, other_info: Optional[dict] = None):
     """Stores a Roblox token in the database."""
     expires_in = token_data.get("expires_in", 0)
+    now = datetime.now(timezone.utc)
     payload = {
         "roblox_id": user_id,
         "access_token": token_data["access_token"],
         "refresh_token": token_data["refresh_token"],
-        "expires_at": (datetime.now(timezone.utc) + timedelta(seconds=expires_in)).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "expires_at": (now + timedelta(seconds=expires_in)).isoformat(),
+        "updated_at": now.isoformat(),
     }
     if network_info:
         try:
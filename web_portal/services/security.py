@@ -1,33 +1,61 @@
 from __future__ import annotations
 
+import heapq
+import logging
 import secrets
 import time
+from collections import deque
+from typing import Deque, Dict, Optional
 
-from fastapi import HTTPException
-
+from ..clients import get_redis
 from ..settings import APPEAL_IP_MAX_REQUESTS, APPEAL_IP_WINDOW_SECONDS
-from ..state import _ip_requests, _state_tokens
+from ..state import _state_expiry, _state_tokens
+
+
+STATE_TOKEN_TTL_SECONDS = 900
+
 
+def _prune_state_tokens(now: float) -> None:
+    """Drop expired state tokens; the heap keeps this proportional to the number expired."""
+    while _state_expiry and _state_expiry[0][0] <= now:
+        _, token = heapq.heappop(_state_expiry)
+        _state_tokens.pop(token, None)
 
-def issue_state_token(ip: str) -> str:
+
+async def issue_state_token(ip: str) -> str:
     token = secrets.token_urlsafe(16)
-    now = time.time()
+    redis = get_redis()
+    if redis is not None:
+        try:
+            await redis.set(f"state:{token}", ip or "unknown", ex=STATE_TOKEN_TTL_SECONDS)
+            return token
+        except Exception as exc:
+            logging.warning("Redis state token write failed; using local store: %s", exc)
+    now = time.monotonic()
     _state_tokens[token] = (ip, now)
-    for t, (_, ts) in list(_state_tokens.items()):
-        if now - ts > 900:
-            _state_tokens.pop(t, None)
+    heapq.heappush(_state_expiry, (now + STATE_TOKEN_TTL_SECONDS, token))
+    _prune_state_tokens(now)
     return token
 
 
-def validate_state_token(token: str, ip: str) -> bool:
+async def validate_state_token(token: str, ip: str) -> bool:
     if not token:
         return False
-    record = _state_tokens.pop(token, None)
-    if not record:
-        return False
-    saved_ip, ts = record
-    if time.time() - ts > 900:
-        return False
+    saved_ip: Optional[str] = None
+    redis = get_redis()
+    if redis is not None:
+        try:
+            # GETDEL makes the token single-use across every worker.
+            saved_ip = await redis.getdel(f"state:{token}")
+        except Exception as exc:
+            logging.warning("Redis state token lookup failed; using local store: %s", exc)
+    if saved_ip is None:
+        # Pruning first means anything still present is within its TTL.
+        _prune_state_tokens(time.monotonic())
+        record = _state_tokens.pop(token, None)
+        if not record:
+            return False
+        saved_ip, _ = record
     if ip in {"unknown", "", None} or saved_ip in {"unknown", "", None}:
         return False
     if saved_ip != ip:
@@ -35,15 +63,41 @@ def validate_state_token(token: str, ip: str) -> bool:
     return True
 
 
-def enforce_ip_rate_limit(ip: str) -> None:
-    now = time.time()
-    window_start = now - APPEAL_IP_WINDOW_SECONDS
-    if len(_ip_requests) > 10000:
-        _ip_requests.clear()
-    bucket = _ip_requests.setdefault(ip, [])
-    bucket = [t for t in bucket if t >= window_start]
-    if len(bucket) >= APPEAL_IP_MAX_REQUESTS:
-        raise HTTPException(status_code=429, detail="Too many requests. Please slow down and try again.")
-    bucket.append(now)
-    _ip_requests[ip] = bucket
+class IPRateLimiter:
+    """Per-IP hit counter over a window split into fixed buckets of {ip: hits}.
+
+    Expired buckets are dropped whole, so idle IPs age out without an eviction scan
+    and each IP costs at most one int per bucket. The effective window is between
+    (buckets - 1) and buckets bucket-lengths long.
+    """
+
+    def __init__(self, window_seconds: float, max_hits: int, buckets: int = 6) -> None:
+        self.bucket_seconds = max(window_seconds / buckets, 0.001)
+        self.max_hits = max_hits
+        self.buckets: Deque[Dict[str, int]] = deque(({} for _ in range(buckets)), maxlen=buckets)
+        self.bucket_start = time.monotonic()
+
+    def _rotate(self, now: float) -> None:
+        elapsed = int((now - self.bucket_start) // self.bucket_seconds)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, self.buckets.maxlen or 0)):
+            self.buckets.append({})
+        self.bucket_start += elapsed * self.bucket_seconds
+
+    def hit(self, ip: str) -> bool:
+        """Count a hit; False (and not counted) when the IP is already at the limit."""
+        self._rotate(time.monotonic())
+        if sum(bucket.get(ip, 0) for bucket in self.buckets) >= self.max_hits:
+            return False
+        current = self.buckets[-1]
+        current[ip] = current.get(ip, 0) + 1
+        return True
+
+
+_ip_limiter = IPRateLimiter(APPEAL_IP_WINDOW_SECONDS, APPEAL_IP_MAX_REQUESTS)
+
 
+def record_local_ip_hit(ip: str) -> bool:
+    """Count a hit in this process's window; False when the IP is over the limit."""
+    return _ip_limiter.hit(ip)
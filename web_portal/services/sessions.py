@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
 import logging
 import time
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
+import orjson
 from fastapi import Request
 from itsdangerous import BadSignature, URLSafeSerializer
 from starlette.responses import Response
@@ -19,9 +24,63 @@ from .roblox_api import (
     get_valid_access_token as get_valid_roblox_token,
 )
 from ..state import _session_epoch
+from .kv import profiles
 from .supabase import get_portal_flag_sync
 
-serializer = URLSafeSerializer(SECRET_KEY, salt="appeals-portal")
+class CompactSerializer:
+    """
+    Drop-in replacement for URLSafeSerializer.dumps/loads: orjson payload tagged with keyed blake2b.
+    Tokens carry a key-id prefix; anything without it is handed to the legacy serializer so
+    cookies and form tokens issued before the switch keep validating.
+    """
+
+    def __init__(self, secret_key: str, *, salt: str, key_id: str = "v2", legacy: Optional[URLSafeSerializer] = None):
+        self._key = hashlib.blake2b(secret_key.encode("utf-8"), digest_size=32, person=salt.encode("utf-8")[:16]).digest()
+        self._prefix = f"{key_id}."
+        self._legacy = legacy
+
+    def _tag(self, payload: bytes) -> bytes:
+        return hashlib.blake2b(payload, key=self._key, digest_size=16).digest()
+
+    def dumps(self, obj: Any) -> str:
+        payload = orjson.dumps(obj)
+        return f"{self._prefix}{_b64encode(payload)}.{_b64encode(self._tag(payload))}"
+
+    def loads(self, token: str) -> Any:
+        if not token.startswith(self._prefix):
+            if self._legacy is not None:
+                return self._legacy.loads(token)
+            raise BadSignature("Unknown token format")
+        try:
+            body, tag = token[len(self._prefix):].split(".", 1)
+            payload = _b64decode(body)
+            expected = _b64decode(tag)
+        except (ValueError, binascii.Error) as exc:
+            raise BadSignature("Malformed token") from exc
+        if not hmac.compare_digest(self._tag(payload), expected):
+            raise BadSignature("Signature does not match")
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError as exc:
+            raise BadSignature("Corrupt payload") from exc
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+# An unchanged session cookie is re-signed (and its max-age extended) at most this often.
+_SESSION_RENEW_AFTER = min(24 * 3600, PERSIST_SESSION_SECONDS // 7)
+
+serializer = CompactSerializer(
+    SECRET_KEY,
+    salt="appeals-portal",
+    legacy=URLSafeSerializer(SECRET_KEY, salt="appeals-portal"),
+)
 
 
 def persist_session(
@@ -112,10 +171,24 @@ def update_session_with_platform(
 
 
 def maybe_persist_session(request: Request, response: Response, session: Optional[dict], refreshed: bool) -> None:
+    """Re-issue the session cookie when its contents changed or it is due for renewal.
+
+    The cookie's max-age slides on each re-issue, so an unchanged session only needs
+    signing again once per _SESSION_RENEW_AFTER rather than on every page view.
+    """
     if not session:
         return
 
-    session["iat"] = time.time()
+    now = time.time()
+    if not refreshed and session.get("epoch") == _session_epoch:
+        try:
+            issued_at = float(session.get("iat") or 0)
+        except (TypeError, ValueError):
+            issued_at = 0.0
+        if now - issued_at < _SESSION_RENEW_AFTER:
+            return
+
+    session["iat"] = now
     session["epoch"] = _session_epoch
     token = serializer.dumps(session)
     response.set_cookie(
@@ -148,47 +221,73 @@ def read_user_session(request: Request) -> Optional[dict]:
         return None
 
 
+def _profile_key(session: dict) -> Optional[str]:
+    platform = session.get("logged_in_platform")
+    if platform == "discord" and session.get("uid"):
+        return f"discord:{session['uid']}"
+    if platform == "roblox" and session.get("ruid"):
+        return f"roblox:{session['ruid']}"
+    return None
+
+
+async def _fetch_profile_fields(platform: str, user_id: str) -> Optional[dict]:
+    if platform == "discord":
+        token = await get_valid_discord_token(user_id)
+        if not token:
+            return None
+        try:
+            user = await fetch_discord_user(token)
+        except Exception as exc:
+            logging.debug("Discord profile refresh failed for %s: %s", user_id, exc)
+            return None
+        uname_label = f"{user['username']}#{user.get('discriminator', '0')}"
+        display_name = clean_display_name(user.get("global_name") or user.get("username") or uname_label)
+        return {"uname": uname_label, "display_name": display_name}
+
+    token = await get_valid_roblox_token(user_id)
+    if not token:
+        return None
+    try:
+        user = await get_roblox_user_info(token)
+    except Exception as exc:
+        logging.debug("Roblox profile refresh failed for %s: %s", user_id, exc)
+        return None
+    uname_label = user.get("name") or user.get("preferred_username")
+    display_name = clean_display_name(user.get("nickname") or uname_label)
+    return {"runame": uname_label, "display_name": display_name}
+
+
 async def refresh_session_profile(session: Optional[dict]) -> Tuple[Optional[dict], bool]:
+    """Bring the session's display names up to date; returns (session, changed).
+
+    Fetched names are cached in kv.profiles, so repeat page views within the TTL
+    don't call the provider.
+    """
     if not session:
         return None, False
 
-    updated = dict(session)
-    refreshed = False
+    key = _profile_key(session)
+    if key is None:
+        logging.debug("Session has no refreshable platform, skipping profile refresh.")
+        return session, False
+
+    cached = await profiles.get(key)
+    if cached is not None:
+        fields = orjson.loads(cached)
+    else:
+        platform, user_id = key.split(":", 1)
+        fields = await _fetch_profile_fields(platform, user_id)
+        if fields is None:
+            return session, False
+        await profiles.set(key, orjson.dumps(fields).decode())
 
-    logged_in_platform = updated.get("logged_in_platform")
-    if not logged_in_platform:
-        logging.debug("Session has no logged_in_platform, skipping profile refresh.")
+    if all(session.get(name) == value for name, value in fields.items()):
         return session, False
+    updated = {**session, **fields, "iat": time.time()}
+    return updated, True
 
-    if logged_in_platform == "discord" and "uid" in updated:
-        user_id = updated["uid"]
-        token = await get_valid_discord_token(str(user_id))
-        if token:
-            try:
-                user = await fetch_discord_user(token)
-                uname_label = f"{user['username']}#{user.get('discriminator', '0')}"
-                display_name = clean_display_name(user.get("global_name") or user.get("username") or uname_label)
-                updated["uname"] = uname_label
-                updated["display_name"] = display_name
-                refreshed = True
-            except Exception as exc:
-                logging.debug("Discord profile refresh failed for %s: %s", user_id, exc)
-
-    elif logged_in_platform == "roblox" and "ruid" in updated:
-        user_id = updated["ruid"]
-        token = await get_valid_roblox_token(str(user_id))
-        if token:
-            try:
-                user = await get_roblox_user_info(token)
-                uname_label = user.get("name") or user.get("preferred_username")
-                display_name = clean_display_name(user.get("nickname") or uname_label)
-                updated["runame"] = uname_label
-                updated["display_name"] = display_name
-                refreshed = True
-            except Exception as exc:
-                logging.debug("Roblox profile refresh failed for %s: %s", user_id, exc)
-
-    if refreshed:
-        updated["iat"] = time.time()
-        return updated, True
-    return session, False
+
+async def forget_session_profile(session: Optional[dict]) -> None:
+    key = _profile_key(session) if session else None
+    if key:
+        await profiles.delete(key)
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
+import secrets
 import time
-import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 import json
 import time
 
 import httpx
+import orjson
 
 from ..clients import get_http_client
 from ..settings import (
@@ -20,36 +22,49 @@ from ..settings import (
     SUPABASE_URL,
     TARGET_GUILD_ID,
 )
-from ..state import _portal_flag_cache
+from .. import state
+from ..state import _appeal_record_cache, _history_cache, _portal_flag_cache
 
 
 def is_supabase_ready() -> bool:
     return bool(SUPABASE_URL and SUPABASE_KEY)
 
+
+# Built once; only the Prefer header varies per call. Treat as read-only.
+_SUPABASE_BASE = (SUPABASE_URL or "").rstrip("/") + "/rest/v1/"
+_SUPABASE_HEADERS_DEFAULT = {
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}",
+    "Content-Type": "application/json",
+    "Prefer": "return=representation",
+}
+
 # Portal flags (lightweight key-value store, cached briefly)
 PORTAL_FLAGS_TABLE = "portal_flags"
 PORTAL_FLAG_TTL = 30  # seconds
 
 async def get_portal_flag(key: str, default: Optional[Any] = None) -> Optional[Any]:
     cached = _portal_flag_cache.get(key)
-    now = time.time()
+    now = time.monotonic()
     if cached and now - cached[1] < PORTAL_FLAG_TTL:
-        return cached[0]
+        return default if cached[0] is None else cached[0]
     if not is_supabase_ready():
         return default
+    # Keep serving the last known value if Supabase is unreachable.
+    value = cached[0] if cached else None
     try:
         recs = await supabase_request(
             "get",
             PORTAL_FLAGS_TABLE,
             params={"key": f"eq.{key}", "limit": 1},
         )
-        if recs and isinstance(recs, list) and len(recs) > 0:
-            value = recs[0].get("value")
-            _portal_flag_cache[key] = (value, now)
-            return value
+        if isinstance(recs, list):
+            value = recs[0].get("value") if recs else None
     except Exception:
         pass
-    return default
+    # Misses and failures are cached as well, so an outage costs one lookup per TTL, not one per request.
+    _portal_flag_cache[key] = (value, now)
+    return default if value is None else value
 
 
 async def set_portal_flag(key: str, value: Any) -> None:
@@ -63,60 +78,61 @@ async def set_portal_flag(key: str, value: Any) -> None:
         payload=payload,
         prefer="resolution=merge-duplicates,return=minimal",
     )
-    _portal_flag_cache[key] = (value, time.time())
+    _portal_flag_cache[key] = (value, time.monotonic())
+
+
+_portal_flag_refreshes: "Dict[str, asyncio.Task[Any]]" = {}
+
+
+def _schedule_portal_flag_refresh(key: str) -> None:
+    if not is_supabase_ready() or key in _portal_flag_refreshes:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(get_portal_flag(key))
+    _portal_flag_refreshes[key] = task
+    task.add_done_callback(lambda _: _portal_flag_refreshes.pop(key, None))
 
 
 def get_portal_flag_sync(key: str, default: Optional[Any] = None) -> Optional[Any]:
+    """Cached flag value for sync callers on the request path; never does network I/O.
+
+    A stale or missing entry schedules one background get_portal_flag refresh and the
+    last known value (or default) is returned meanwhile.
+    """
     cached = _portal_flag_cache.get(key)
-    now = time.time()
-    if cached and now - cached[1] < PORTAL_FLAG_TTL:
-        return cached[0]
-    if not is_supabase_ready():
-        return default
-    try:
-        import httpx as _httpx
-
-        with _httpx.Client(timeout=5.0) as client:
-            resp = client.get(
-                f"{SUPABASE_URL.rstrip('/')}/rest/v1/{PORTAL_FLAGS_TABLE}",
-                params={"key": f"eq.{key}", "limit": 1, "apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"},
-            )
-            if resp.status_code == 200:
-                recs = resp.json()
-                if recs and isinstance(recs, list) and len(recs) > 0:
-                    val = recs[0].get("value")
-                    _portal_flag_cache[key] = (val, now)
-                    return val
-    except Exception:
+    if cached is None or time.monotonic() - cached[1] >= PORTAL_FLAG_TTL:
+        _schedule_portal_flag_refresh(key)
+    if cached is None or cached[0] is None:
         return default
-    return default
+    return cached[0]
 
 
-async def supabase_request(
+async def _supabase_send(
     method: str,
     table: str,
     *,
     params: Optional[dict] = None,
-    payload: Optional[dict] = None,
+    payload: Optional[Union[dict, List[dict]]] = None,
     prefer: Optional[str] = None,
-) -> Optional[Any]:
-    if not is_supabase_ready():
-        return None
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": prefer or "return=representation",
-    }
-    url = f"{SUPABASE_URL.rstrip('/')}/rest/v1/{table}"
-    try:
-        client = get_http_client()
-        resp = await client.request(method, url, params=params, headers=headers, json=payload, timeout=10)
-        resp.raise_for_status()
-        if not resp.content:
-            return True
-        return resp.json()
-    except httpx.HTTPStatusError as exc:
+) -> Any:
+    """One PostgREST call; raises on transport errors and non-2xx responses."""
+    headers = {**_SUPABASE_HEADERS_DEFAULT, "Prefer": prefer} if prefer else _SUPABASE_HEADERS_DEFAULT
+    client = get_http_client()
+    # Payloads can carry the whole message cache; orjson encodes them far faster than stdlib json.
+    body = orjson.dumps(payload) if payload is not None else None
+    resp = await client.request(method, _SUPABASE_BASE + table, params=params, headers=headers, content=body, timeout=10)
+    resp.raise_for_status()
+    if not resp.content:
+        return True
+    # httpx already negotiates gzip; orjson parses the (often history-sized) body faster than stdlib json.
+    return orjson.loads(resp.content)
+
+
+def _log_supabase_failure(table: str, method: str, exc: Exception) -> None:
+    if isinstance(exc, httpx.HTTPStatusError):
         body = ""
         try:
             body = exc.response.text or ""
@@ -129,10 +145,175 @@ async def supabase_request(
             getattr(exc.response, "status_code", "unknown"),
             (body[:800] + "…") if len(body) > 800 else body,
         )
-    except Exception as exc:
+    else:
         logging.warning("Supabase request failed table=%s method=%s error=%s", table, method, exc)
+
+
+async def supabase_request(
+    method: str,
+    table: str,
+    *,
+    params: Optional[dict] = None,
+    payload: Optional[Union[dict, List[dict]]] = None,
+    prefer: Optional[str] = None,
+) -> Optional[Any]:
+    if not is_supabase_ready():
+        return None
+    try:
+        return await _supabase_send(method, table, params=params, payload=payload, prefer=prefer)
+    except Exception as exc:
+        _log_supabase_failure(table, method, exc)
     return None
 
+# Row inserts that don't need their result are batched: PostgREST accepts a JSON array
+# body, so a burst of submissions becomes one POST per (table, prefer, params, columns) group.
+SUPABASE_BATCH_MAX = 50
+SUPABASE_BATCH_WINDOW_SECONDS = 0.05
+_InsertItem = Tuple[str, str, Optional[dict], dict, asyncio.Future]
+_insert_queue: "asyncio.Queue[_InsertItem]" = asyncio.Queue()
+
+
+async def supabase_insert(table: str, payload: dict, *, prefer: str, params: Optional[dict] = None) -> Optional[Any]:
+    """Insert one row through the batch writer; resolves like supabase_request once flushed."""
+    if not is_supabase_ready():
+        return None
+    task = state._supabase_writer_task
+    if task is None or task.done():
+        return await supabase_request("post", table, params=params, payload=payload, prefer=prefer)
+    future = asyncio.get_running_loop().create_future()
+    _insert_queue.put_nowait((table, prefer, params, payload, future))
+    return await future
+
+
+async def _write_insert_group(
+    table: str, prefer: str, params: Optional[dict], items: List[Tuple[dict, asyncio.Future]]
+) -> None:
+    if len(items) == 1:
+        results = [await supabase_request("post", table, params=params, payload=items[0][0], prefer=prefer)]
+    else:
+        try:
+            result = await _supabase_send("post", table, params=params, payload=[row for row, _ in items], prefer=prefer)
+            results = [result] * len(items)
+        except httpx.HTTPStatusError as exc:
+            _log_supabase_failure(table, "post", exc)
+            if 400 <= exc.response.status_code < 500:
+                # PostgREST rejected the array (one bad row, or two upserts of one key) and wrote
+                # nothing, so each row can safely be retried on its own.
+                results = await asyncio.gather(
+                    *(supabase_request("post", table, params=params, payload=row, prefer=prefer) for row, _ in items)
+                )
+            else:
+                results = [None] * len(items)
+        except Exception as exc:
+            # A timeout or dropped connection may have happened after the batch committed;
+            # retrying would insert the rows twice.
+            _log_supabase_failure(table, "post", exc)
+            results = [None] * len(items)
+    for (_, future), outcome in zip(items, results):
+        if not future.done():
+            future.set_result(outcome)
+
+
+async def _write_insert_batch(batch: List[_InsertItem]) -> None:
+    groups: Dict[Tuple[str, str, Tuple[Tuple[str, Any], ...], Tuple[str, ...]], List[Tuple[dict, asyncio.Future]]] = {}
+    group_params: Dict[Tuple[Tuple[str, Any], ...], Optional[dict]] = {}
+    for table, prefer, params, payload, future in batch:
+        params_key = tuple(sorted(params.items())) if params else ()
+        group_params[params_key] = params
+        # PostgREST takes the column list from the first row, so only same-shaped rows share a body.
+        groups.setdefault((table, prefer, params_key, tuple(payload)), []).append((payload, future))
+    await asyncio.gather(
+        *(
+            _write_insert_group(table, prefer, group_params[params_key], items)
+            for (table, prefer, params_key, _), items in groups.items()
+        )
+    )
+
+
+# Queued by stop_supabase_writer: everything ahead of it is written, then the writer returns.
+_WRITER_STOP: Any = object()
+# Rows the writer had taken off the queue but not started posting when it was cancelled.
+_unwritten: List[_InsertItem] = []
+
+
+def _resolve_unfinished(batch: List[_InsertItem]) -> None:
+    for *_, future in batch:
+        if not future.done():
+            future.set_result(None)
+
+
+async def run_supabase_writer() -> None:
+    """Drain queued inserts, posting up to SUPABASE_BATCH_MAX rows per window."""
+    loop = asyncio.get_running_loop()
+    batch: List[_InsertItem] = []
+    posting = False
+    try:
+        while True:
+            item = await _insert_queue.get()
+            if item is _WRITER_STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + SUPABASE_BATCH_WINDOW_SECONDS
+            while len(batch) < SUPABASE_BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(_insert_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _WRITER_STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            posting = True
+            try:
+                await _write_insert_batch(batch)
+            except Exception as exc:
+                logging.warning("Supabase batch write failed (%d rows): %s", len(batch), exc)
+                _resolve_unfinished(batch)
+            batch, posting = [], False
+            if stopping:
+                return
+    except asyncio.CancelledError:
+        if posting:
+            # The POST may already have committed; re-sending could insert the rows twice.
+            _resolve_unfinished(batch)
+        else:
+            _unwritten.extend(batch)
+        raise
+
+
+async def stop_supabase_writer(task: Optional["asyncio.Task[None]"], timeout: float = 5.0) -> None:
+    """Let the writer post its current batch and everything queued so far, then return."""
+    if task is None or task.done():
+        return
+    _insert_queue.put_nowait(_WRITER_STOP)
+    try:
+        await asyncio.wait_for(task, timeout)
+    except Exception as exc:
+        # wait_for cancelled it; flush_supabase_writes picks up whatever was left.
+        logging.warning("Supabase writer did not drain before shutdown: %s", exc)
+
+
+async def flush_supabase_writes(timeout: float = 5.0) -> None:
+    """Best-effort write of inserts still queued at shutdown."""
+    batch = list(_unwritten)
+    _unwritten.clear()
+    while not _insert_queue.empty():
+        item = _insert_queue.get_nowait()
+        if item is not _WRITER_STOP:
+            batch.append(item)
+    if not batch:
+        return
+    try:
+        await asyncio.wait_for(_write_insert_batch(batch), timeout)
+    except Exception as exc:
+        logging.warning("Dropped %d queued Supabase inserts on shutdown: %s", len(batch), exc)
+    _resolve_unfinished(batch)
+
+
 def _canonical_internal_id(discord_id: Optional[str], roblox_id: Optional[str]) -> str:
     if discord_id and roblox_id:
         digest = hashlib.sha256(f"{discord_id}:{roblox_id}".encode("utf-8")).hexdigest()
@@ -141,7 +322,7 @@ def _canonical_internal_id(discord_id: Optional[str], roblox_id: Optional[str])
         return f"discord:{discord_id}"
     if roblox_id:
         return f"roblox:{roblox_id}"
-    return f"anon:{uuid.uuid4().hex}"
+    return f"anon:{secrets.token_hex(16)}"
 
 
 async def _query_internal_id(table: str, column: str, value: str) -> Optional[str]:
@@ -251,43 +432,80 @@ async def log_appeal_to_supabase(
         "user_agent": user_agent,
         "message_cache": message_cache,
     }
-    await supabase_request("post", SUPABASE_TABLE, payload=payload, prefer="return=minimal")
+    await supabase_insert(SUPABASE_TABLE, payload, prefer="return=minimal")
+
+
+def get_cached_history(internal_user_id: str, key: tuple) -> Optional[List[dict]]:
+    bucket = _history_cache.get(str(internal_user_id))
+    return bucket.get(key) if bucket else None
+
+
+def store_cached_history(internal_user_id: str, key: tuple, records: List[dict]) -> None:
+    bucket = _history_cache.get(str(internal_user_id))
+    if bucket is None:
+        bucket = _history_cache[str(internal_user_id)] = {}
+    bucket[key] = records
+
+
+def invalidate_appeal_history(internal_user_id: Optional[str]) -> None:
+    """Drop cached history for a user; call whenever one of their appeals is created or decided."""
+    if internal_user_id:
+        _history_cache.pop(str(internal_user_id), None)
 
 
 async def fetch_appeal_history(internal_user_id: str, limit: int = 25, *, select: Optional[str] = None) -> List[dict]:
+    select = select or "appeal_id,status,created_at,ban_reason,appeal_reason"
+    cache_key = (SUPABASE_TABLE, limit, select)
+    cached = get_cached_history(internal_user_id, cache_key)
+    if cached is not None:
+        return cached
     params = {
         "internal_user_id": f"eq.{internal_user_id}",
         "order": "created_at.desc",
         "limit": min(limit, 100),
+        "select": select,
     }
-    if select:
-        params["select"] = select
-    else:
-        params["select"] = "appeal_id,status,created_at,ban_reason,appeal_reason"
     records = await supabase_request("get", SUPABASE_TABLE, params=params)
+    if isinstance(records, list):
+        store_cached_history(internal_user_id, cache_key, records)
     return records or []
 
 
 async def fetch_appeal_record(appeal_id: str) -> Optional[dict]:
+    """Appeal row for the decision handlers; cached briefly and dropped on status updates."""
+    cached = _appeal_record_cache.get(appeal_id)
+    if cached is not None:
+        return cached
     records = await supabase_request(
         "get",
         SUPABASE_TABLE,
         params={
             "appeal_id": f"eq.{appeal_id}",
             "limit": 1,
-            "select": "appeal_id,status,created_at,ban_reason,appeal_reason,internal_user_id,user_id",
+            "select": "appeal_id,status,created_at,ban_reason,appeal_reason,internal_user_id,user_id,user_lang",
         },
     )
     if records:
-        return records[0]
+        record = _appeal_record_cache[appeal_id] = records[0]
+        return record
     return None
 
 
-async def get_remote_last_submit(user_id: str) -> Optional[float]:
+def _in_filter(values: List[str]) -> str:
+    # Quote every value: identity keys contain ':' which PostgREST reserves inside in.(...).
+    quoted = ",".join('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return f"in.({quoted})"
+
+
+async def get_remote_last_submit(user_ids: List[str]) -> Optional[float]:
+    """Latest last_submit across all of a user's identity keys, in one query."""
+    if not user_ids:
+        return None
+    user_filter = f"eq.{user_ids[0]}" if len(user_ids) == 1 else _in_filter(user_ids)
     recs = await supabase_request(
         "get",
         SUPABASE_SESSION_TABLE,
-        params={"user_id": f"eq.{user_id}", "order": "last_submit.desc", "limit": 1, "select": "last_submit"},
+        params={"user_id": user_filter, "order": "last_submit.desc.nullslast", "limit": 1, "select": "last_submit"},
     )
     if recs:
         try:
@@ -334,12 +552,7 @@ async def mark_session_token(
         payload["network_info"] = net_text
     if oth_text:
         payload["other_info"] = oth_text
-    await supabase_request(
-        "post",
-        SUPABASE_SESSION_TABLE,
-        payload=payload,
-        prefer="resolution=merge-duplicates,return=minimal",
-    )
+    await supabase_insert(SUPABASE_SESSION_TABLE, payload, prefer="resolution=merge-duplicates,return=minimal")
 
 
 async def update_appeal_status(
@@ -357,6 +570,7 @@ async def update_appeal_status(
         "notes": notes,
     }
     await supabase_request("patch", SUPABASE_TABLE, params={"appeal_id": f"eq.{appeal_id}"}, payload=payload, prefer="return=minimal")
+    _appeal_record_cache.pop(appeal_id, None)
 
 
 async def fetch_reports_for_roblox_id(roblox_id: str, limit: int = 5) -> List[dict]:
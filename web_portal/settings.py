@@ -1,5 +1,6 @@
 import os
 import secrets
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -7,6 +8,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
 # --- Configuration ---
 DISCORD_CLIENT_ID = os.getenv("DISCORD_CLIENT_ID")
 DISCORD_CLIENT_SECRET = os.getenv("DISCORD_CLIENT_SECRET")
@@ -35,6 +43,7 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_TABLE = "discord-appeals"
 SUPABASE_SESSION_TABLE = "discord-appeal-sessions"
 SUPABASE_CONTEXT_TABLE = "banned_user_context"
+REDIS_URL = os.getenv("REDIS_URL")  # optional: share OAuth state, rate limits and tokens across workers
 
 # Roblox settings
 ROBLOX_CLIENT_ID = os.getenv("ROBLOX_CLIENT_ID")
@@ -42,7 +51,6 @@ ROBLOX_CLIENT_SECRET = os.getenv("ROBLOX_CLIENT_SECRET")
 ROBLOX_REDIRECT_URI = os.getenv("ROBLOX_REDIRECT_URI", "https://bs-appeals.up.railway.app/oauth/roblox/callback")
 ROBLOX_BAN_API_KEY = os.getenv("ROBLOX_BAN_API_KEY")
 ROBLOX_BAN_API_URL = os.getenv("ROBLOX_BAN_API_URL", "https://apis.roblox.com/cloud/v2/universes/6765805766/user-restrictions")  # The base URL for the ban/restriction API
-ROBLOX_APPEAL_CHANNEL_ID = int(os.getenv("ROBLOX_APPEAL_CHANNEL_ID", "1437227634642780335"))
 ROBLOX_SUPABASE_TABLE = "roblox_appeals"
 ROBLOX_OAUTH_TOKENS_TABLE = "roblox_oauth_tokens"
 
@@ -58,14 +66,15 @@ MESSAGE_CACHE_GUILD_ID = int(MESSAGE_CACHE_GUILD_ID_RAW or MESSAGE_CACHE_GUILD_I
 # Accept/Decline should re-add users to the single BlockSpin guild.
 READD_GUILD_ID = str(MESSAGE_CACHE_GUILD_ID)
 LIBRETRANSLATE_URL = os.getenv("LIBRETRANSLATE_URL", "https://libretranslate.de/translate")
-DEBUG_EVENTS = os.getenv("DEBUG_EVENTS", "false").lower() == "true"
+DEBUG_EVENTS = _env_flag("DEBUG_EVENTS", False)
 # Bot logging defaults to enabled so deployments have visibility into caching/ban events.
-BOT_EVENT_LOGGING = os.getenv("BOT_EVENT_LOGGING", "true").lower() in {"1", "true", "yes", "on"}
+BOT_EVENT_LOGGING = _env_flag("BOT_EVENT_LOGGING", True)
 # Message bodies can contain private data; keep disabled unless explicitly enabled (or DEBUG_EVENTS).
-BOT_MESSAGE_LOG_CONTENT = os.getenv("BOT_MESSAGE_LOG_CONTENT", "false").lower() in {"1", "true", "yes", "on"} or DEBUG_EVENTS
+BOT_MESSAGE_LOG_CONTENT = _env_flag("BOT_MESSAGE_LOG_CONTENT", False) or DEBUG_EVENTS
 # By default, do not persist rolling message snapshots to Supabase. We keep the last 15 per-user in RAM and only write
 # to Supabase when a ban is detected (banned_user_context).
-ENABLE_MESSAGE_SNAPSHOTS = os.getenv("ENABLE_MESSAGE_SNAPSHOTS", "false").lower() in {"1", "true", "yes", "on"}
+ENABLE_MESSAGE_SNAPSHOTS = _env_flag("ENABLE_MESSAGE_SNAPSHOTS", False)
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "3"))  # bursts of messages -> one upsert
 
 OAUTH_SCOPES = "identify guilds.join"
 ROBLOX_OAUTH_SCOPES = "openid profile"
@@ -79,14 +88,23 @@ SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "900"))  # sessions e
 APPEAL_IP_MAX_REQUESTS = int(os.getenv("APPEAL_IP_MAX_REQUESTS", "8"))
 APPEAL_IP_WINDOW_SECONDS = int(os.getenv("APPEAL_IP_WINDOW_SECONDS", "60"))
 APPEAL_WINDOW_SECONDS = int(os.getenv("APPEAL_WINDOW_SECONDS", str(7 * 24 * 3600)))  # 7 days default
+APPEAL_STATE_TTL_SECONDS = int(os.getenv("APPEAL_STATE_TTL_SECONDS", str(90 * 24 * 3600)))  # declined/locked/first-seen markers
 DM_GUILD_ID = os.getenv("DM_GUILD_ID", "1065973360040890418")  # optional: holding guild to enable DMs
-REMOVE_FROM_DM_GUILD_AFTER_DM = os.getenv("REMOVE_FROM_DM_GUILD_AFTER_DM", "true").lower() == "true"
-CLEANUP_DM_INVITES = os.getenv("CLEANUP_DM_INVITES", "true").lower() == "true"
+REMOVE_FROM_DM_GUILD_AFTER_DM = _env_flag("REMOVE_FROM_DM_GUILD_AFTER_DM", True)
+CLEANUP_DM_INVITES = _env_flag("CLEANUP_DM_INVITES", True)
 PERSIST_SESSION_SECONDS = int(os.getenv("PERSIST_SESSION_SECONDS", str(7 * 24 * 3600)))  # keep users signed in
 SESSION_COOKIE_NAME = "bs_session"
 STATUS_DATA_CACHE_TTL_SECONDS = int(os.getenv("STATUS_DATA_CACHE_TTL_SECONDS", "5"))
 GUILD_NAME_CACHE_TTL_SECONDS = int(os.getenv("GUILD_NAME_CACHE_TTL_SECONDS", "3600"))
 RECENT_MESSAGE_CACHE_TTL = int(os.getenv("RECENT_MESSAGE_CACHE_TTL", "3600"))
+TRANSLATION_CACHE_TTL_SECONDS = int(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", "86400"))
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "4096"))
+GEO_CACHE_TTL_SECONDS = int(os.getenv("GEO_CACHE_TTL_SECONDS", str(6 * 3600)))
+GEO_CACHE_MAX_ENTRIES = int(os.getenv("GEO_CACHE_MAX_ENTRIES", "4096"))
+BAN_CACHE_TTL_SECONDS = int(os.getenv("BAN_CACHE_TTL_SECONDS", "60"))
+HISTORY_CACHE_TTL_SECONDS = int(os.getenv("HISTORY_CACHE_TTL_SECONDS", "30"))
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))  # Discord/Roblox name refresh
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bs-webpanel-jinja"))  # compiled template bytecode
 
 
 def validate_required_envs() -> None:
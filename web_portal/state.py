@@ -1,27 +1,64 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict, deque
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from cachetools import TTLCache
+
+from .settings import (
+    APPEAL_COOLDOWN_SECONDS,
+    APPEAL_STATE_TTL_SECONDS,
+    BAN_CACHE_TTL_SECONDS,
+    GEO_CACHE_MAX_ENTRIES,
+    GEO_CACHE_TTL_SECONDS,
+    GUILD_NAME_CACHE_TTL_SECONDS,
+    HISTORY_CACHE_TTL_SECONDS,
+    PROFILE_CACHE_TTL_SECONDS,
+    SESSION_TTL_SECONDS,
+    STATUS_DATA_CACHE_TTL_SECONDS,
+)
+
+# Appeal state, accessed through services.kv (which shares it via Redis when configured).
+# Each store expires entries after the same TTL kv gives the Redis key, and is size-capped
+# so a long-running worker without Redis cannot grow without bound.
+_appeal_rate_limit: TTLCache = TTLCache(maxsize=100_000, ttl=APPEAL_COOLDOWN_SECONDS)  # {user_id: timestamp_of_last_submit}
+_used_sessions: TTLCache = TTLCache(maxsize=100_000, ttl=SESSION_TTL_SECONDS * 2)  # {session_hash: "1"}
+_ban_first_seen: TTLCache = TTLCache(maxsize=100_000, ttl=APPEAL_STATE_TTL_SECONDS)  # {user_id: first time we saw the ban}
+_appeal_locked: TTLCache = TTLCache(maxsize=100_000, ttl=APPEAL_STATE_TTL_SECONDS)  # {user_id: "1" if appealed already}
+_declined_users: TTLCache = TTLCache(maxsize=100_000, ttl=APPEAL_STATE_TTL_SECONDS)  # {user_id: "1" if appeal declined}
+_form_sessions: TTLCache = TTLCache(maxsize=50_000, ttl=SESSION_TTL_SECONDS)  # {form session id: JSON appeal form context}
+_dm_channels: TTLCache = TTLCache(maxsize=50_000, ttl=APPEAL_STATE_TTL_SECONDS)  # {user_id: DM channel id}
+_profile_cache: TTLCache = TTLCache(maxsize=10_000, ttl=PROFILE_CACHE_TTL_SECONDS)  # {"platform:user_id": JSON of refreshed name fields}
 
 # simple in-memory stores
-_appeal_rate_limit: Dict[str, float] = {}  # {user_id: timestamp_of_last_submit}
-_used_sessions: Dict[str, float] = {}  # {session_token: timestamp_used}
-_ip_requests: Dict[str, List[float]] = {}  # {ip: [timestamps]}
-_ban_first_seen: Dict[str, float] = {}  # {user_id: first time we saw the ban}
-_appeal_locked: Dict[str, bool] = {}  # {user_id: True if appealed already}
 _user_tokens: Dict[str, Dict[str, Any]] = {}  # {user_id: {"access_token": str, "refresh_token": str, "expires_at": float}}
-_processed_appeals: Dict[str, float] = {}  # {appeal_id: timestamp_processed}
-_declined_users: Dict[str, bool] = {}  # {user_id: True if appeal declined}
+_processed_appeals: "OrderedDict[str, float]" = OrderedDict()  # {message_id: time.monotonic() when claimed}, oldest first
 _state_tokens: Dict[str, Tuple[str, float]] = {}  # {token: (ip, issued_at)}
+_state_expiry: List[Tuple[float, str]] = []  # heap of (expires_at, token) for _state_tokens
 _session_epoch: int = 0  # bump to force global logout
-_status_data_cache: Dict[str, Tuple[dict, float]] = {}  # {user_id: (payload, ts)}
-_guild_name_cache: Dict[str, Tuple[str, float]] = {}  # {guild_id: (name, ts)}
+_status_data_cache: TTLCache = TTLCache(maxsize=10_000, ttl=STATUS_DATA_CACHE_TTL_SECONDS)  # {user_id: encoded JSON body}
+_guild_name_cache: TTLCache = TTLCache(maxsize=1024, ttl=GUILD_NAME_CACHE_TTL_SECONDS)  # {guild_id: name}
 _announcement_text: Optional[str] = None
 _portal_flag_cache: Dict[str, Tuple[Any, float]] = {}
+_ban_cache: TTLCache = TTLCache(maxsize=2048, ttl=BAN_CACHE_TTL_SECONDS)  # {user_id: ban payload or None}
+_history_cache: TTLCache = TTLCache(maxsize=10000, ttl=HISTORY_CACHE_TTL_SECONDS)  # {internal_user_id: {(table, limit, select): records}}
+_geo_cache: TTLCache = TTLCache(maxsize=GEO_CACHE_MAX_ENTRIES, ttl=GEO_CACHE_TTL_SECONDS)  # {ip: ipapi.co payload}
+_appeal_record_cache: TTLCache = TTLCache(maxsize=512, ttl=60)  # {appeal_id: Discord appeal row}
 
 # Bot & message cache
 _bot_task: Optional[asyncio.Task] = None
 _bot_heartbeat_task: Optional[asyncio.Task] = None
+_log_consumer_task: Optional[asyncio.Task] = None
+_embed_log_task: Optional[asyncio.Task] = None
+_supabase_writer_task: Optional[asyncio.Task] = None
 _message_buffer: Dict[str, deque] = defaultdict(lambda: deque(maxlen=15))
-_recent_message_context: Dict[str, Tuple[List[dict], float]] = {}
+_recent_message_context: Dict[str, Tuple[deque, float]] = {}  # {user_id: (message buffer, last message at)}
+_pending_snapshots: Dict[str, asyncio.TimerHandle] = {}  # {user_id: debounce timer for the next snapshot write}
+
+# Server-sent event subscribers for /live/stream.
+_live_subscribers: Set[asyncio.Queue] = set()  # every open stream
+_status_subscribers: Dict[str, Set[asyncio.Queue]] = {}  # {internal_user_id: streams for that user}
+
+# Fire-and-forget tasks; held here so they aren't garbage collected mid-flight.
+_background_tasks: Set[asyncio.Task] = set()
@@ -0,0 +1,76 @@
+(function(){
+  const toggles = Array.from(document.querySelectorAll('.lang-toggle'));
+  const pop = document.getElementById('langPopover');
+  if(!toggles.length || !pop) return;
+  const setExpanded = (state) => toggles.forEach(btn => btn.setAttribute('aria-expanded', state ? 'true' : 'false'));
+  const open = () => { pop.classList.add('open'); setExpanded(true); };
+  const close = () => { pop.classList.remove('open'); setExpanded(false); };
+  const togglePop = (e) => { e.preventDefault(); pop.classList.contains('open') ? close() : open(); };
+  toggles.forEach(btn => btn.addEventListener('click', togglePop));
+  document.addEventListener('click', (e) => {
+    if (pop.contains(e.target) || toggles.some(btn => btn.contains(e.target))) return;
+    close();
+  });
+  pop.querySelectorAll('.lang-option').forEach(btn => {
+    btn.addEventListener('click', () => {
+      const code = btn.dataset.lang;
+      if (!code) return;
+      const url = new URL(window.location.href);
+      url.searchParams.set('lang', code);
+      document.cookie = `lang=${code}; path=/; max-age=${60*60*24*30}; samesite=Lax`;
+      window.location.href = url.toString();
+    });
+  });
+})();
+
+(function(){
+  const banner = document.getElementById("live-announcement");
+  let local = (window.BS_ANNOUNCE || {epoch:0,text:null});
+  function render(text) {
+    if (!banner) return;
+    banner.innerHTML = "";
+    if (!text) { return; }
+    const card = document.createElement("div");
+    card.className = "announcement-card";
+    card.innerHTML = `
+      <div class="announcement__left">
+        <div class="announcement__dot"></div>
+        <div class="announcement__copy">
+          <div class="announcement__label">Announcement</div>
+          <div class="announcement__text"></div>
+        </div>
+      </div>
+      <div class="announcement__badge">Live</div>
+    `;
+    card.querySelector(".announcement__text").textContent = text;
+    banner.appendChild(card);
+  }
+  render(local.text);
+  function apply(data){
+    if(typeof data.epoch === 'number' && data.epoch > (local.epoch||0)){
+      window.location.reload();
+      return;
+    }
+    local = {epoch:data.epoch||local.epoch,text:data.announcement||null};
+    render(local.text);
+  }
+  async function tick(){
+    try{
+      const resp = await fetch('/live/announcement',{headers:{'Accept':'application/json'}});
+      if(!resp.ok) return;
+      apply(await resp.json());
+    }catch(e){}
+  }
+  if (!window.EventSource) {
+    setInterval(tick, 10000);
+    return;
+  }
+  // One long-lived stream instead of polling; the browser reconnects on its own.
+  const stream = new EventSource('/live/stream');
+  stream.addEventListener('announcement', (e) => {
+    try { apply(JSON.parse(e.data)); } catch(err){}
+  });
+  stream.addEventListener('status', () => {
+    if (window.location.pathname === '/status') window.location.reload();
+  });
+})();
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
+import hashlib
 import html
 import secrets
 import time
 import json
-from typing import Dict, List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
 
+import orjson
+from cachetools import TTLCache
 from fastapi import Request
 from fastapi.responses import HTMLResponse
 
 from .clients import JINJA_ENV
 from .i18n import LANG_STRINGS, LANG_META
 from .settings import INVITE_LINK
-from .utils import clean_display_name, normalize_language
+from .utils import clean_display_name, format_timestamp, normalize_language
 from . import state
 
+JINJA_ENV.filters["fmt_ts"] = format_timestamp
+
 HISTORY_TEMPLATE = JINJA_ENV.from_string(
     """
 <ul class="history-list">
@@ -32,7 +39,7 @@ HISTORY_TEMPLATE = JINJA_ENV.from_string(
       {% endif %}
     </div>
     <div class="meta"><strong>Reference:</strong> {{ item.get("appeal_id") or "-" }}</div>
-    <div class="meta"><strong>Submitted:</strong> {{ format_timestamp(item.get("created_at") or "") }}</div>
+    <div class="meta"><strong>Submitted:</strong> {{ item.submitted_display }}</div>
     <div class="meta"><strong>Moderator:</strong> {{ item.get("moderator") or "Pending review" }}</div>
     <div class="meta"><strong>Ban reason:</strong> {{ item.get("ban_reason") or "No ban reason recorded." }}</div>
     <div class="meta"><strong>Appeal:</strong> {{ item.get("appeal_reason") or "No appeal reason captured." }}</div>
@@ -43,41 +50,88 @@ HISTORY_TEMPLATE = JINJA_ENV.from_string(
 )
 
 
+def render_template(name: str, **context) -> str:
+    """Render a page fragment from web_portal/templates (compiled once per process)."""
+    return JINJA_ENV.get_template(name).render(**context)
+
+
+def prewarm_templates() -> None:
+    """Load every template up front so the first request doesn't pay for compilation."""
+    for name in JINJA_ENV.list_templates():
+        JINJA_ENV.get_template(name)
+
+
+# Rendered history HTML keyed by a digest of the fields the template reads; identical
+# history (e.g. the same user reloading /status) is served without re-rendering.
+_HISTORY_FIELDS = ("platform", "appeal_id", "status", "created_at", "moderator", "ban_reason", "appeal_reason")
+_RENDERED_HISTORY: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
+
+def _history_digest(history: List[dict]) -> bytes:
+    rows = [[item.get(field) for field in _HISTORY_FIELDS] for item in history]
+    return hashlib.blake2b(orjson.dumps(rows, default=str), digest_size=16).digest()
+
+
 def render_history_items(history: List[dict], *, format_timestamp) -> str:
     if not history:
         return "<div class='muted'>No appeals yet.</div>"
-    return HISTORY_TEMPLATE.render(history=history, format_timestamp=format_timestamp)
+    key = _history_digest(history)
+    cached = _RENDERED_HISTORY.get(key)
+    if cached is not None:
+        return cached
+    # Format timestamps up front so the template only interpolates strings.
+    items = [{**item, "submitted_display": format_timestamp(item.get("created_at") or "")} for item in history]
+    rendered = _RENDERED_HISTORY[key] = HISTORY_TEMPLATE.render(history=items)
+    return rendered
+
+
+_FLAG_IMG_MAP: Dict[str, str] = {
+    "en": "/static/flags/us.svg",
+    "es": "/static/flags/es.svg",
+    "ar": "/static/flags/sa.svg",
+    "th": "/static/flags/th.svg",
+}
+_CSP = (
+    "default-src 'self'; "
+    "img-src 'self' data: https://*.discordapp.com https://*.discord.com; "
+    "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "script-src 'self' 'unsafe-inline'; "
+    "connect-src 'self' https://discord.com https://*.discord.com; "
+)
+_FAVICON = "/static/favicon.svg?v=1"
+# Shared page behaviour (language switcher, live announcements) lives in a static file the
+# browser caches; the query string changes whenever the file does.
+_STATIC_DIR = Path(__file__).resolve().parent / "static"
 
 
-def render_page(title: str, body_html: str, lang: str = "en", strings: Optional[Dict[str, str]] = None) -> str:
-    lang = normalize_language(lang)
-    year = time.gmtime().tm_year
-    strings = strings or LANG_STRINGS["en"]
-    top_actions = strings.get("top_actions") or strings.get("user_chip", "")
-    script_block = strings.get("script_block")
-    script_nonce = strings.get("script_nonce") or secrets.token_urlsafe(12)
-    full_script = script_block or ""
-    lang_switch_label = html.escape(strings.get("language_switch", "Switch language"))
-
-    flag_img_map = {
-        "en": "/static/flags/us.svg",
-        "es": "/static/flags/es.svg",
-        "ar": "/static/flags/sa.svg",
-        "th": "/static/flags/th.svg",
-    }
-
-    def render_lang_flag(code: str, meta: dict) -> str:
-        flag_img = flag_img_map.get(code)
-        if flag_img:
-            return f'<img class="lang-flag-img" src="{html.escape(flag_img)}" alt="" aria-hidden="true" loading="lazy" decoding="async" />'
-        flag_text = meta.get("flag") or "\U0001F310"
-        return html.escape(flag_text)
-
-    current_flag_html = render_lang_flag(lang, LANG_META.get(lang) or {})
+def _static_version(name: str) -> str:
+    try:
+        return hashlib.blake2b((_STATIC_DIR / name).read_bytes(), digest_size=6).hexdigest()
+    except OSError:
+        return "0"
+
+
+_STYLES_URL = f"/static/styles.css?v={_static_version('styles.css')}"
+_LIVE_JS_URL = f"/static/live.js?v={_static_version('live.js')}"
+
+
+def _render_lang_flag(code: str, meta: dict) -> str:
+    flag_img = _FLAG_IMG_MAP.get(code)
+    if flag_img:
+        return f'<img class="lang-flag-img" src="{html.escape(flag_img)}" alt="" aria-hidden="true" loading="lazy" decoding="async" />'
+    flag_text = meta.get("flag") or "\U0001F310"
+    return html.escape(flag_text)
+
+
+@lru_cache(maxsize=64)
+def _lang_switcher(lang: str) -> Tuple[str, str]:
+    """Current-flag HTML and language popover for a page language; identical for every request in that language."""
+    current_flag_html = _render_lang_flag(lang, LANG_META.get(lang) or {})
     lang_options: List[str] = []
     for code, meta in LANG_META.items():
         label = html.escape(meta.get("name") or code.upper())
-        flag_html = render_lang_flag(code, meta)
+        flag_html = _render_lang_flag(code, meta)
         active_cls = "lang-option--active" if code == lang else ""
         lang_options.append(
             f'<button class="lang-option {active_cls}" data-lang="{code}" aria-label="{label}"><span class="lang-flag">{flag_html}</span><span class="lang-name">{label}</span></button>'
@@ -85,186 +139,67 @@ def render_page(title: str, body_html: str, lang: str = "en", strings: Optional[
     lang_popover = (
         f'<div class="lang-popover" id="langPopover" role="menu">{"".join(lang_options)}</div>'
     )
-    nav_how_it_works = html.escape(strings.get("nav_how_it_works", strings.get("how_it_works", "How it works")))
-    nav_terms = html.escape(strings.get("nav_terms", "Terms"))
-    nav_privacy = html.escape(strings.get("nav_privacy", "Privacy"))
-    nav_status = html.escape(strings.get("nav_status", "Appeal Status"))
-    nav_discord = html.escape(strings.get("nav_discord", "Discord"))
-    brand_tag = html.escape(strings.get("brand_tag", "Ban Appeal Portal"))
-    csp = (
-        "default-src 'self'; "
-        "img-src 'self' data: https://*.discordapp.com https://*.discord.com; "
-        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-        "font-src 'self' https://fonts.gstatic.com; "
-        "script-src 'self' 'unsafe-inline'; "
-        "connect-src 'self' https://discord.com https://*.discord.com; "
-    )
-    favicon = "/static/favicon.svg?v=1"
-    announcement_html = ""
+    return current_flag_html, lang_popover
+
+
+# Footer year, refreshed at most hourly instead of calling gmtime on every render.
+_YEAR_CACHE: List[Tuple[int, float]] = [(time.gmtime().tm_year, time.time())]
+
+
+def _current_year() -> int:
+    year, checked_at = _YEAR_CACHE[0]
+    now = time.time()
+    if now - checked_at > 3600:
+        year = time.gmtime(now).tm_year
+        _YEAR_CACHE[0] = (year, now)
+    return year
+
+
+LAYOUT_TEMPLATE = JINJA_ENV.get_template("layout.html")
+
+
+def render_page(
+    title: str,
+    body_html: str,
+    lang: str = "en",
+    strings: Optional[Mapping[str, str]] = None,
+    *,
+    top_actions: Optional[str] = None,
+) -> str:
+    lang = normalize_language(lang)
+    year = _current_year()
+    strings = strings or LANG_STRINGS["en"]
+    if top_actions is None:
+        top_actions = strings.get("top_actions") or strings.get("user_chip", "")
+    script_block = strings.get("script_block")
+    # The CSP allows inline scripts, so a nonce only matters for page-specific script blocks.
+    script_nonce = strings.get("script_nonce") or (secrets.token_urlsafe(12) if script_block else "")
+    current_flag_html, lang_popover = _lang_switcher(lang)
     current_announcement = getattr(state, "_announcement_text", None)
     current_epoch = getattr(state, "_session_epoch", 0)
     announce_block = f"window.BS_ANNOUNCE = {json.dumps({'text': current_announcement, 'epoch': current_epoch})};"
-    live_script = """
-      (function(){
-        const banner = document.getElementById("live-announcement");
-        let local = (window.BS_ANNOUNCE || {epoch:0,text:null});
-        function render(text) {
-          if (!banner) return;
-          banner.innerHTML = "";
-          if (!text) { return; }
-          const card = document.createElement("div");
-          card.className = "announcement-card";
-          card.innerHTML = `
-            <div class="announcement__left">
-              <div class="announcement__dot"></div>
-              <div class="announcement__copy">
-                <div class="announcement__label">Announcement</div>
-                <div class="announcement__text"></div>
-              </div>
-            </div>
-            <div class="announcement__badge">Live</div>
-          `;
-          card.querySelector(".announcement__text").textContent = text;
-          banner.appendChild(card);
-        }
-        render(local.text);
-        async function tick(){
-          try{
-            const resp = await fetch('/live/announcement',{headers:{'Accept':'application/json'}});
-            if(!resp.ok) return;
-            const data = await resp.json();
-            if(typeof data.epoch === 'number' && data.epoch > (local.epoch||0)){
-              window.location.reload();
-              return;
-            }
-            local = {epoch:data.epoch||local.epoch,text:data.announcement||null};
-            render(local.text);
-          }catch(e){}
-        }
-        setInterval(tick, 10000);
-      })();
-    """
-    lang_script = """
-        (function(){
-          const toggles = Array.from(document.querySelectorAll('.lang-toggle'));
-          const pop = document.getElementById('langPopover');
-          if(!toggles.length || !pop) return;
-          const setExpanded = (state) => toggles.forEach(btn => btn.setAttribute('aria-expanded', state ? 'true' : 'false'));
-          const open = () => { pop.classList.add('open'); setExpanded(true); };
-          const close = () => { pop.classList.remove('open'); setExpanded(false); };
-          const togglePop = (e) => { e.preventDefault(); pop.classList.contains('open') ? close() : open(); };
-          toggles.forEach(btn => btn.addEventListener('click', togglePop));
-          document.addEventListener('click', (e) => {
-            if (pop.contains(e.target) || toggles.some(btn => btn.contains(e.target))) return;
-            close();
-          });
-          pop.querySelectorAll('.lang-option').forEach(btn => {
-            btn.addEventListener('click', () => {
-              const code = btn.dataset.lang;
-              if (!code) return;
-              const url = new URL(window.location.href);
-              url.searchParams.set('lang', code);
-              document.cookie = `lang=${code}; path=/; max-age=${60*60*24*30}; samesite=Lax`;
-              window.location.href = url.toString();
-            });
-          });
-        })();
-    """
-
-    return f"""
-    <!DOCTYPE html>
-    <html lang="{lang}">
-      <head>
-        <meta charset="utf-8" />
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <meta name="color-scheme" content="dark" />
-        <title>{html.escape(title)}</title>
-        <meta property="og:type" content="website" />
-        <meta property="og:title" content="BlockSpin Appeals" />
-        <meta property="og:description" content="Link Discord + Roblox, see unified appeal history, and submit your ban appeal to BlockSpin moderators." />
-        <meta property="og:url" content="https://bs-appeals.up.railway.app" />
-        <meta property="og:image" content="https://bs-appeals.up.railway.app/static/og-banner.png" />
-        <meta name="twitter:card" content="summary_large_image" />
-        <meta name="twitter:title" content="BlockSpin Appeals" />
-        <meta name="twitter:description" content="Link Discord + Roblox, see unified appeal history, and submit your ban appeal to BlockSpin moderators." />
-        <meta name="twitter:image" content="https://bs-appeals.up.railway.app/static/og-banner.png" />
-        <link rel="icon" type="image/svg+xml" href="{favicon}">
-        <meta http-equiv="Content-Security-Policy" content="{csp}">
-        <link rel="stylesheet" href="/static/styles.css">
-        <style>
-          .lang-switch {{ position: relative; }}
-          .lang-toggle {{ display:flex;align-items:center;gap:6px;border:1px solid var(--border);background:var(--card-bg-2);color:inherit;padding:8px 10px;border-radius:10px;cursor:pointer; }}
-          .lang-toggle .lang-flag {{ font-size:16px; }}
-          .lang-popover {{ position:absolute;top:110%;right:0;background:var(--card-bg-2);border:1px solid var(--border);border-radius:12px;box-shadow:0 12px 32px rgba(0,0,0,0.25);padding:8px;display:none;z-index:30;min-width:180px; }}
-          .lang-popover.open {{ display:block; }}
-          .lang-option {{ width:100%;display:flex;align-items:center;gap:8px;padding:8px 10px;border:none;background:transparent;color:inherit;border-radius:8px;cursor:pointer;text-align:left; }}
-          .lang-option:hover {{ background:var(--card-bg-3); }}
-          .lang-option--active {{ outline:1px solid var(--border-strong, #5c5cff); background:var(--card-bg-3); }}
-          .lang-flag {{ width:20px; height:20px; display:inline-flex; align-items:center; justify-content:center; text-align:center; font-family: "Twemoji", "Noto Color Emoji", "Segoe UI Emoji", system-ui; }}
-          .lang-flag-img {{ width:18px; height:12px; border-radius:0; box-shadow:none; }}
-          .lang-name {{ flex:1; font-weight:600; }}
-          @media (max-width: 768px) {{
-            .lang-popover {{ left:0; right:auto; }}
-          }}
-        </style>
-      </head>
-      <body>
-        <div class="bg-orbit" aria-hidden="true"></div>
-        <div class="bg-grid" aria-hidden="true"></div>
-
-        <header class="top">
-          <div class="wrap top__inner">
-            <a class="brand" href="/">
-              <span class="brand__mark" aria-hidden="true">
-                <span class="mark__ring"></span>
-                <span class="mark__core">BS</span>
-              </span>
-              <span class="brand__text">
-                <span class="brand__name">BlockSpin</span>
-                <span class="brand__tag">{brand_tag}</span>
-              </span>
-            </a>
 
-            <nav class="nav">
-              <a class="nav__link" href="/how-it-works">{nav_how_it_works}</a>
-              <a class="nav__link" href="/tos">{nav_terms}</a>
-              <a class="nav__link" href="/privacy">{nav_privacy}</a>
-              <a class="nav__link" href="/status">{nav_status}</a>
-              <a class="nav__link nav__link--muted" href="{INVITE_LINK}" rel="noreferrer">{nav_discord}</a>
-            </nav>
-
-            {top_actions}
-          </div>
-        </header>
-
-        <main class="wrap">
-          <div id="live-announcement">{announcement_html}</div>
-          {body_html}
-
-          <footer class="footer">
-            <div class="footer__left">
-              <span class="footer__brand">BlockSpin</span>
-              <span class="footer__muted">© {year}</span>
-            </div>
-            <div class="footer__right">
-              <a href="/tos">{nav_terms}</a>
-              <a href="/privacy">{nav_privacy}</a>
-              <a href="/status">{nav_status}</a>
-              <div class="lang-switch">
-                <button class="lang-toggle" id="footerLangToggle" aria-haspopup="true" aria-expanded="false">
-                  <span class="lang-flag">{current_flag_html}</span>
-                  <span class="lang-label">{lang_switch_label}</span>
-                </button>
-                {lang_popover}
-              </div>
-            </div>
-          </footer>
-        </main>
-
-        <script nonce="{script_nonce}">{announce_block}{full_script}{lang_script}{live_script}</script>
-      </body>
-    </html>
-    """
+    return LAYOUT_TEMPLATE.render(
+        lang=lang,
+        title=title,
+        strings=strings,
+        nav_terms=strings.get("nav_terms", "Terms"),
+        nav_privacy=strings.get("nav_privacy", "Privacy"),
+        nav_status=strings.get("nav_status", "Appeal Status"),
+        invite_link=INVITE_LINK,
+        favicon=_FAVICON,
+        csp=_CSP,
+        styles_url=_STYLES_URL,
+        top_actions=top_actions,
+        body_html=body_html,
+        year=year,
+        current_flag_html=current_flag_html,
+        lang_popover=lang_popover,
+        script_nonce=script_nonce,
+        announce_block=announce_block,
+        script_block=script_block or "",
+        live_js_url=_LIVE_JS_URL,
+    )
 
 
 def build_user_chip(
@@ -321,24 +256,10 @@ def render_error(
     *,
     status_code: int = 400,
     lang: str = "en",
-    strings: Optional[Dict[str, str]] = None,
+    strings: Optional[Mapping[str, str]] = None,
 ) -> HTMLResponse:
-    safe_title = html.escape(title)
-    safe_msg = html.escape(message)
     strings = strings or LANG_STRINGS["en"]
-
-    content = f"""
-      <div class="card" style="text-align:center;">
-        <div class="icon-error">!</div>
-        <h2>{safe_title}</h2>
-
-        <div class="error-box">{safe_msg}</div>
-
-        <div class="btn-row" style="justify-content:center;">
-          <a class="btn" href="/" aria-label="Back home">{strings['error_home']}</a>        </div>
-        </div>
-      </div>
-    """
+    content = render_template("error.html", title=title, message=message, strings=strings)
 
     return HTMLResponse(
         render_page(title, content, lang=lang, strings=strings),
@@ -2,17 +2,28 @@ from __future__ import annotations
 
 import hashlib
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Optional
 
+import orjson
 from fastapi import Request
+from fastapi.responses import JSONResponse
 
 from .settings import SECRET_KEY
 
 
+class OrjsonResponse(JSONResponse):
+    """JSONResponse encoded with orjson (FastAPI's own ORJSONResponse is deprecated in newer releases)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
 def uid(value: Any) -> str:
     return str(value)
 
 
+@lru_cache(maxsize=1024)
 def normalize_language(lang: Optional[str]) -> str:
     if not lang:
         return "en"
@@ -25,6 +36,19 @@ def normalize_language(lang: Optional[str]) -> str:
 def format_timestamp(value: Any) -> str:
     if not value:
         return ""
+    # Supabase hands back str/int/float, which memoize well; anything unhashable is formatted directly.
+    try:
+        return _format_timestamp_cached(value)
+    except TypeError:
+        return _format_timestamp(value)
+
+
+@lru_cache(maxsize=8192)
+def _format_timestamp_cached(value: Any) -> str:
+    return _format_timestamp(value)
+
+
+def _format_timestamp(value: Any) -> str:
     try:
         if isinstance(value, str) and "T" in value:
             dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
@@ -64,8 +88,14 @@ def simplify_ban_reason(reason: Optional[str]) -> str:
     return reason
 
 
+# blake2b keys are capped at 64 bytes; longer secrets are compressed rather than truncated.
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
+if len(_SECRET_KEY_BYTES) > 64:
+    _SECRET_KEY_BYTES = hashlib.blake2b(_SECRET_KEY_BYTES).digest()
+
+
 def hash_value(raw: str) -> str:
-    return hashlib.sha256(f"{SECRET_KEY}:{raw}".encode("utf-8", "ignore")).hexdigest()
+    return hashlib.blake2b(raw.encode("utf-8", "ignore"), key=_SECRET_KEY_BYTES, digest_size=32).hexdigest()
 
 
 def hash_ip(ip: str) -> str: